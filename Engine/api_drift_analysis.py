@@ -2,21 +2,106 @@
 """
 Drift analysis API wrapper for Node.js backend
 Receives JSON input via stdin and outputs JSON to stdout
+
+Modes:
+  (default)        one request on stdin, one response on stdout
+  --batch          {"users": [{"userId": ..., "healthData": [...]}, ...]}
+                   on stdin, one response with per-user results
+  --worker         long-lived: one JSON request per stdin line (NDJSON),
+                   one JSON response per stdout line
+  --socket PATH    long-lived: NDJSON over a Unix domain socket
+
+In the long-lived modes the interpreter and pandas are loaded once and
+each line may be either a single request or a batch request.
+
+  --store DIR      serve requests (or batch users) that give a userId and
+                   no healthData from a HistoryStore (data/history_store.py).
+                   Each user's features (data/feature_store.py) are built
+                   from the store on first use and kept; a request with
+                   "append": [{"date": ..., "sleep_hours": ..., ...}]
+                   stores those days and folds them into the features in
+                   O(1) per day before answering
+
+Inputs up to ARRAY_PATH_MAX_ROWS plain numeric rows are analyzed with
+NumPy only; pandas is imported lazily for anything else.
 """
 
 import sys
 import json
-import pandas as pd
+import argparse
+import threading
+from numbers import Real
 from pathlib import Path
 
 # Add Engine directory to path
 engine_path = Path(__file__).parent
 sys.path.insert(0, str(engine_path))
 
-from explainability.explain_alerts import explain_drift
+from tracing import profile_run
+from explainability.explain_alerts import (
+    explain_drift,
+    explain_drift_arrays,
+    explain_drift_from_features,
+    nanmean
+)
+
+MIN_DAYS = 7
+ARRAY_PATH_MAX_ROWS = 5000
+
+_store = None
+# user id -> (UserFeatures, last stored day) for users read from _store
+_features = {}
+_features_lock = threading.Lock()
+
+def _column(health_data, key):
+    """
+    Column values as floats, with DataFrame semantics: a key missing from
+    every row is all zeros, a key missing from some rows is NaN there.
+    Returns None if a value is not a plain number.
+    """
+    if not any(key in row for row in health_data):
+        return [0.0] * len(health_data)
+
+    values = []
+    for row in health_data:
+        value = row.get(key)
+        if value is None:
+            values.append(float("nan"))
+        elif isinstance(value, Real) and not isinstance(value, bool):
+            values.append(float(value))
+        else:
+            return None
+    return values
+
+def analyze_drift_arrays(health_data):
+    """Analyze drift without pandas; None if the input needs the DataFrame path"""
+    if len(health_data) > ARRAY_PATH_MAX_ROWS:
+        return None
+    if not all(isinstance(row, dict) for row in health_data):
+        return None
+
+    steps = _column(health_data, 'steps')
+    sleep_hours = _column(health_data, 'sleep_hours')
+    if steps is None or sleep_hours is None:
+        return None
+
+    return {
+        "explanations": explain_drift_arrays(sleep_hours, steps),
+        "data_points": len(health_data),
+        "metrics": {
+            "avg_steps": nanmean(steps),
+            "avg_sleep": nanmean(sleep_hours)
+        }
+    }
 
 def analyze_drift(health_data):
     """Analyze drift in health data"""
+    result = analyze_drift_arrays(health_data)
+    if result is not None:
+        return result
+
+    import pandas as pd
+
     # Convert to DataFrame
     df = pd.DataFrame(health_data)
     
@@ -38,33 +123,197 @@ def analyze_drift(health_data):
         }
     }
 
-def main():
+def validate_health_data(health_data):
+    if health_data is None or len(health_data) < MIN_DAYS:
+        raise ValueError(f"At least {MIN_DAYS} days of health data required")
+
+def stored_features(user_id):
+    """A user's features, replaying their stored history on first use (lock held)"""
+    entry = _features.get(user_id)
+    if entry is None:
+        from data.feature_store import UserFeatures
+
+        history = _store.history(user_id)
+        last_day = int(history["day"][-1]) if len(history["day"]) else None
+        entry = _features[user_id] = (UserFeatures.from_columns(history), last_day)
+    return entry[0]
+
+def append_stored(user_id, rows):
+    """Store new days for a user and fold them into their cached features"""
+    from data.history_store import to_day
+
+    if not isinstance(rows, list) or not all(isinstance(r, dict) and "date" in r for r in rows):
+        raise ValueError("'append' must be a list of objects with a 'date'")
+    days = [to_day(r["date"]) for r in rows]
+
+    with _features_lock:
+        _store.append(dict(r, user_id=user_id) for r in rows)
+        entry = _features.pop(user_id, None)
+        if entry is None or not days:
+            return
+        features, last_day = entry
+        # Only new days in order can be folded in; anything else (an
+        # earlier day, a rewrite of a stored day) is rebuilt on next read
+        if days == sorted(set(days)) and (last_day is None or days[0] > last_day):
+            for row in rows:
+                features.update(row)
+            _features[user_id] = (features, days[-1])
+
+def analyze_stored(user_id):
+    """Analyze drift from a user's stored history via their materialized features"""
+    with _features_lock:
+        features = stored_features(user_id)
+        if features.days < MIN_DAYS:
+            raise ValueError(f"At least {MIN_DAYS} days of health data required")
+
+        return {
+            "explanations": explain_drift_from_features(features),
+            "data_points": features.days,
+            "metrics": {
+                "avg_steps": features.lifetime_mean("steps"),
+                "avg_sleep": features.lifetime_mean("sleep_hours")
+            }
+        }
+
+def analyze_user(request):
+    """Drift for one request: its healthData, or its stored history with --store"""
+    if _store is not None and "healthData" not in request and request.get("userId") is not None:
+        if "append" in request:
+            append_stored(request["userId"], request["append"])
+        return analyze_stored(request["userId"])
+
+    health_data = request.get("healthData", [])
+    validate_health_data(health_data)
+    return analyze_drift(health_data)
+
+def analyze_batch(users):
+    """Analyze many users' health data; failures are reported per user"""
+    results = []
+    for user in users:
+        user_id = None
+        try:
+            if not isinstance(user, dict):
+                raise ValueError("Each user must be a JSON object")
+            user_id = user.get("userId")
+            results.append({
+                "userId": user_id,
+                "success": True,
+                "data": analyze_user(user)
+            })
+        except Exception as e:
+            results.append({
+                "userId": user_id,
+                "success": False,
+                "error": str(e)
+            })
+    return results
+
+def handle_request(input_data):
+    """Turn one request object into one response object"""
     try:
-        # Read input from stdin
-        input_data = json.loads(sys.stdin.read())
-        health_data = input_data.get("healthData", [])
-        
-        if not health_data or len(health_data) < 7:
-            raise ValueError("At least 7 days of health data required")
-        
-        # Analyze drift
-        result = analyze_drift(health_data)
-        
-        # Output JSON to stdout
-        output = {
+        if "users" in input_data:
+            return {
+                "success": True,
+                "data": analyze_batch(input_data["users"])
+            }
+
+        return {
             "success": True,
-            "data": result
+            "data": analyze_user(input_data)
         }
-        print(json.dumps(output))
-        
     except Exception as e:
-        # Output error as JSON
-        error_output = {
+        return {
             "success": False,
             "error": str(e)
         }
-        print(json.dumps(error_output))
+
+def handle_line(line):
+    """Decode one NDJSON request line and encode its response"""
+    try:
+        input_data = json.loads(line)
+    except ValueError as e:
+        return json.dumps({"success": False, "error": f"Invalid JSON: {e}"})
+    if not isinstance(input_data, dict):
+        return json.dumps({"success": False, "error": "Request must be a JSON object"})
+    return json.dumps(handle_request(input_data))
+
+def serve_stdin():
+    """Answer NDJSON requests from stdin until EOF"""
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        sys.stdout.write(handle_line(line) + "\n")
+        sys.stdout.flush()
+
+def serve_socket(path):
+    """Answer NDJSON requests on a Unix domain socket, one thread per connection"""
+    import os
+    import socketserver
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for raw in self.rfile:
+                line = raw.decode("utf-8")
+                if not line.strip():
+                    continue
+                self.wfile.write((handle_line(line) + "\n").encode("utf-8"))
+                self.wfile.flush()
+
+    if os.path.exists(path):
+        os.unlink(path)
+
+    with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+        server.daemon_threads = True
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Drift analysis API")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--worker", action="store_true",
+                      help="serve NDJSON requests from stdin until EOF")
+    mode.add_argument("--socket", metavar="PATH",
+                      help="serve NDJSON requests on a Unix domain socket")
+    mode.add_argument("--batch", action="store_true",
+                      help="analyze a {\"users\": [...]} request from stdin")
+    parser.add_argument("--store", metavar="DIR",
+                        help="answer userId-only requests from a HistoryStore")
+    args = parser.parse_args()
+
+    if args.store:
+        global _store
+        from data.history_store import HistoryStore
+
+        _store = HistoryStore(args.store)
+
+    if args.worker:
+        serve_stdin()
+        return
+    if args.socket:
+        serve_socket(args.socket)
+        return
+
+    try:
+        # Read input from stdin
+        input_data = json.loads(sys.stdin.read())
+
+        if args.batch and "users" not in input_data:
+            raise ValueError("Batch mode expects a 'users' list")
+    except Exception as e:
+        print(json.dumps({"success": False, "error": str(e)}))
+        sys.exit(1)
+
+    # Analyze drift and output JSON to stdout
+    output = handle_request(input_data)
+    print(json.dumps(output))
+
+    if not output["success"]:
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
+    with profile_run("drift_analysis"):
+        main()
@@ -12,39 +12,13 @@ from pathlib import Path
 engine_path = Path(__file__).parent
 sys.path.insert(0, str(engine_path))
 
-from transformers import pipeline
-from models.symptom_normalizer import normalize_symptom
-from models.phrase_merger import merge_adjacent_entities
-
-# Initialize NER model
-ner = pipeline(
-    "ner",
-    model="d4data/biomedical-ner-all",
-    aggregation_strategy="simple"
+from tracing import profile_run
+from pipelines.symptom_pipeline import (
+    extract_symptoms,
+    extract_symptoms_batch,
+    get_ner
 )
-
-def extract_symptoms(text):
-    """Extract symptoms from text using NER model"""
-    entities = ner(text)
-    entities = merge_adjacent_entities(entities)
-
-    symptoms = []
-    for e in entities:
-        if e["score"] < 0.6:
-            continue
-
-        if e["word"].lower() in ["today", "now", "yesterday"]:
-            continue
-
-        normalized = normalize_symptom(e["word"])
-
-        symptoms.append({
-            "raw": e["word"],
-            "normalized": normalized,
-            "confidence": round(e["score"], 2)
-        })
-
-    return symptoms
+from models.entity_postprocess import dumps
 
 def main():
     try:
@@ -55,15 +29,15 @@ def main():
         if not text:
             raise ValueError("No text provided")
         
-        # Extract symptoms
-        symptoms = extract_symptoms(text)
+        # Extract symptoms (optionally with a named NER model)
+        symptoms = extract_symptoms(text, input_data.get("model"))
         
         # Output JSON to stdout
         output = {
             "success": True,
             "data": symptoms
         }
-        print(json.dumps(output))
+        print(dumps(output))
         
     except Exception as e:
         # Output error as JSON
@@ -75,4 +49,5 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
+    with profile_run("symptom_extract"):
+        main()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Multi-worker symptom extraction server
+Loads the NER model once in a parent process, then forks workers that
+share the weights copy-on-write and answer NDJSON requests:
+
+  {"text": "..."}            -> {"success": true, "data": [symptoms]}
+  {"texts": ["...", "..."]}  -> {"success": true, "data": [[symptoms], ...]}
+
+Either form may name a NER model with "model" (models/ner_registry.py):
+a registered name, or any Hugging Face id with --allow-any-model. Only
+the default model (--model) is loaded before forking; other models are
+loaded by each worker on first use, within its memory budget.
+
+Each worker limits torch intra-op threads so N workers don't oversubscribe
+the machine's cores. Unix only (uses fork).
+
+Usage:
+  python api_symptom_server.py --socket /tmp/symptoms.sock --workers 4
+  python api_symptom_server.py --port 8600 --workers 4 --threads 2
+  python api_symptom_server.py --scaling-report 4
+"""
+
+import os
+import gc
+import sys
+import json
+import time
+import select
+import signal
+import socket
+import argparse
+import resource
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+
+# Add Engine directory to path
+engine_path = Path(__file__).parent
+sys.path.insert(0, str(engine_path))
+
+from api_symptom_extract import extract_symptoms, extract_symptoms_batch, get_ner
+from models.entity_postprocess import dumps
+from models.ner_registry import get_registry, WARMUP_TEXT
+
+READY_LINE = "READY"
+
+SAMPLE_TEXTS = [
+    "I feel chest tightness and shortness of breath",
+    "Breathing difficulty and fatigue today",
+    "Chest pressure with fatigue",
+    "Headache since yesterday and mild nausea in the morning",
+    "Tired all week, sleeping badly and my back hurts",
+]
+
+def log(message):
+    print(f"[symptom-server {os.getpid()}] {message}", file=sys.stderr, flush=True)
+
+def memory_mb(pid="self"):
+    """Proportional set size (shared pages split between sharers), or RSS"""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / (1024 * 1024)
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def set_worker_threads(threads):
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(threads)
+
+def handle_line(line):
+    """Decode one NDJSON request line and encode its response"""
+    try:
+        input_data = json.loads(line)
+        if not isinstance(input_data, dict):
+            raise ValueError("Request must be a JSON object")
+
+        model = input_data.get("model")
+        if "texts" in input_data:
+            data = extract_symptoms_batch(input_data["texts"], model=model)
+        else:
+            text = input_data.get("text", "")
+            if not text:
+                raise ValueError("No text provided")
+            data = extract_symptoms(text, model)
+
+        return dumps({"success": True, "data": data})
+    except Exception as e:
+        return json.dumps({"success": False, "error": str(e)})
+
+def serve_connection(conn):
+    with conn, conn.makefile("rwb") as stream:
+        for raw in stream:
+            line = raw.decode("utf-8")
+            if not line.strip():
+                continue
+            stream.write((handle_line(line) + "\n").encode("utf-8"))
+            stream.flush()
+
+def worker_main(listener, threads, ready_fd):
+    """Body of a forked worker: warm up, report ready, accept forever"""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    set_worker_threads(threads)
+    extract_symptoms(WARMUP_TEXT)
+    log(f"worker ready (threads={threads}, {memory_mb():.1f} MB)")
+
+    os.write(ready_fd, b"1")
+    os.close(ready_fd)
+
+    while True:
+        conn, _ = listener.accept()
+        try:
+            serve_connection(conn)
+        except OSError:
+            pass
+
+def fork_worker(listener, threads, ready_fd):
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            worker_main(listener, threads, ready_fd)
+        except BaseException:
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+def make_listener(socket_path=None, host="127.0.0.1", port=None):
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(socket_path)
+    else:
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind((host, port))
+    listener.listen(128)
+    return listener
+
+def run_server(listener, workers, threads):
+    """Load the model, fork workers, and supervise them until SIGTERM/SIGINT"""
+    started = time.perf_counter()
+
+    # Pre-fork load: the weights live in the parent and are inherited
+    # read-only by every worker. No inference (not even the registry's
+    # warm-up) runs here, so no OpenMP thread pool exists at fork time;
+    # each worker warms up after fork.
+    get_ner(warmup=False)
+    gc.collect()
+    gc.freeze()
+    log(f"model loaded in {time.perf_counter() - started:.1f}s ({memory_mb():.1f} MB)")
+
+    ready_r, ready_w = os.pipe()
+    children = set()
+    for _ in range(workers):
+        children.add(fork_worker(listener, threads, ready_w))
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    ready = 0
+    while ready < workers and not stopping:
+        readable, _, _ = select.select([ready_r], [], [], 1.0)
+        if readable:
+            ready += len(os.read(ready_r, workers - ready))
+        pid, status = os.waitpid(-1, os.WNOHANG)
+        if pid:
+            children.discard(pid)
+            stop(None, None)
+            raise RuntimeError(f"worker {pid} died during start-up ({status})")
+    log(f"{ready} workers ready in {time.perf_counter() - started:.1f}s")
+    print(READY_LINE, flush=True)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        if not stopping:
+            log(f"worker {pid} exited ({status}), restarting")
+            children.add(fork_worker(listener, threads, ready_w))
+
+    listener.close()
+    log("shut down")
+
+def tree_memory_mb(pid):
+    """Memory of a process and its direct children"""
+    pids = [pid]
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                pids.extend(int(p) for p in f.read().split())
+    except OSError:
+        pass
+    return sum(memory_mb(p) for p in pids)
+
+def measure_throughput(socket_path, clients, duration):
+    """Texts per second with `clients` concurrent connections"""
+    counts = [0] * clients
+    deadline = time.perf_counter() + duration
+
+    def client(i):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.connect(socket_path)
+            stream = s.makefile("rwb")
+            n = 0
+            while time.perf_counter() < deadline:
+                text = SAMPLE_TEXTS[n % len(SAMPLE_TEXTS)]
+                stream.write((json.dumps({"text": text}) + "\n").encode("utf-8"))
+                stream.flush()
+                stream.readline()
+                n += 1
+            counts[i] = n
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(counts) / (time.perf_counter() - started)
+
+def scaling_report(max_workers, threads, duration):
+    """Start 1..N worker servers and report memory and throughput scaling"""
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in range(1, max_workers + 1):
+            socket_path = os.path.join(tmp, f"symptoms-{workers}.sock")
+            server = subprocess.Popen(
+                [sys.executable, __file__, "--socket", socket_path,
+                 "--workers", str(workers), "--threads", str(threads)],
+                stdout=subprocess.PIPE,
+                text=True
+            )
+            try:
+                if server.stdout.readline().strip() != READY_LINE:
+                    raise RuntimeError(f"server with {workers} workers failed to start")
+                memory = tree_memory_mb(server.pid)
+                throughput = measure_throughput(socket_path, workers, duration)
+            finally:
+                server.terminate()
+                server.wait()
+            rows.append((workers, memory, throughput))
+
+    base_memory, base_throughput = rows[0][1], rows[0][2]
+    print(f"{'workers':>7}  {'memory MB':>10}  {'+MB/worker':>10}  {'texts/s':>8}  {'speedup':>7}")
+    for workers, memory, throughput in rows:
+        per_worker = (memory - base_memory) / (workers - 1) if workers > 1 else 0.0
+        print(f"{workers:>7}  {memory:>10.1f}  {per_worker:>10.1f}  "
+              f"{throughput:>8.1f}  {throughput / base_throughput:>6.2f}x")
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Multi-worker symptom extraction server")
+    address = parser.add_mutually_exclusive_group()
+    address.add_argument("--socket", metavar="PATH", help="listen on a Unix domain socket")
+    address.add_argument("--port", type=int, help="listen on 127.0.0.1:PORT (or --host)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--workers", type=int, default=cpus,
+                        help="worker processes (default: one per core)")
+    parser.add_argument("--threads", type=int,
+                        help="torch intra-op threads per worker (default: cores / workers)")
+    parser.add_argument("--scaling-report", type=int, metavar="N",
+                        help="benchmark 1..N workers and print memory/throughput scaling")
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="seconds of load per step in --scaling-report")
+    parser.add_argument("--model", help="default NER model (default: ENGINE_NER_MODEL)")
+    parser.add_argument("--allow-any-model", action="store_true",
+                        help="let requests name any Hugging Face model id (default: registered names only)")
+    args = parser.parse_args()
+
+    if args.model:
+        get_registry().default = args.model
+    if args.allow_any_model:
+        get_registry().allow_arbitrary = True
+
+    if args.scaling_report:
+        threads = args.threads or max(1, cpus // args.scaling_report)
+        scaling_report(args.scaling_report, threads, args.duration)
+        return
+
+    if not args.socket and args.port is None:
+        parser.error("one of --socket or --port is required")
+
+    workers = max(1, args.workers)
+    threads = args.threads or max(1, cpus // workers)
+    listener = make_listener(args.socket, args.host, args.port)
+    try:
+        run_server(listener, workers, threads)
+    finally:
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Per-user vs cohort drift model benchmark.
+
+Generates a synthetic population, runs detect_drift once per user and
+detect_drift_cohort once for the whole population, and reports fit/score
+time plus how often the two agree (per day and on the per-user drift
+decision used by community_demo.py).
+
+Usage:
+  python benchmarks/drift_cohort.py [--users 500] [--cohort region|activity]
+"""
+
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+ENGINE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ENGINE_DIR))
+
+import numpy as np
+
+from data.synthetic.generate_population import generate_population
+from pipelines.drift_pipeline import (
+    detect_drift,
+    detect_drift_cohort,
+    region_cohort,
+    activity_band_cohort
+)
+
+COHORTS = {"region": region_cohort, "activity": activity_band_cohort}
+
+def user_drift_decision(df):
+    """Same rule as community_demo.py"""
+    recent = df.tail(10)
+    sleep_drop = df.sleep_hours.iloc[:30].mean() - recent.sleep_hours.mean()
+    steps_drop = df.steps.iloc[:30].mean() - recent.steps.mean()
+    return bool(
+        recent.drift_flag.sum() >= 3 and
+        sleep_drop > 1.0 and
+        steps_drop > 1500
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-user vs cohort drift benchmark")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--cohort", choices=sorted(COHORTS), default="region")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    np.random.seed(args.seed)
+    population = []
+    for region in ("Zone-A", "Zone-B"):
+        population.extend(generate_population(args.users // 2, region=region))
+
+    per_user = [dict(u, data=u["data"].copy()) for u in population]
+    cohort = [dict(u, data=u["data"].copy()) for u in population]
+
+    started = time.perf_counter()
+    for user in per_user:
+        detect_drift(user["data"])
+    per_user_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    models = detect_drift_cohort(cohort, COHORTS[args.cohort])
+    cohort_time = time.perf_counter() - started
+
+    day_agree = np.mean([
+        (a["data"].drift_flag.values == b["data"].drift_flag.values).mean()
+        for a, b in zip(per_user, cohort)
+    ])
+    per_user_decisions = [user_drift_decision(u["data"]) for u in per_user]
+    cohort_decisions = [user_drift_decision(u["data"]) for u in cohort]
+    truth = [u["has_drift"] for u in population]
+
+    decision_agree = np.mean([a == b for a, b in zip(per_user_decisions, cohort_decisions)])
+    per_user_acc = np.mean([a == t for a, t in zip(per_user_decisions, truth)])
+    cohort_acc = np.mean([a == t for a, t in zip(cohort_decisions, truth)])
+
+    rows = [
+        ("users", len(population)),
+        (f"cohorts ({args.cohort})", len(models)),
+        ("per-user fit+score", f"{per_user_time:.2f}s"),
+        ("cohort fit+score", f"{cohort_time:.2f}s ({per_user_time / cohort_time:.1f}x faster)"),
+        ("day-level flag agreement", f"{day_agree:.1%}"),
+        ("user decision agreement", f"{decision_agree:.1%}"),
+        ("accuracy vs has_drift", f"per-user {per_user_acc:.1%}, cohort {cohort_acc:.1%}"),
+    ]
+    for label, value in rows:
+        print(f"{label + ':':<27}{value}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Gazetteer prefilter report.
+
+Reads a JSONL sample of {"text": ..., "symptoms": [normalized, ...]} and
+prints how much of the traffic the gazetteer answers without the model
+(known-phrase hits and no-signal rejects) and how often those answers
+agree with the reference. Lines without "symptoms" use the NER model's
+own output (with the prefilter disabled) as the reference.
+
+No-signal rejection is off in production unless ENGINE_GAZETTEER_REJECT
+is set; this report always evaluates it, so its reject_agreement is the
+check to run before turning it on.
+
+Usage:
+  python benchmarks/gazetteer_report.py sample.jsonl [--json OUT]
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+ENGINE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ENGINE_DIR))
+
+from models.gazetteer import Gazetteer, gazetteer_settings
+
+def normalized_set(symptoms):
+    return {s["normalized"] if isinstance(s, dict) else s for s in symptoms}
+
+def build_report(samples):
+    gazetteer = Gazetteer(**dict(gazetteer_settings(), reject_no_signal=True))
+
+    unlabeled = [s["text"] for s in samples if "symptoms" not in s]
+    model_refs = iter([])
+    if unlabeled:
+        from pipelines.symptom_pipeline import extract_symptoms_batch
+        model_refs = iter(extract_symptoms_batch(unlabeled, prefilter=False))
+
+    counts = {"hit": 0, "reject": 0, "model": 0}
+    agree = {"hit": 0, "reject": 0}
+    disagreements = []
+    for sample in samples:
+        text = sample["text"]
+        if "symptoms" in sample:
+            reference = normalized_set(sample["symptoms"])
+        else:
+            reference = normalized_set(next(model_refs))
+
+        shortcut = gazetteer.shortcut(text)
+        if shortcut is None:
+            counts["model"] += 1
+            continue
+
+        kind = "hit" if shortcut else "reject"
+        counts[kind] += 1
+        if normalized_set(shortcut) == reference:
+            agree[kind] += 1
+        else:
+            disagreements.append({
+                "text": text,
+                "gazetteer": sorted(normalized_set(shortcut)),
+                "reference": sorted(reference)
+            })
+
+    total = len(samples) or 1
+    served = counts["hit"] + counts["reject"]
+    return {
+        "samples": len(samples),
+        "served_fraction": round(served / total, 4),
+        "hit_fraction": round(counts["hit"] / total, 4),
+        "reject_fraction": round(counts["reject"] / total, 4),
+        "agreement": round((agree["hit"] + agree["reject"]) / served, 4) if served else None,
+        "hit_agreement": round(agree["hit"] / counts["hit"], 4) if counts["hit"] else None,
+        "reject_agreement": round(agree["reject"] / counts["reject"], 4) if counts["reject"] else None,
+        "disagreements": disagreements
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Gazetteer prefilter report")
+    parser.add_argument("sample", type=Path, help="JSONL file with a 'text' field per line")
+    parser.add_argument("--json", type=Path, metavar="OUT",
+                        help="also write the full report as JSON")
+    args = parser.parse_args()
+
+    with open(args.sample) as f:
+        samples = [json.loads(line) for line in f if line.strip()]
+
+    report = build_report(samples)
+
+    print(f"{'samples:':<19}{report['samples']}")
+    print(f"{'served:':<19}{report['served_fraction']:.1%}"
+          f" (hits {report['hit_fraction']:.1%}, rejects {report['reject_fraction']:.1%})")
+    for key in ("agreement", "hit_agreement", "reject_agreement"):
+        value = report[key]
+        print(f"{key + ':':<19}{'n/a' if value is None else f'{value:.1%}'}")
+    for d in report["disagreements"][:10]:
+        print(f"  {d['text']!r}: gazetteer={d['gazetteer']} reference={d['reference']}")
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Cold-import benchmark for Engine entry points.
+
+Each module is imported in a fresh interpreter several times and the
+fastest run is compared against its budget in startup_budget.json.
+Exits non-zero if any entry point is over budget.
+
+Usage:
+  python benchmarks/startup.py [--runs N] [--budget FILE] [--json OUT]
+"""
+
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+
+ENGINE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BUDGET = Path(__file__).resolve().parent / "startup_budget.json"
+
+# Time only the import itself, not interpreter start-up.
+PROBE = (
+    "import sys, time\n"
+    "sys.path.insert(0, {engine!r})\n"
+    "t = time.perf_counter()\n"
+    "import {module}\n"
+    "print((time.perf_counter() - t) * 1000)\n"
+)
+
+def cold_import_ms(module, runs):
+    """Fastest of `runs` cold imports of `module`, in milliseconds"""
+    code = PROBE.format(engine=str(ENGINE_DIR), module=module)
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=ENGINE_DIR,
+            capture_output=True,
+            text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(
+                f"importing {module} failed:\n{result.stderr.strip()}"
+            )
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return min(timings)
+
+def run(budgets, runs):
+    results = []
+    for module, budget_ms in budgets.items():
+        elapsed = cold_import_ms(module, runs)
+        results.append({
+            "module": module,
+            "import_ms": round(elapsed, 1),
+            "budget_ms": budget_ms,
+            "ok": elapsed <= budget_ms
+        })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Engine cold-import benchmark")
+    parser.add_argument("--runs", type=int, default=5,
+                        help="imports per entry point; the fastest is kept")
+    parser.add_argument("--budget", type=Path, default=DEFAULT_BUDGET,
+                        help="JSON mapping module -> budget in ms")
+    parser.add_argument("--json", type=Path, metavar="OUT",
+                        help="also write the results as JSON")
+    args = parser.parse_args()
+
+    budgets = json.loads(args.budget.read_text())
+    results = run(budgets, args.runs)
+
+    width = max(len(r["module"]) for r in results)
+    for r in results:
+        status = "ok" if r["ok"] else "OVER BUDGET"
+        print(f"{r['module']:<{width}}  {r['import_ms']:8.1f} ms"
+              f"  / {r['budget_ms']:>5} ms  {status}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+
+    if not all(r["ok"] for r in results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Hot-path benchmark suite for the Engine and health-suggestion-service.
+
+Times symptom normalization and entity merging, symptom extraction
+(with a deterministic stub NER model, so no transformers / GPU needed),
+SymptomGraph updates, drift detection, community aggregation, the bulk
+alert pipeline (extraction, drift and confidence stages), and the
+suggestion service's analyzer and /analyze endpoint (via TestClient) on
+seeded synthetic data in three tiers: small, medium and large.
+
+Each benchmark is prepared fresh (untimed) and run --repeat times; the
+median is compared with the same tier in suite_baseline.json and flagged
+as a regression when it is more than --tolerance slower. Exits non-zero
+on any regression.
+
+Usage:
+  python benchmarks/suite.py [--tier small|medium|large] [--only NAME ...]
+                             [--json OUT] [--save-baseline] [--tolerance 0.25]
+                             [--min-delta-ms 1.0]
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import statistics
+from datetime import date, timedelta
+from pathlib import Path
+
+ENGINE_DIR = Path(__file__).resolve().parent.parent
+SERVICE_DIR = ENGINE_DIR.parent / "health-suggestion-service"
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "suite_baseline.json"
+sys.path.insert(0, str(ENGINE_DIR))
+
+TIERS = {
+    "small": {"entities": 200, "texts": 50, "graph_days": 30, "users": 4,
+              "signals": 1000, "metric_days": 30, "requests": 20},
+    "medium": {"entities": 2000, "texts": 500, "graph_days": 300, "users": 20,
+               "signals": 20000, "metric_days": 90, "requests": 100},
+    "large": {"entities": 20000, "texts": 5000, "graph_days": 3000, "users": 100,
+              "signals": 200000, "metric_days": 365, "requests": 500},
+}
+
+PHRASES = [
+    "chest tightness", "shortness of breath", "fatigue", "tired", "headache",
+    "mild fever", "dry cough", "joint pain", "tight chest", "nausea today",
+    "dizziness this morning", "sore throat", "muscle aches", "pressure in chest",
+]
+FILLER = ["I", "have", "had", "some", "and", "since", "a", "bit", "of", "feel"]
+
+
+class StubNER:
+    """
+    Deterministic stand-in for the transformers NER pipeline: every
+    alphabetic word becomes an entity, with a score derived from the word.
+    """
+
+    def _one(self, text):
+        return [
+            {
+                "entity_group": "Sign_symptom",
+                "word": m.group(),
+                "start": m.start(),
+                "end": m.end(),
+                "score": 0.5 + (sum(map(ord, m.group())) % 50) / 100
+            }
+            for m in re.finditer(r"[A-Za-z]+", text)
+        ]
+
+    def __call__(self, inputs, batch_size=1):
+        if isinstance(inputs, list):
+            return [self._one(text) for text in inputs]
+        return self._one(inputs)
+
+
+def use_stub_ner():
+    from models.ner_registry import get_registry
+
+    registry = get_registry()
+    registry.put(registry.default, StubNER())
+
+def make_text(rng):
+    words = []
+    for _ in range(rng.randint(2, 5)):
+        words.extend(rng.sample(FILLER, 2))
+        words.append(rng.choice(PHRASES))
+    return " ".join(words) + "."
+
+def make_entities(rng, n):
+    entities = []
+    position = 0
+    for _ in range(n):
+        word = rng.choice(PHRASES).split()[0]
+        start = position + rng.choice([1, 1, 2, 5])
+        entities.append({"word": word, "start": start, "end": start + len(word),
+                         "score": round(rng.random(), 2)})
+        position = start + len(word)
+    return entities
+
+def make_metrics(rng, days):
+    start = date(2024, 1, 1)
+    return [
+        {
+            "date": (start + timedelta(days=i)).isoformat(),
+            "sleep_duration": round(rng.gauss(7, 1), 2),
+            "screen_time": round(min(max(rng.gauss(5, 2), 0), 24), 2),
+            "activity_minutes": max(int(rng.gauss(35, 15)), 0)
+        }
+        for i in range(days)
+    ]
+
+
+# Each benchmark takes (tier params, rng), prepares its inputs and returns
+# (zero-argument callable to time, number of items it processes).
+
+def bench_normalize_symptom(p, rng):
+    from models.symptom_normalizer import normalize_symptom
+
+    words = [rng.choice(PHRASES) for _ in range(p["entities"])]
+    return lambda: [normalize_symptom(w) for w in words], len(words)
+
+def bench_merge_adjacent_entities(p, rng):
+    from models.phrase_merger import merge_adjacent_entities
+
+    entities = make_entities(rng, p["entities"])
+    return lambda: merge_adjacent_entities(entities), len(entities)
+
+def bench_extract_symptoms_batch(p, rng):
+    import pipelines.symptom_pipeline as symptom_pipeline
+
+    use_stub_ner()
+    texts = [make_text(rng) for _ in range(p["texts"])]
+    return lambda: symptom_pipeline.extract_symptoms_batch(texts, prefilter=False), len(texts)
+
+def bench_symptom_graph_update(p, rng):
+    from models.symptom_graph import SymptomGraph
+    from models.symptom_normalizer import normalize_symptom
+
+    days = [
+        [{"normalized": normalize_symptom(rng.choice(PHRASES))} for _ in range(rng.randint(1, 6))]
+        for _ in range(p["graph_days"])
+    ]
+    graph = SymptomGraph()
+
+    def run():
+        for day, symptoms in enumerate(days):
+            graph.update_graph(symptoms, day)
+    return run, len(days)
+
+def bench_detect_drift(p, rng):
+    import numpy as np
+    from data.synthetic.generate_block import generate_block, to_users
+    from pipelines.drift_pipeline import detect_drift
+
+    np.random.seed(rng.randrange(2 ** 32))
+    users = to_users(generate_block(p["users"], seed=rng.randrange(2 ** 32)))
+    return lambda: [detect_drift(u["data"]) for u in users], len(users)
+
+def bench_community_aggregation(p, rng):
+    from pipelines.anonymize import anonymize_user_signal
+    from pipelines.community_pipeline import aggregate_signals, detect_weak_signal
+
+    regions = [f"Zone-{c}" for c in "ABCDEFGH"]
+    signals = [
+        anonymize_user_signal(i, rng.choice(regions), rng.random() < 0.25)
+        for i in range(p["signals"])
+    ]
+    return lambda: detect_weak_signal(aggregate_signals(signals)), len(signals)
+
+def bench_alert_pipeline_bulk(p, rng):
+    import numpy as np
+    from data.synthetic.generate_block import generate_block, to_users
+    from pipelines.alert_pipeline import build_alert_pipeline
+
+    use_stub_ner()
+    np.random.seed(rng.randrange(2 ** 32))
+    users = to_users(generate_block(p["users"], seed=rng.randrange(2 ** 32)))
+    items = [{"text": make_text(rng), "lifestyle": u["data"]} for u in users]
+    pipeline = build_alert_pipeline()
+    return lambda: list(pipeline.run_bulk(items)), len(items)
+
+def _service_module(name):
+    """
+    Import a health-suggestion-service module. The service's models.py
+    shares its name with Engine's models package, so Engine's entries are
+    set aside while the service imports and restored afterwards.
+    """
+    import importlib
+
+    if name in sys.modules:
+        return sys.modules[name]
+
+    engine_models = {k: v for k, v in sys.modules.items()
+                     if k == "models" or k.startswith("models.")}
+    for k in engine_models:
+        del sys.modules[k]
+    sys.path.insert(0, str(SERVICE_DIR))
+    try:
+        logging.disable(logging.INFO)
+        return importlib.import_module(name)
+    finally:
+        sys.path.remove(str(SERVICE_DIR))
+        sys.modules.pop("models", None)
+        sys.modules.update(engine_models)
+
+def bench_health_analyzer(p, rng):
+    HealthAnalyzer = _service_module("analyzer").HealthAnalyzer
+
+    analyzer = HealthAnalyzer()
+    requests = [
+        {"user_id": f"user-{i}", "metrics": make_metrics(rng, p["metric_days"])}
+        for i in range(p["requests"])
+    ]
+    return lambda: [analyzer.analyze(r) for r in requests], len(requests)
+
+def bench_analyze_endpoint(p, rng):
+    from fastapi.testclient import TestClient
+
+    client = TestClient(_service_module("main").app)
+    requests = [
+        {"user_id": f"user-{i}", "metrics": make_metrics(rng, p["metric_days"])}
+        for i in range(p["requests"])
+    ]
+
+    def run():
+        for r in requests:
+            response = client.post("/analyze", json=r)
+            response.raise_for_status()
+    return run, len(requests)
+
+BENCHMARKS = {
+    "normalize_symptom": bench_normalize_symptom,
+    "merge_adjacent_entities": bench_merge_adjacent_entities,
+    "extract_symptoms_batch": bench_extract_symptoms_batch,
+    "symptom_graph_update": bench_symptom_graph_update,
+    "detect_drift": bench_detect_drift,
+    "community_aggregation": bench_community_aggregation,
+    "alert_pipeline_bulk": bench_alert_pipeline_bulk,
+    "health_analyzer": bench_health_analyzer,
+    "analyze_endpoint": bench_analyze_endpoint,
+}
+
+def run_benchmark(name, params, repeat, seed):
+    timings = []
+    for i in range(repeat):
+        fn, items = BENCHMARKS[name](params, random.Random(f"{seed}:{name}:{i}"))
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    median = statistics.median(timings)
+    return {
+        "name": name,
+        "items": items,
+        "median_ms": round(median, 3),
+        "min_ms": round(min(timings), 3),
+        "items_per_s": round(items / (median / 1000), 1) if median else None,
+    }
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """
+    Annotate results with their baseline and a regression flag: slower
+    than baseline by more than tolerance and by at least min_delta_ms
+    (so sub-millisecond benchmarks do not flag on timer noise).
+    """
+    for r in results:
+        base = baseline.get(r["name"])
+        r["baseline_ms"] = base
+        r["regression"] = (
+            base is not None and
+            r["median_ms"] > base * (1 + tolerance) and
+            r["median_ms"] - base >= min_delta_ms
+        )
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Engine / service hot-path benchmarks")
+    parser.add_argument("--tier", choices=sorted(TIERS), default="small")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), metavar="NAME",
+                        help="run only these benchmarks")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown vs baseline before flagging (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                        help="ignore slowdowns smaller than this many ms")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store these medians as the tier's baseline")
+    parser.add_argument("--json", type=Path, metavar="OUT",
+                        help="also write the results as JSON")
+    args = parser.parse_args()
+
+    names = args.only or list(BENCHMARKS)
+    results = [
+        run_benchmark(name, TIERS[args.tier], args.repeat, args.seed)
+        for name in names
+    ]
+
+    baselines = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    compare(results, baselines.get(args.tier, {}), args.tolerance, args.min_delta_ms)
+
+    width = max(len(r["name"]) for r in results)
+    for r in results:
+        base = "" if r["baseline_ms"] is None else f"  baseline {r['baseline_ms']:10.2f} ms"
+        status = "  REGRESSION" if r["regression"] else ""
+        print(f"{r['name']:<{width}}  {r['median_ms']:10.2f} ms"
+              f"  {r['items_per_s']:>12,.0f} items/s{base}{status}")
+
+    if args.json:
+        report = {"tier": args.tier, "repeat": args.repeat, "seed": args.seed,
+                  "python": sys.version.split()[0], "results": results}
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.save_baseline:
+        tier = baselines.setdefault(args.tier, {})
+        tier.update({r["name"]: r["median_ms"] for r in results})
+        args.baseline.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+
+    if any(r["regression"] for r in results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
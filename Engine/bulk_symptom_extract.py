@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Bulk symptom extraction for backfills
+Streams a JSONL or CSV dump of (user_id, date, text) rows, runs batched
+extraction and writes Parquet part files with one row per symptom:
+
+  user_id, date, raw, normalized, confidence
+
+Progress is checkpointed in OUTPUT/_checkpoint.json after every part, so a
+killed job re-run with the same arguments resumes where it stopped. The
+checkpoint records the input file, format, rows per part and model, and a
+re-run with different ones is refused rather than skipping or repeating
+rows.
+Requires pyarrow.
+
+Usage:
+  python bulk_symptom_extract.py journals.jsonl out/ [--batch-size 64]
+  python bulk_symptom_extract.py journals.csv out/ --rows-per-part 50000
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+from itertools import islice
+from pathlib import Path
+
+# Add Engine directory to path
+engine_path = Path(__file__).parent
+sys.path.insert(0, str(engine_path))
+
+from tracing import profile_run
+from pipelines.symptom_pipeline import extract_symptoms_batch
+from models.ner_registry import get_registry
+
+CHECKPOINT_FILE = "_checkpoint.json"
+COLUMNS = ["user_id", "date", "raw", "normalized", "confidence"]
+
+def read_rows(path, fmt=None):
+    """Stream (user_id, date, text) from a JSONL or CSV file"""
+    fmt = fmt or ("csv" if path.suffix.lower() == ".csv" else "jsonl")
+    with open(path, newline="" if fmt == "csv" else None, encoding="utf-8") as f:
+        if fmt == "csv":
+            for row in csv.DictReader(f):
+                yield row.get("user_id"), row.get("date"), row.get("text") or ""
+        else:
+            for line in f:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                yield row.get("user_id"), row.get("date"), row.get("text") or ""
+
+def load_checkpoint(output_dir, run_args=None):
+    """
+    The checkpoint in output_dir, or a fresh one for run_args. Raises
+    SystemExit if the checkpoint was written by a run with other run_args.
+    """
+    path = output_dir / CHECKPOINT_FILE
+    if not path.exists():
+        return {"rows_done": 0, "parts": 0, "symptoms": 0, "args": run_args}
+    checkpoint = json.loads(path.read_text())
+    previous = checkpoint.get("args")
+    if run_args is not None and previous is not None and previous != run_args:
+        changed = sorted(k for k in run_args if previous.get(k) != run_args[k])
+        raise SystemExit(
+            f"{path} was written by a run with different {', '.join(changed)} "
+            f"({previous}); use a new output directory or the same arguments"
+        )
+    checkpoint["args"] = run_args
+    return checkpoint
+
+def save_checkpoint(output_dir, checkpoint):
+    """Write the checkpoint atomically (write temp file, then rename)"""
+    path = output_dir / CHECKPOINT_FILE
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(checkpoint))
+    os.replace(tmp, path)
+
+def write_part(output_dir, part, columns):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("user_id", pa.string()),
+        ("date", pa.string()),
+        ("raw", pa.string()),
+        ("normalized", pa.string()),
+        ("confidence", pa.float64()),
+    ])
+    table = pa.Table.from_pydict(columns, schema=schema)
+
+    path = output_dir / f"part-{part:05d}.parquet"
+    tmp = path.with_suffix(".tmp")
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)
+
+def extract_part(rows, batch_size, model=None):
+    """Run extraction over one part's rows; returns columnar output"""
+    columns = {name: [] for name in COLUMNS}
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        results = extract_symptoms_batch([text for _, _, text in batch], batch_size,
+                                         model=model)
+        for (user_id, date, _), symptoms in zip(batch, results):
+            for s in symptoms:
+                columns["user_id"].append(None if user_id is None else str(user_id))
+                columns["date"].append(None if date is None else str(date))
+                columns["raw"].append(s["raw"])
+                columns["normalized"].append(s["normalized"])
+                columns["confidence"].append(s["confidence"])
+    return columns
+
+def run(input_path, output_dir, batch_size, rows_per_part, fmt=None, model=None):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise SystemExit("bulk_symptom_extract requires pyarrow (pip install pyarrow)")
+
+    fmt = fmt or ("csv" if input_path.suffix.lower() == ".csv" else "jsonl")
+    run_args = {
+        "input": str(Path(input_path).resolve()),
+        "format": fmt,
+        "rows_per_part": rows_per_part,
+        "model": model
+    }
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    checkpoint = load_checkpoint(output_dir, run_args)
+    if checkpoint["rows_done"]:
+        print(f"resuming after {checkpoint['rows_done']} rows "
+              f"({checkpoint['parts']} parts written)", file=sys.stderr)
+
+    rows = read_rows(input_path, fmt)
+    rows = islice(rows, checkpoint["rows_done"], None)
+
+    started = time.perf_counter()
+    processed = 0
+    while True:
+        part_rows = list(islice(rows, rows_per_part))
+        if not part_rows:
+            break
+
+        columns = extract_part(part_rows, batch_size, model)
+        write_part(output_dir, checkpoint["parts"], columns)
+
+        checkpoint["rows_done"] += len(part_rows)
+        checkpoint["parts"] += 1
+        checkpoint["symptoms"] += len(columns["raw"])
+        save_checkpoint(output_dir, checkpoint)
+
+        processed += len(part_rows)
+        elapsed = time.perf_counter() - started
+        print(f"{checkpoint['rows_done']} rows, {checkpoint['symptoms']} symptoms, "
+              f"{processed / elapsed:.1f} texts/s", file=sys.stderr, flush=True)
+
+    return checkpoint
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk symptom extraction to Parquet")
+    parser.add_argument("input", type=Path, help="JSONL or CSV with user_id, date, text")
+    parser.add_argument("output", type=Path, help="output directory for Parquet parts")
+    parser.add_argument("--format", choices=["jsonl", "csv"],
+                        help="input format (default: from file extension)")
+    parser.add_argument("--batch-size", type=int, default=64,
+                        help="texts per inference batch")
+    parser.add_argument("--rows-per-part", type=int, default=10000,
+                        help="input rows per Parquet part / checkpoint")
+    parser.add_argument("--model", help="NER model name or Hugging Face id (default: ENGINE_NER_MODEL)")
+    args = parser.parse_args()
+
+    if args.model:
+        # A model chosen by the operator is trusted like ENGINE_NER_MODEL
+        get_registry().default = args.model
+
+    checkpoint = run(args.input, args.output, args.batch_size,
+                     args.rows_per_part, args.format, args.model)
+    print(json.dumps(checkpoint))
+
+if __name__ == "__main__":
+    with profile_run("bulk_symptom_extract"):
+        main()
@@ -0,0 +1,240 @@
+"""
+Materialized per-user daily features shared by drift detection,
+explanations and suggestions.
+
+Each user's features are updated once per new day in O(1): baseline
+(first 30 days) mean/std, lifetime mean/std, 7- and 10-day recent means,
+baseline-vs-recent drops and recent drift scores/flags. Consumers read
+the features instead of recomputing windows over the full history, and
+verify() recomputes from history to check the incremental values; they
+agree up to floating-point rounding (running sums vs. one-pass means).
+
+Days must be fed in chronological order, one update per day. Missing
+values (None/NaN) are skipped, as pandas' mean/std do, so a window mean
+is over the non-missing values among its last 7 / 10 days.
+"""
+
+import math
+from collections import deque
+
+METRICS = ("sleep_hours", "steps", "screen_time", "activity_minutes")
+BASELINE_DAYS = 30
+WINDOWS = (7, 10)
+MAX_WINDOW = max(WINDOWS)
+
+
+class RunningStats:
+    """Welford mean / sample variance over non-missing values."""
+
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def get_mean(self):
+        return self.mean if self.n else float("nan")
+
+    def get_std(self):
+        """Sample std (ddof=1); 0.0 with fewer than two values."""
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+
+class RollingWindows:
+    """Sums and counts over the last 7 / 10 days, skipping missing values; O(1) per push."""
+
+    __slots__ = ("values", "sums", "counts")
+
+    def __init__(self):
+        self.values = deque(maxlen=MAX_WINDOW)
+        self.sums = dict.fromkeys(WINDOWS, 0.0)
+        self.counts = dict.fromkeys(WINDOWS, 0)
+
+    def push(self, x):
+        for w in WINDOWS:
+            if len(self.values) >= w:
+                leaving = self.values[-w]
+                if leaving is not None:
+                    self.sums[w] -= leaving
+                    self.counts[w] -= 1
+            if x is not None:
+                self.sums[w] += x
+                self.counts[w] += 1
+        self.values.append(x)
+
+    def mean(self, window):
+        count = self.counts[window]
+        return self.sums[window] / count if count else float("nan")
+
+
+def _value(x):
+    if x is None:
+        return None
+    x = float(x)
+    return None if math.isnan(x) else x
+
+
+class UserFeatures:
+    __slots__ = ("days", "baseline", "lifetime", "recent", "drift_scores", "drift_flags")
+
+    def __init__(self):
+        self.days = 0
+        self.baseline = {m: RunningStats() for m in METRICS}
+        self.lifetime = {m: RunningStats() for m in METRICS}
+        self.recent = {m: RollingWindows() for m in METRICS}
+        self.drift_scores = RollingWindows()
+        self.drift_flags = RollingWindows()
+
+    def update(self, metrics, drift_score=None, drift_flag=None):
+        """Fold in one new day: a dict of metric values plus optional drift output."""
+        in_baseline = self.days < BASELINE_DAYS
+        for m in METRICS:
+            x = _value(metrics.get(m))
+            if x is not None:
+                self.lifetime[m].add(x)
+                if in_baseline:
+                    self.baseline[m].add(x)
+            self.recent[m].push(x)
+
+        self.drift_scores.push(_value(drift_score))
+        self.drift_flags.push(_value(drift_flag))
+        self.days += 1
+
+    def baseline_mean(self, metric):
+        return self.baseline[metric].get_mean()
+
+    def baseline_std(self, metric):
+        return self.baseline[metric].get_std()
+
+    def lifetime_mean(self, metric):
+        return self.lifetime[metric].get_mean()
+
+    def lifetime_std(self, metric):
+        return self.lifetime[metric].get_std()
+
+    def recent_mean(self, metric, window=7):
+        return self.recent[metric].mean(window)
+
+    def drop(self, metric, window=7):
+        """Baseline mean minus recent mean (positive = decreased)."""
+        return self.baseline_mean(metric) - self.recent_mean(metric, window)
+
+    def drift_score_mean(self, window=7):
+        return self.drift_scores.mean(window)
+
+    def drift_flag_count(self, window=10):
+        return int(round(self.drift_flags.sums[window]))
+
+    def as_dict(self):
+        features = {"days": self.days}
+        for m in METRICS:
+            features[f"{m}_baseline_mean"] = self.baseline_mean(m)
+            features[f"{m}_baseline_std"] = self.baseline_std(m)
+            features[f"{m}_lifetime_mean"] = self.lifetime_mean(m)
+            features[f"{m}_lifetime_std"] = self.lifetime_std(m)
+            for w in WINDOWS:
+                features[f"{m}_recent{w}_mean"] = self.recent_mean(m, w)
+                features[f"{m}_drop{w}"] = self.drop(m, w)
+        for w in WINDOWS:
+            features[f"drift_score_recent{w}_mean"] = self.drift_score_mean(w)
+            features[f"drift_flag_recent{w}_count"] = self.drift_flag_count(w)
+        return features
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Replay a chronological list of day dicts (may carry drift_score/drift_flag)."""
+        features = cls()
+        for row in rows:
+            features.update(row, row.get("drift_score"), row.get("drift_flag"))
+        return features
+
+    @classmethod
+    def from_columns(cls, history):
+        """Replay a columnar history (HistoryStore.history) of day-ordered arrays."""
+        metrics = [m for m in METRICS if m in history]
+        features = cls()
+        for i in range(len(history["day"])):
+            features.update({m: history[m][i] for m in metrics})
+        return features
+
+
+def _recompute(rows):
+    """Reference features computed from scratch over the full history."""
+    import numpy as np
+
+    def col(name):
+        return np.array([_value(r.get(name)) for r in rows], dtype=float)
+
+    def nanmean(a):
+        a = a[~np.isnan(a)]
+        return float(a.mean()) if len(a) else float("nan")
+
+    def nanstd(a):
+        a = a[~np.isnan(a)]
+        return float(a.std(ddof=1)) if len(a) > 1 else 0.0
+
+    features = {"days": len(rows)}
+    for m in METRICS:
+        values = col(m)
+        features[f"{m}_baseline_mean"] = nanmean(values[:BASELINE_DAYS])
+        features[f"{m}_baseline_std"] = nanstd(values[:BASELINE_DAYS])
+        features[f"{m}_lifetime_mean"] = nanmean(values)
+        features[f"{m}_lifetime_std"] = nanstd(values)
+        for w in WINDOWS:
+            recent = nanmean(values[-w:]) if len(values) else float("nan")
+            features[f"{m}_recent{w}_mean"] = recent
+            features[f"{m}_drop{w}"] = features[f"{m}_baseline_mean"] - recent
+    scores, flags = col("drift_score"), col("drift_flag")
+    for w in WINDOWS:
+        features[f"drift_score_recent{w}_mean"] = nanmean(scores[-w:]) if len(scores) else float("nan")
+        features[f"drift_flag_recent{w}_count"] = int(np.nansum(flags[-w:])) if len(flags) else 0
+    return features
+
+
+class FeatureStore:
+    """Per-user features keyed by user id."""
+
+    def __init__(self):
+        self.users = {}
+
+    def get(self, user_id):
+        features = self.users.get(user_id)
+        if features is None:
+            features = self.users[user_id] = UserFeatures()
+        return features
+
+    def update(self, user_id, metrics, drift_score=None, drift_flag=None):
+        features = self.get(user_id)
+        features.update(metrics, drift_score, drift_flag)
+        return features
+
+    def verify(self, user_id, rows, rel_tol=1e-9, abs_tol=1e-9):
+        """
+        Recompute a user's features from their full history and return the
+        names of features that disagree with the incremental values.
+        """
+        expected = _recompute(list(rows))
+        actual = self.get(user_id).as_dict()
+        mismatches = []
+        for name, value in expected.items():
+            got = actual[name]
+            if math.isnan(value) and math.isnan(got):
+                continue
+            if not math.isclose(got, value, rel_tol=rel_tol, abs_tol=abs_tol):
+                mismatches.append(name)
+        return mismatches
+
+    @classmethod
+    def from_history_store(cls, store):
+        """Build features for every user in a HistoryStore."""
+        feature_store = cls()
+        for user_id in store.user_ids():
+            feature_store.users[user_id] = UserFeatures.from_columns(store.history(user_id))
+        return feature_store
@@ -0,0 +1,270 @@
+"""
+Columnar, memory-mapped store of per-user daily lifestyle metrics.
+
+Local stand-in for the Postgres daily_metrics table in batch jobs.
+
+Layout under the store directory:
+  users.json             user ids; position = integer user code
+  base/                  compacted rows sorted by (user, day)
+    offsets.i64          row range of user code c is offsets[c]:offsets[c + 1]
+    day.i32              days since 1970-01-01
+    <metric>.f64         one raw float64 file per metric (NaN = missing)
+  log.bin                append-only rows not yet compacted, one
+                         fixed-size LOG_DTYPE record per row
+
+Daily ingestion appends whole records to log.bin in a single write, so a
+crash can at most leave a torn final record, which is dropped on the
+next open or append. compact() folds the log into base/ (last write wins
+for the same user and day, like the table's (userId, date) upsert).
+Reads of compacted users are zero-copy np.memmap views; users with
+un-compacted log rows get a merged copy, using a per-user index of the
+log that is built once per append rather than per read.
+"""
+
+import os
+import json
+import shutil
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+METRICS = ("sleep_hours", "steps", "screen_time", "activity_minutes")
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# daily_metrics column -> store metric
+DAILY_METRICS_COLUMNS = {
+    "sleepDuration": "sleep_hours",
+    "screenTime": "screen_time",
+    "activityMinutes": "activity_minutes",
+    "steps": "steps",
+}
+
+LOG_DTYPE = np.dtype(
+    [("user", "<i8"), ("day", "<i4")] + [(m, "<f8") for m in METRICS]
+)
+
+def to_day(value):
+    """date / ISO string / int day number -> days since 1970-01-01"""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    return value.toordinal() - EPOCH_ORDINAL
+
+def from_day(day):
+    return date.fromordinal(int(day) + EPOCH_ORDINAL)
+
+def _read(path, dtype):
+    """Memory-map a raw column file (empty files map to an empty array)."""
+    if not path.exists() or path.stat().st_size == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r")
+
+
+class HistoryStore:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.base_dir = self.path / "base"
+        self.log_path = self.path / "log.bin"
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        users_file = self.path / "users.json"
+        self.users = json.loads(users_file.read_text()) if users_file.exists() else []
+        self.codes = {user_id: code for code, user_id in enumerate(self.users)}
+        self._load()
+
+    def _load(self):
+        self.offsets = _read(self.base_dir / "offsets.i64", np.int64)
+        self.base = {"day": _read(self.base_dir / "day.i32", np.int32)}
+        for m in METRICS:
+            self.base[m] = _read(self.base_dir / f"{m}.f64", np.float64)
+
+        self._log = None
+        self._log_index = None
+        self.log_users = set(np.unique(self._log_rows()["user"]).tolist())
+
+    def _code(self, user_id):
+        code = self.codes.get(user_id)
+        if code is None:
+            code = len(self.users)
+            self.users.append(user_id)
+            self.codes[user_id] = code
+        return code
+
+    def _save_users(self):
+        tmp = self.path / "users.json.tmp"
+        tmp.write_text(json.dumps(self.users))
+        os.replace(tmp, self.path / "users.json")
+
+    def append(self, rows):
+        """
+        Append daily rows: dicts with user_id, date and any of METRICS.
+        Missing metrics are stored as NaN.
+        """
+        rows = list(rows)
+        if not rows:
+            return 0
+
+        records = np.empty(len(rows), dtype=LOG_DTYPE)
+        records["user"] = [self._code(r["user_id"]) for r in rows]
+        records["day"] = [to_day(r["date"]) for r in rows]
+        for m in METRICS:
+            records[m] = [np.nan if r.get(m) is None else r[m] for r in rows]
+
+        # users.json first: a crash before the log write leaves unused ids
+        self._save_users()
+        with open(self.log_path, "ab") as f:
+            torn = f.tell() % LOG_DTYPE.itemsize
+            if torn:
+                f.truncate(f.tell() - torn)
+            f.write(records.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._log = None
+        self._log_index = None
+        self.log_users.update(np.unique(records["user"]).tolist())
+        return len(rows)
+
+    def append_daily_metrics(self, records):
+        """Append rows shaped like the daily_metrics table (userId, date, ...)."""
+        return self.append(
+            dict(
+                {"user_id": r["userId"], "date": r["date"]},
+                **{m: r.get(col) for col, m in DAILY_METRICS_COLUMNS.items()}
+            )
+            for r in records
+        )
+
+    def _log_rows(self):
+        """Complete log records (a torn final record is ignored), cached until the next append"""
+        if self._log is None:
+            size = self.log_path.stat().st_size if self.log_path.exists() else 0
+            count = size // LOG_DTYPE.itemsize
+            if count:
+                self._log = np.fromfile(self.log_path, dtype=LOG_DTYPE, count=count)
+            else:
+                self._log = np.empty(0, dtype=LOG_DTYPE)
+        return self._log
+
+    def _log_rows_for(self, code):
+        """A user's log records in append order"""
+        log = self._log_rows()
+        if self._log_index is None:
+            order = np.argsort(log["user"], kind="stable")
+            users = log["user"][order]
+            bounds = np.flatnonzero(np.diff(users)) + 1
+            starts = np.concatenate([[0], bounds])
+            ends = np.concatenate([bounds, [len(users)]])
+            self._log_index = {
+                int(users[a]): order[a:b] for a, b in zip(starts, ends)
+            } if len(users) else {}
+        return log[self._log_index.get(code, np.empty(0, dtype=np.int64))]
+
+    def compact(self):
+        """Fold the append log into the sorted, memory-mapped base."""
+        log = self._log_rows()
+        if len(log) == 0:
+            return 0
+
+        counts = np.diff(self.offsets) if len(self.offsets) else np.empty(0, np.int64)
+        base_user = np.repeat(np.arange(len(counts), dtype=np.int64), counts)
+
+        user = np.concatenate([base_user, log["user"]])
+        day = np.concatenate([np.asarray(self.base["day"]), log["day"]])
+        columns = {
+            m: np.concatenate([np.asarray(self.base[m]), log[m]]) for m in METRICS
+        }
+
+        # Sort by (user, day); stable so later writes stay after earlier ones,
+        # then keep the last row of each (user, day) run.
+        order = np.lexsort((day, user))
+        user, day = user[order], day[order]
+        last = np.ones(len(order), dtype=bool)
+        last[:-1] = (user[1:] != user[:-1]) | (day[1:] != day[:-1])
+        user, day = user[last], day[last]
+
+        offsets = np.searchsorted(user, np.arange(len(self.users) + 1)).astype(np.int64)
+
+        new_dir = self.path / "base.new"
+        if new_dir.exists():
+            shutil.rmtree(new_dir)
+        new_dir.mkdir()
+        offsets.tofile(new_dir / "offsets.i64")
+        day.tofile(new_dir / "day.i32")
+        for m in METRICS:
+            columns[m][order][last].tofile(new_dir / f"{m}.f64")
+
+        old_dir = self.path / "base.old"
+        if self.base_dir.exists():
+            os.replace(self.base_dir, old_dir)
+        os.replace(new_dir, self.base_dir)
+        if old_dir.exists():
+            shutil.rmtree(old_dir)
+
+        # Re-applying the log after a crash here is harmless: compaction
+        # is last-write-wins per (user, day).
+        self.log_path.unlink()
+        self._load()
+        return len(log)
+
+    def user_ids(self):
+        return list(self.users)
+
+    def history(self, user_id, metrics=METRICS):
+        """
+        A user's rows as {"day": ..., metric: ...} arrays, ordered by day.
+        Zero-copy memmap views when the user has no un-compacted rows.
+        """
+        code = self.codes.get(user_id)
+        if code is None:
+            result = {"day": np.empty(0, dtype=np.int32)}
+            result.update({m: np.empty(0) for m in metrics})
+            return result
+
+        if code + 1 < len(self.offsets):
+            start, end = int(self.offsets[code]), int(self.offsets[code + 1])
+        else:
+            start = end = 0
+        result = {"day": self.base["day"][start:end]}
+        for m in metrics:
+            result[m] = self.base[m][start:end]
+
+        if code in self.log_users:
+            result = self._merge_log(code, result, metrics)
+        return result
+
+    def _merge_log(self, code, result, metrics):
+        log = self._log_rows_for(code)
+        day = np.concatenate([result["day"], log["day"]])
+        order = np.argsort(day, kind="stable")
+        day = day[order]
+        last = np.ones(len(day), dtype=bool)
+        last[:-1] = day[1:] != day[:-1]
+
+        merged = {"day": day[last]}
+        for m in metrics:
+            merged[m] = np.concatenate([result[m], log[m]])[order][last]
+        return merged
+
+    def frame(self, user_id):
+        """User history as the DataFrame detect_drift / explain_drift expect."""
+        import pandas as pd
+
+        return pd.DataFrame(self.history(user_id), copy=False)
+
+    def metrics(self, user_id):
+        """User history in the health-suggestion-service /analyze format."""
+        h = self.history(user_id, ("sleep_hours", "screen_time", "activity_minutes"))
+        return [
+            {
+                "date": from_day(d).isoformat(),
+                "sleep_duration": float(s),
+                "screen_time": float(sc),
+                "activity_minutes": float(a)
+            }
+            for d, s, sc, a in zip(
+                h["day"], h["sleep_hours"], h["screen_time"], h["activity_minutes"]
+            )
+        ]
@@ -1,7 +1,8 @@
 import numpy as np
-import pandas as pd
 
 def generate_user(days=60, drift=False):
+    import pandas as pd
+
     sleep = np.random.normal(7, 0.5, days)
     steps = np.random.normal(7000, 800, days)
 
@@ -1,14 +1,67 @@
-def explain_drift(df):
-    recent = df.tail(7)
-    baseline = df.iloc[:30]
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-    sleep_change = baseline.sleep_hours.mean() - recent.sleep_hours.mean()
-    steps_change = baseline.steps.mean() - recent.steps.mean()
+import numpy as np
+
+from tracing import traced
 
+RECENT_DAYS = 7
+BASELINE_DAYS = 30
+SLEEP_DROP_THRESHOLD = 0.8
+STEPS_DROP_THRESHOLD = 2000
+
+def _explain(sleep_change, steps_change):
     explanation = []
-    if sleep_change > 0.8:
+    if sleep_change > SLEEP_DROP_THRESHOLD:
         explanation.append("Sleep duration dropped compared to baseline")
-    if steps_change > 2000:
+    if steps_change > STEPS_DROP_THRESHOLD:
         explanation.append("Daily activity significantly reduced")
 
     return explanation
+
+@traced()
+def explain_drift(df):
+    recent = df.tail(RECENT_DAYS)
+    baseline = df.iloc[:BASELINE_DAYS]
+
+    sleep_change = baseline.sleep_hours.mean() - recent.sleep_hours.mean()
+    steps_change = baseline.steps.mean() - recent.steps.mean()
+
+    return _explain(sleep_change, steps_change)
+
+def nanmean(values):
+    """Mean skipping NaN, summed the same way pandas' Series.mean() does."""
+    values = np.asarray(values, dtype=float)
+    mask = ~np.isnan(values)
+    count = mask.sum()
+    if count == 0:
+        return float("nan")
+    return float(np.where(mask, values, 0.0).sum() / count)
+
+@traced()
+def explain_drift_arrays(sleep_hours, steps):
+    """
+    Pandas-free explain_drift over plain per-day sequences (oldest first).
+    Uses the same windows and thresholds and gives the same explanations.
+    """
+    sleep_hours = np.asarray(sleep_hours, dtype=float)
+    steps = np.asarray(steps, dtype=float)
+
+    sleep_change = (
+        nanmean(sleep_hours[:BASELINE_DAYS])
+        - nanmean(sleep_hours[-RECENT_DAYS:])
+    )
+    steps_change = (
+        nanmean(steps[:BASELINE_DAYS])
+        - nanmean(steps[-RECENT_DAYS:])
+    )
+
+    return _explain(sleep_change, steps_change)
+
+def explain_drift_from_features(features):
+    """explain_drift from a user's materialized UserFeatures (data/feature_store.py)."""
+    return _explain(
+        features.drop("sleep_hours", RECENT_DAYS),
+        features.drop("steps", RECENT_DAYS)
+    )
@@ -1,3 +1,10 @@
+SYMPTOM_WEIGHT = 0.5
+DRIFT_WEIGHT = 0.5
+
+# (upper bound, state); confidences at or above the last bound are HIGH
+STATE_BOUNDS = [(0.4, "LOW_CONFIDENCE_MONITOR"), (0.7, "MODERATE_CONFIDENCE")]
+STATES = [state for _, state in STATE_BOUNDS] + ["HIGH_CONFIDENCE"]
+
 def symptom_confidence(symptoms):
     if not symptoms:
         return 0.0
@@ -9,14 +16,105 @@ def symptom_confidence(symptoms):
 
 def alert_confidence(symptom_conf, drift_sev):
     return round(
-        0.5 * symptom_conf + 0.5 * drift_sev,
+        SYMPTOM_WEIGHT * symptom_conf + DRIFT_WEIGHT * drift_sev,
         2
     )
 
 def uncertainty_state(confidence):
-    if confidence < 0.4:
-        return "LOW_CONFIDENCE_MONITOR"
-    elif confidence < 0.7:
-        return "MODERATE_CONFIDENCE"
-    else:
-        return "HIGH_CONFIDENCE"
+    for bound, state in STATE_BOUNDS:
+        if confidence < bound:
+            return state
+    return STATES[-1]
+
+# Array versions for scoring a whole population at once. They follow the
+# scalar functions above (same weights, bounds and 2-decimal rounding).
+
+def _round2(values):
+    """
+    round(x, 2) for an array, matching Python's correctly rounded result
+    (np.round rounds the inexact product x * 100 and can differ near .5).
+    """
+    import numpy as np
+
+    values = np.asarray(values, dtype=float)
+    scaled = values * 100
+    # Exact error of the product (Dekker split of values; 100 splits exactly)
+    t = 134217729.0 * values
+    hi = t - (t - values)
+    lo = values - hi
+    err = (hi * 100 - scaled) + lo * 100
+
+    rounded = np.rint(scaled)
+    half = np.abs(scaled - rounded) == 0.5
+    rounded = np.where(half & (err > 0), scaled + 0.5, rounded)
+    rounded = np.where(half & (err < 0), scaled - 0.5, rounded)
+    return rounded / 100
+
+def symptom_confidence_grouped(user_codes, confidences, num_users):
+    """
+    Per-user mean symptom confidence from columnar rows: user_codes[i] in
+    [0, num_users) is the user of symptom i. Users without symptoms get 0.0.
+    """
+    import numpy as np
+
+    user_codes = np.asarray(user_codes, dtype=np.intp)
+    confidences = np.asarray(confidences, dtype=float)
+    totals = np.bincount(user_codes, weights=confidences, minlength=num_users)
+    counts = np.bincount(user_codes, minlength=num_users)
+    means = np.divide(totals, counts, out=np.zeros(num_users), where=counts > 0)
+    return _round2(means)
+
+def alert_confidence_array(symptom_conf, drift_sev):
+    import numpy as np
+
+    symptom_conf = np.asarray(symptom_conf, dtype=float)
+    drift_sev = np.asarray(drift_sev, dtype=float)
+    return _round2(SYMPTOM_WEIGHT * symptom_conf + DRIFT_WEIGHT * drift_sev)
+
+def uncertainty_state_codes(confidence):
+    """Index into STATES for each confidence, via np.select"""
+    import numpy as np
+
+    confidence = np.asarray(confidence, dtype=float)
+    conditions = [confidence < bound for bound, _ in STATE_BOUNDS]
+    return np.select(conditions, range(len(STATE_BOUNDS)), len(STATE_BOUNDS)).astype(np.int8)
+
+def uncertainty_states(confidence):
+    """uncertainty_state for an array, as a pandas Categorical over STATES"""
+    import pandas as pd
+
+    return pd.Categorical.from_codes(uncertainty_state_codes(confidence), STATES)
+
+def score_alerts(user_ids, drift_severity, symptom_user_ids, symptom_confidences):
+    """
+    Score every user in one vectorized pass.
+
+    user_ids / drift_severity: one entry per user.
+    symptom_user_ids / symptom_confidences: one entry per extracted symptom
+    (e.g. the user_id / confidence columns of bulk_symptom_extract output).
+    user_ids must be unique; symptoms of users not in user_ids are ignored.
+
+    Returns a DataFrame with user_id, symptom_confidence, drift_severity,
+    alert_confidence and a categorical state column.
+    """
+    import numpy as np
+    import pandas as pd
+
+    user_ids = np.asarray(user_ids)
+    symptom_confidences = np.asarray(symptom_confidences, dtype=float)
+
+    # Position of each symptom's user in user_ids (-1 if unknown)
+    codes = pd.Index(user_ids).get_indexer(np.asarray(symptom_user_ids))
+    known = codes >= 0
+    symptom_conf = symptom_confidence_grouped(
+        codes[known], symptom_confidences[known], len(user_ids)
+    )
+    alert_conf = alert_confidence_array(symptom_conf, drift_severity)
+
+    return pd.DataFrame({
+        "user_id": user_ids,
+        "symptom_confidence": symptom_conf,
+        "drift_severity": np.asarray(drift_severity, dtype=float),
+        "alert_confidence": alert_conf,
+        "state": uncertainty_states(alert_conf),
+    })
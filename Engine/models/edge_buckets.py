@@ -0,0 +1,120 @@
+"""
+Time-bucketed co-occurrence counts for windowed SymptomGraph queries.
+
+Counts live in a ring of `ring_days` day buckets. When a day falls out of
+the ring it is compacted into a ring of `ring_weeks` week buckets, and
+weeks older than that are dropped (the graph's cumulative weight still
+has them). Each bucket maps node -> {neighbor: count}, so a windowed
+query touches only the buckets in the window: windows that stay within
+the last ring_days days are exact, anything reaching further back is
+rounded out to whole weeks.
+"""
+
+RING_DAYS = 28
+RING_WEEKS = 52
+WEEK_DAYS = 7
+
+
+class EdgeTimeIndex:
+    def __init__(self, ring_days=RING_DAYS, ring_weeks=RING_WEEKS):
+        self.ring_days = ring_days
+        self.ring_weeks = ring_weeks
+        self.days = [None] * ring_days
+        self.day_buckets = [{} for _ in range(ring_days)]
+        self.weeks = [None] * ring_weeks
+        self.week_buckets = [{} for _ in range(ring_weeks)]
+        self.current_day = None
+
+    @staticmethod
+    def _count(bucket, a, b, count=1):
+        row = bucket.setdefault(a, {})
+        row[b] = row.get(b, 0) + count
+        if a != b:
+            row = bucket.setdefault(b, {})
+            row[a] = row.get(a, 0) + count
+
+    def _week_bucket(self, week):
+        """Bucket for a week, or None if it is older than the week ring"""
+        slot = week % self.ring_weeks
+        if self.weeks[slot] != week:
+            if self.weeks[slot] is not None and self.weeks[slot] > week:
+                return None
+            self.weeks[slot] = week
+            self.week_buckets[slot] = {}
+        return self.week_buckets[slot]
+
+    def _compact(self, slot):
+        """Fold a day bucket into its week bucket and free the slot"""
+        bucket = self._week_bucket(self.days[slot] // WEEK_DAYS)
+        if bucket is not None:
+            for a, row in self.day_buckets[slot].items():
+                target = bucket.setdefault(a, {})
+                for b, count in row.items():
+                    target[b] = target.get(b, 0) + count
+        self.days[slot] = None
+        self.day_buckets[slot] = {}
+
+    def _advance(self, day):
+        """Move to a later day, compacting every day that left the ring"""
+        newly_old = day - self.ring_days
+        # After a gap of any length every held day may be out of the ring,
+        # so check each slot rather than a range of days
+        for slot, held in enumerate(self.days):
+            if held is not None and held <= newly_old:
+                self._compact(slot)
+        self.current_day = day
+
+    def add(self, pairs, day):
+        """Count co-occurring (a, b) pairs on a day"""
+        if self.current_day is None or day > self.current_day:
+            self._advance(day)
+
+        if day > self.current_day - self.ring_days:
+            slot = day % self.ring_days
+            if self.days[slot] != day:
+                self.days[slot] = day
+                self.day_buckets[slot] = {}
+            bucket = self.day_buckets[slot]
+        else:
+            bucket = self._week_bucket(day // WEEK_DAYS)
+            if bucket is None:
+                return
+
+        for a, b in pairs:
+            self._count(bucket, a, b)
+
+    def _buckets(self, window, today=None):
+        """Buckets covering the last `window` days up to `today`"""
+        if self.current_day is None:
+            return
+        today = self.current_day if today is None else today
+        start = today - window + 1
+
+        # Days before ring_start were compacted into weeks, also when
+        # `today` is earlier than the current day
+        ring_start = self.current_day - self.ring_days + 1
+        for day in range(max(start, ring_start), today + 1):
+            slot = day % self.ring_days
+            if self.days[slot] == day:
+                yield self.day_buckets[slot]
+
+        last_compacted = min(today, ring_start - 1)
+        if start <= last_compacted:
+            for week in range(start // WEEK_DAYS, last_compacted // WEEK_DAYS + 1):
+                slot = week % self.ring_weeks
+                if self.weeks[slot] == week:
+                    yield self.week_buckets[slot]
+
+    def weight(self, a, b, window, today=None):
+        """Co-occurrences of a and b in the last `window` days"""
+        return sum(
+            bucket.get(a, {}).get(b, 0) for bucket in self._buckets(window, today)
+        )
+
+    def neighbors(self, symptom, window, today=None):
+        """{neighbor: co-occurrences} of symptom in the last `window` days"""
+        result = {}
+        for bucket in self._buckets(window, today):
+            for b, count in bucket.get(symptom, {}).items():
+                result[b] = result.get(b, 0) + count
+        return result
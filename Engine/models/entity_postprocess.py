@@ -0,0 +1,116 @@
+import json
+
+from models.symptom_normalizer import normalize_symptom
+
+MIN_ENTITY_SCORE = 0.6
+STOPWORDS = frozenset(["today", "now", "yesterday"])
+
+
+class Symptom:
+    """
+    Compact extracted-symptom record, returned by extract_symptoms and
+    extract_symptoms_batch in place of the old {"raw", "normalized",
+    "confidence"} dicts.
+
+    It supports the read-only dict operations callers used on those
+    dicts (symptom["normalized"], get(), keys(), `in`, dict(symptom)) and
+    compares equal to the matching dict. It is not a dict, so plain
+    json.dumps rejects it: use dumps() here or to_dict().
+    """
+
+    __slots__ = ("raw", "normalized", "confidence")
+
+    def __init__(self, raw, normalized, confidence):
+        self.raw = raw
+        self.normalized = normalized
+        self.confidence = confidence
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def keys(self):
+        return self.__slots__
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __eq__(self, other):
+        if isinstance(other, Symptom):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+    def __repr__(self):
+        return (f"Symptom(raw={self.raw!r}, normalized={self.normalized!r}, "
+                f"confidence={self.confidence!r})")
+
+    def to_dict(self):
+        return {
+            "raw": self.raw,
+            "normalized": self.normalized,
+            "confidence": self.confidence
+        }
+
+
+def _encode(obj):
+    if isinstance(obj, Symptom):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps(obj):
+    """json.dumps that also serializes Symptom records."""
+    return json.dumps(obj, default=_encode)
+
+def _finish(words, score):
+    """Filter one merged phrase and build its record, or None if dropped."""
+    if score < MIN_ENTITY_SCORE:
+        return None
+
+    word = words[0] if len(words) == 1 else " ".join(words)
+    if word.lower() in STOPWORDS:
+        return None
+
+    return Symptom(word, normalize_symptom(word), round(float(score), 2))
+
+def iter_symptoms(entities):
+    """
+    Single pass over raw NER entities: merges adjacent tokens into phrases
+    (same rule as merge_adjacent_entities), drops low-score and stopword
+    phrases, normalizes, and yields Symptom records. The pipeline's entity
+    dicts are not modified.
+    """
+    words = None
+    end = score = None
+
+    for e in entities:
+        if words is not None and e["start"] == end + 1:
+            words.append(e["word"])
+            end = e["end"]
+            if e["score"] > score:
+                score = e["score"]
+            continue
+
+        if words is not None:
+            symptom = _finish(words, score)
+            if symptom is not None:
+                yield symptom
+
+        words = [e["word"]]
+        end = e["end"]
+        score = e["score"]
+
+    if words is not None:
+        symptom = _finish(words, score)
+        if symptom is not None:
+            yield symptom
+
+def symptoms_from_entities(entities):
+    return list(iter_symptoms(entities))
@@ -0,0 +1,177 @@
+import os
+import re
+from collections import deque
+
+from models.symptom_normalizer import SYNONYMS, TEMPORAL_WORDS, normalize_symptom
+from models.entity_postprocess import Symptom
+
+# Confidence reported for symptoms answered by the gazetteer alone
+GAZETTEER_CONFIDENCE = 0.9
+
+# Words that may surround symptom phrases in a text the gazetteer can
+# answer on its own ("I feel tired today", "chest pressure and fatigue").
+FILLER_WORDS = set(TEMPORAL_WORDS) | {
+    "i", "im", "ive", "m", "ve", "s", "me", "my", "feel", "feeling", "felt",
+    "have", "having", "had", "got", "getting", "am", "is", "was", "been",
+    "a", "an", "the", "and", "with", "plus", "also", "some", "bit", "little",
+    "very", "so", "really", "still", "again", "all", "day", "night", "since",
+    "this", "last", "week", "kind", "of", "slight", "mild", "quite",
+}
+
+# Word stems that suggest a text mentions something medical at all. With
+# reject_no_signal on, texts matching none of these (and no gazetteer
+# phrase) skip the model; the list is hand-written and misses conditions
+# such as "asthma" or "diabetes", so rejection is opt-in and should be
+# checked with benchmarks/gazetteer_report.py before it is enabled.
+SIGNAL_STEMS = [
+    "ache", "anxi", "blood", "breath", "bleed", "chest", "chill", "cold",
+    "congest", "constipat", "cough", "cramp", "depress", "diarrh", "dizz",
+    "exhaust", "faint", "fatigu", "fever", "flu", "head", "heart", "hurt",
+    "ill", "infect", "inflam", "insomn", "itch", "letharg", "migraine",
+    "mood", "nause", "numb", "pain", "palpitat", "panic", "pressure", "rash",
+    "sick", "sleep", "sneez", "sore", "stomach", "stress", "sweat", "swell",
+    "swollen", "symptom", "throat", "tight", "tingl", "tired", "vomit",
+    "weak", "wheez",
+]
+
+WORD = re.compile(r"[a-z]+")
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: finds every pattern occurrence in one pass."""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        for pattern in dict.fromkeys(patterns):
+            state = 0
+            for ch in pattern:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = nxt
+            self.output[state].append(pattern)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(ch, 0)
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def finditer(self, text):
+        """Yield (start, end, pattern) for every occurrence, overlaps included."""
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            for pattern in self.output[state]:
+                yield i + 1 - len(pattern), i + 1, pattern
+
+
+class Gazetteer:
+    """
+    Known-phrase prefilter in front of the NER model.
+
+    shortcut(text) returns a symptom list when the text can be answered
+    without the model (fully covered by known phrases, or, with
+    reject_no_signal, no medical signal at all), and None when the model
+    is needed.
+    """
+
+    def __init__(self, phrases=None, confidence=GAZETTEER_CONFIDENCE,
+                 reject_no_signal=False):
+        if phrases is None:
+            phrases = set(SYNONYMS) | set(SYNONYMS.values())
+        self.phrases = {p.lower() for p in phrases}
+        self.matcher = AhoCorasick(self.phrases)
+        self.confidence = confidence
+        self.reject_no_signal = reject_no_signal
+        self.signal = re.compile(
+            r"\b(?:" + "|".join(map(re.escape, SIGNAL_STEMS)) + r")"
+        )
+
+    def matches(self, lowered):
+        """Leftmost-longest, non-overlapping whole-word phrase matches."""
+        candidates = []
+        for start, end, phrase in self.matcher.finditer(lowered):
+            if start > 0 and lowered[start - 1].isalpha():
+                continue
+            if end < len(lowered) and lowered[end].isalpha():
+                continue
+            candidates.append((start, end))
+
+        candidates.sort(key=lambda m: (m[0], -m[1]))
+        selected = []
+        last_end = -1
+        for start, end in candidates:
+            if start >= last_end:
+                selected.append((start, end))
+                last_end = end
+        return selected
+
+    def shortcut(self, text):
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            return None
+
+        spans = self.matches(lowered)
+        if not spans:
+            if self.reject_no_signal and not self.signal.search(lowered):
+                return []
+            return None
+
+        span_index = 0
+        for word in WORD.finditer(lowered):
+            while span_index < len(spans) and spans[span_index][1] <= word.start():
+                span_index += 1
+            inside = (
+                span_index < len(spans)
+                and spans[span_index][0] <= word.start()
+                and word.end() <= spans[span_index][1]
+            )
+            if not inside and word.group() not in FILLER_WORDS:
+                return None
+
+        return [
+            Symptom(
+                text[start:end],
+                normalize_symptom(text[start:end]),
+                self.confidence
+            )
+            for start, end in spans
+        ]
+
+
+_gazetteer = None
+
+def gazetteer_settings():
+    """
+    Gazetteer options from the environment:
+
+      ENGINE_GAZETTEER_CONFIDENCE   confidence of gazetteer answers (default 0.9)
+      ENGINE_GAZETTEER_REJECT       1 to answer [] for texts with no signal stem
+    """
+    reject = os.environ.get("ENGINE_GAZETTEER_REJECT", "").strip().lower()
+    return {
+        "confidence": float(os.environ.get("ENGINE_GAZETTEER_CONFIDENCE", GAZETTEER_CONFIDENCE)),
+        "reject_no_signal": reject in ("1", "true", "yes", "on"),
+    }
+
+def get_gazetteer():
+    """Shared default gazetteer built from the normalizer's vocabulary."""
+    global _gazetteer
+    if _gazetteer is None:
+        _gazetteer = Gazetteer(**gazetteer_settings())
+    return _gazetteer
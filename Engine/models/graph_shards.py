@@ -0,0 +1,236 @@
+"""
+Sharded SymptomGraph construction.
+
+Workers each build a PartialGraph over a slice of the records, a compact
+array form of the co-occurrence graph (node names plus integer edge
+arrays). Partials merge by summing edge weights and taking the maximum
+last_seen, without building networkx objects; only the final merged
+partial is turned into a SymptomGraph.
+
+Records are (symptoms, day) pairs, the same arguments update_graph
+takes, where symptoms is extract_symptoms output. For large rebuilds,
+build_graph_from_parquet has each worker read its own
+bulk_symptom_extract part file, so only the compact partials cross
+process boundaries.
+"""
+
+import os
+from itertools import combinations
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from models.symptom_graph import SymptomGraph, graph_nodes
+from models.edge_buckets import RING_DAYS
+from models.symptom_clusters import SymptomClusters
+from data.history_store import to_day
+
+
+class PartialGraph:
+    """
+    nodes: node names; node_last_seen[i] is the last day nodes[i] was seen.
+    Edge k joins nodes[src[k]] and nodes[dst[k]] (src <= dst) with
+    weight[k] co-occurrences, last seen on day last_seen[k].
+    """
+
+    def __init__(self, nodes, node_last_seen, src, dst, weight, last_seen):
+        self.nodes = list(nodes)
+        self.node_last_seen = np.asarray(node_last_seen, dtype=np.int64)
+        self.src = np.asarray(src, dtype=np.int64)
+        self.dst = np.asarray(dst, dtype=np.int64)
+        self.weight = np.asarray(weight, dtype=np.int64)
+        self.last_seen = np.asarray(last_seen, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.src)
+
+    @classmethod
+    def empty(cls):
+        return cls([], [], [], [], [], [])
+
+
+def build_partial(records):
+    """PartialGraph over (symptoms, day) records"""
+    codes = {}
+    node_last_seen = []
+    edges = {}
+
+    for symptoms, day in records:
+        node_codes = []
+        for node in graph_nodes(symptoms):
+            code = codes.get(node)
+            if code is None:
+                code = codes[node] = len(node_last_seen)
+                node_last_seen.append(day)
+            elif day > node_last_seen[code]:
+                node_last_seen[code] = day
+            node_codes.append(code)
+
+        for a, b in combinations(node_codes, 2):
+            key = (a, b) if a <= b else (b, a)
+            edge = edges.get(key)
+            if edge is None:
+                edges[key] = [1, day]
+            else:
+                edge[0] += 1
+                if day > edge[1]:
+                    edge[1] = day
+
+    keys = list(edges)
+    values = list(edges.values())
+    return PartialGraph(
+        list(codes),
+        node_last_seen,
+        [a for a, _ in keys],
+        [b for _, b in keys],
+        [w for w, _ in values],
+        [d for _, d in values]
+    )
+
+
+def merge_partials(partials):
+    """Merge PartialGraphs: sum weights, take the max of last_seen"""
+    partials = [p for p in partials if p.nodes]
+    if not partials:
+        return PartialGraph.empty()
+
+    all_nodes = np.array([n for p in partials for n in p.nodes], dtype=object)
+    nodes, inverse = np.unique(all_nodes, return_inverse=True)
+
+    node_last_seen = np.full(len(nodes), np.iinfo(np.int64).min)
+    np.maximum.at(node_last_seen, inverse,
+                  np.concatenate([p.node_last_seen for p in partials]))
+
+    # Remap each partial's node codes into the merged vocabulary
+    src, dst = [], []
+    start = 0
+    for p in partials:
+        remap = inverse[start:start + len(p.nodes)]
+        src.append(remap[p.src])
+        dst.append(remap[p.dst])
+        start += len(p.nodes)
+    src, dst = np.concatenate(src), np.concatenate(dst)
+    src, dst = np.minimum(src, dst), np.maximum(src, dst)
+
+    keys, edge_inverse = np.unique(src * len(nodes) + dst, return_inverse=True)
+    weight = np.zeros(len(keys), dtype=np.int64)
+    np.add.at(weight, edge_inverse, np.concatenate([p.weight for p in partials]))
+    last_seen = np.full(len(keys), np.iinfo(np.int64).min)
+    np.maximum.at(last_seen, edge_inverse, np.concatenate([p.last_seen for p in partials]))
+
+    return PartialGraph(nodes.tolist(), node_last_seen,
+                        keys // len(nodes), keys % len(nodes), weight, last_seen)
+
+
+def partial_from_graph(symptom_graph):
+    """PartialGraph of an existing SymptomGraph, e.g. to merge new shards into it"""
+    graph = symptom_graph.graph
+    nodes = list(graph.nodes)
+    codes = {node: i for i, node in enumerate(nodes)}
+    edges = list(graph.edges(data=True))
+    pairs = [sorted((codes[a], codes[b])) for a, b, _ in edges]
+    return PartialGraph(
+        nodes,
+        [graph.nodes[n]["last_seen"] for n in nodes],
+        [a for a, _ in pairs],
+        [b for _, b in pairs],
+        [d["weight"] for _, _, d in edges],
+        [d["last_seen"] for _, _, d in edges]
+    )
+
+
+def to_symptom_graph(partial):
+    """Materialize a PartialGraph as a SymptomGraph (bulk networkx inserts)"""
+    symptom_graph = SymptomGraph()
+    nodes = partial.nodes
+    symptom_graph.graph.add_nodes_from(
+        (node, {"last_seen": int(day)})
+        for node, day in zip(nodes, partial.node_last_seen)
+    )
+    symptom_graph.graph.add_edges_from(
+        (nodes[a], nodes[b], {"weight": int(w), "last_seen": int(d)})
+        for a, b, w, d in zip(partial.src.tolist(), partial.dst.tolist(),
+                              partial.weight.tolist(), partial.last_seen.tolist())
+    )
+    symptom_graph.clusters = SymptomClusters.from_graph(
+        symptom_graph.graph, symptom_graph.clusters.threshold
+    )
+    return symptom_graph
+
+
+def build_graph_sharded(records, workers=None, shards=None, recent_days=RING_DAYS):
+    """
+    Build a SymptomGraph from (symptoms, day) records with `workers`
+    processes over `shards` contiguous slices (default: one per worker).
+
+    The windowed edge index is filled by replaying only records from the
+    last `recent_days` days, which keeps windowed queries up to that
+    length exact.
+    """
+    records = list(records)
+    workers = workers or os.cpu_count() or 1
+    shards = shards or workers
+    size = -(-len(records) // shards) if records else 0
+    slices = [records[i:i + size] for i in range(0, len(records), size)] if size else []
+
+    if workers == 1 or len(slices) <= 1:
+        partials = [build_partial(s) for s in slices]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = list(pool.map(build_partial, slices))
+
+    symptom_graph = to_symptom_graph(merge_partials(partials))
+
+    if records and recent_days:
+        latest = max(day for _, day in records)
+        for symptoms, day in records:
+            if day > latest - recent_days:
+                symptom_graph.edge_index.add(combinations(graph_nodes(symptoms), 2), day)
+    return symptom_graph
+
+
+def _parquet_records(path):
+    """
+    (symptoms, day) records from a bulk_symptom_extract part file: rows
+    with the same consecutive (user_id, date) form one record.
+    """
+    import pyarrow.parquet as pq
+
+    columns = pq.read_table(path, columns=["user_id", "date", "normalized"]).to_pydict()
+    records = []
+    key = None
+    for user_id, date, normalized in zip(columns["user_id"], columns["date"],
+                                         columns["normalized"]):
+        if (user_id, date) != key:
+            key = (user_id, date)
+            records.append(([], to_day(date)))
+        records[-1][0].append({"normalized": normalized})
+    return records
+
+def _partial_from_parquet(path):
+    return build_partial(_parquet_records(path))
+
+def build_graph_from_parquet(paths, workers=None, recent_days=RING_DAYS):
+    """
+    Build a SymptomGraph from bulk_symptom_extract Parquet parts, one
+    part per task. Dates become day numbers (days since 1970-01-01).
+    """
+    paths = [str(p) for p in paths]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(paths) <= 1:
+        partials = [_partial_from_parquet(p) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = list(pool.map(_partial_from_parquet, paths))
+
+    merged = merge_partials(partials)
+    symptom_graph = to_symptom_graph(merged)
+
+    if recent_days and len(merged.node_last_seen):
+        latest = int(merged.node_last_seen.max())
+        for path in paths:
+            for symptoms, day in _parquet_records(path):
+                if day > latest - recent_days:
+                    symptom_graph.edge_index.add(combinations(graph_nodes(symptoms), 2), day)
+    return symptom_graph
@@ -0,0 +1,175 @@
+"""
+Bounded-memory trending-symptom counts per region and time bucket.
+
+SpaceSaving keeps at most `capacity` counters: when a new item arrives
+and the summary is full, the smallest counter is reassigned to it (its
+count becomes an overestimate, recorded as `error`). Every item whose
+true count exceeds total / capacity is guaranteed to be tracked, and
+count - error <= true count <= count. Summaries from different workers
+merge into one with the same guarantee.
+"""
+
+import heapq
+
+DEFAULT_CAPACITY = 200
+BUCKET_DAYS = 7
+
+
+class SpaceSaving:
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.total = 0
+        # (count, item) entries; stale ones are skipped when popped
+        self._heap = []
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __contains__(self, item):
+        return item in self.counts
+
+    def _min_entry(self):
+        while self._heap:
+            count, item = self._heap[0]
+            if self.counts.get(item) == count:
+                return count, item
+            heapq.heappop(self._heap)
+        return None
+
+    def _push(self, item):
+        heapq.heappush(self._heap, (self.counts[item], item))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c, i) for i, c in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def add(self, item, count=1):
+        self.total += count
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+        else:
+            floor, evicted = self._min_entry()
+            del self.counts[evicted]
+            del self.errors[evicted]
+            self.counts[item] = floor + count
+            self.errors[item] = floor
+        self._push(item)
+
+    def min_count(self):
+        """Upper bound on the count of any item not tracked"""
+        if len(self.counts) < self.capacity:
+            return 0
+        return self._min_entry()[0]
+
+    def estimate(self, item):
+        """(count, error) for item; untracked items get (0, min_count())"""
+        if item in self.counts:
+            return self.counts[item], self.errors[item]
+        return 0, self.min_count()
+
+    def top(self, k=10):
+        """The k largest counters as (item, count, error), largest first"""
+        ranked = heapq.nlargest(k, self.counts.items(), key=lambda kv: (kv[1], kv[0]))
+        return [(item, count, self.errors[item]) for item, count in ranked]
+
+    def merge(self, other):
+        """
+        Merge another summary into this one. Items missing from one side
+        are charged that side's min_count() as both count and error, then
+        the largest `capacity` counters are kept.
+        """
+        floor_self, floor_other = self.min_count(), other.min_count()
+        counts, errors = {}, {}
+        for item in set(self.counts) | set(other.counts):
+            c1, e1 = (self.counts[item], self.errors[item]) if item in self.counts else (floor_self, floor_self)
+            c2, e2 = (other.counts[item], other.errors[item]) if item in other.counts else (floor_other, floor_other)
+            counts[item] = c1 + c2
+            errors[item] = e1 + e2
+
+        keep = heapq.nlargest(self.capacity, counts, key=lambda item: (counts[item], item))
+        self.counts = {item: counts[item] for item in keep}
+        self.errors = {item: errors[item] for item in keep}
+        self.total += other.total
+        self._heap = [(c, i) for i, c in self.counts.items()]
+        heapq.heapify(self._heap)
+        return self
+
+    def to_dict(self):
+        return {
+            "capacity": self.capacity,
+            "total": self.total,
+            "counters": [[item, self.counts[item], self.errors[item]] for item in self.counts]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        summary = cls(data["capacity"])
+        summary.total = data["total"]
+        for item, count, error in data["counters"]:
+            summary.counts[item] = count
+            summary.errors[item] = error
+        summary._heap = [(c, i) for i, c in summary.counts.items()]
+        heapq.heapify(summary._heap)
+        return summary
+
+
+class TrendingSymptoms:
+    """
+    One SpaceSaving summary per (region, bucket), where bucket is the day
+    number // bucket_days (weeks by default). Memory is bounded by
+    capacity per region and bucket regardless of the number of users or
+    distinct symptom strings.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, bucket_days=BUCKET_DAYS):
+        self.capacity = capacity
+        self.bucket_days = bucket_days
+        self.summaries = {}
+
+    def bucket(self, day):
+        return day // self.bucket_days
+
+    def summary(self, region, bucket):
+        key = (region, bucket)
+        if key not in self.summaries:
+            self.summaries[key] = SpaceSaving(self.capacity)
+        return self.summaries[key]
+
+    def add(self, region, day, symptoms):
+        """Count one user's extract_symptoms output for a day"""
+        summary = self.summary(region, self.bucket(day))
+        for s in symptoms:
+            summary.add(s["normalized"])
+
+    def top(self, region, bucket, k=10):
+        key = (region, bucket)
+        return self.summaries[key].top(k) if key in self.summaries else []
+
+    def regions(self):
+        return sorted({region for region, _ in self.summaries})
+
+    def merge(self, other):
+        for (region, bucket), summary in other.summaries.items():
+            self.summary(region, bucket).merge(summary)
+        return self
+
+    def to_dict(self):
+        return {
+            "capacity": self.capacity,
+            "bucket_days": self.bucket_days,
+            "summaries": [
+                [region, bucket, summary.to_dict()]
+                for (region, bucket), summary in self.summaries.items()
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        trending = cls(data["capacity"], data["bucket_days"])
+        for region, bucket, summary in data["summaries"]:
+            trending.summaries[(region, bucket)] = SpaceSaving.from_dict(summary)
+        return trending
@@ -0,0 +1,204 @@
+"""
+Named NER backends, loaded on demand under a memory budget.
+
+Models are looked up by name: an entry in MODELS or a loader added with
+register(). A Hugging Face model id (a name containing "/") is loaded
+as a token-classification pipeline with simple aggregation only when it
+is the configured default or the registry allows arbitrary ids
+(ENGINE_NER_ALLOW_ANY, or --allow-any-model on the CLIs), so clients
+naming a model in a request cannot trigger downloads.
+
+Loading a model measures its footprint (parameter and buffer bytes for
+torch models, otherwise the process RSS growth during the load) and
+runs it once on WARMUP_TEXT before it is handed out, so the first real
+request does not pay for lazy initialization. get(warmup=False) skips
+that run, e.g. to load weights in a parent process that forks workers
+before any inference thread pool exists. When the loaded models
+together exceed budget_mb, the least recently used ones are dropped
+(never the one just requested). Callers still holding an evicted model
+can finish with it; its memory is freed when they let go.
+
+  ENGINE_NER_MODEL       default model name (default "biomedical")
+  ENGINE_NER_BUDGET_MB   memory budget for loaded models (default 2048)
+  ENGINE_NER_ALLOW_ANY   1/true: load any Hugging Face id by name
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+
+MODELS = {
+    "biomedical": {"model": "d4data/biomedical-ner-all", "aggregation_strategy": "simple"},
+}
+DEFAULT_MODEL = os.environ.get("ENGINE_NER_MODEL", "biomedical")
+DEFAULT_BUDGET_MB = float(os.environ.get("ENGINE_NER_BUDGET_MB", 2048))
+ALLOW_ANY_MODEL = os.environ.get("ENGINE_NER_ALLOW_ANY", "").strip().lower() in ("1", "true", "yes", "on")
+WARMUP_TEXT = "I feel chest tightness and shortness of breath"
+
+def _rss_mb():
+    import resource
+
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / (1024 * 1024)
+    except (OSError, IndexError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def model_footprint_mb(ner):
+    """Parameter + buffer size of a transformers pipeline's torch model, or None"""
+    model = getattr(ner, "model", None)
+    if model is None or not hasattr(model, "parameters"):
+        return None
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors) / (1024 * 1024)
+
+def pipeline_loader(**kwargs):
+    """Loader building a transformers NER pipeline (imports transformers lazily)"""
+    def load():
+        from transformers import pipeline
+
+        return pipeline("ner", **kwargs)
+    return load
+
+
+class LoadedModel:
+    def __init__(self, name, ner, footprint_mb, load_seconds):
+        self.name = name
+        self.ner = ner
+        self.footprint_mb = footprint_mb
+        self.load_seconds = load_seconds
+        self.last_used = time.monotonic()
+        self.uses = 0
+
+
+class NERRegistry:
+    def __init__(self, budget_mb=DEFAULT_BUDGET_MB, default=DEFAULT_MODEL,
+                 allow_arbitrary=ALLOW_ANY_MODEL):
+        self.budget_mb = budget_mb
+        self.default = default
+        self.allow_arbitrary = allow_arbitrary
+        self.loaders = {name: pipeline_loader(**kwargs) for name, kwargs in MODELS.items()}
+        self.loaded = OrderedDict()
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._loading = {}
+
+    def register(self, name, loader=None, **pipeline_kwargs):
+        """
+        Add model `name`, built by loader() or, without a loader, as a
+        transformers NER pipeline from pipeline_kwargs (model=..., ...).
+        """
+        if loader is None:
+            if "model" not in pipeline_kwargs:
+                raise ValueError("register() needs a loader or a model id")
+            loader = pipeline_loader(**pipeline_kwargs)
+        with self._lock:
+            self.loaders[name] = loader
+            self.loaded.pop(name, None)
+
+    def put(self, name, ner, footprint_mb=0.0):
+        """Install an already built model as `name` (ready, no warm-up)"""
+        with self._lock:
+            self.loaded[name] = LoadedModel(name, ner, footprint_mb, 0.0)
+            self.loaded.move_to_end(name)
+            self._evict(keep=name)
+
+    def _loader(self, name):
+        loader = self.loaders.get(name)
+        if loader is None and "/" in name and (self.allow_arbitrary or name == self.default):
+            loader = pipeline_loader(model=name, aggregation_strategy="simple")
+        if loader is None:
+            known = sorted(set(self.loaders) | set(self.loaded))
+            raise KeyError(f"unknown NER model {name!r} (known: {known})")
+        return loader
+
+    def get(self, name=None, warmup=True):
+        """
+        The ready model `name` (default model if None), loading it if
+        needed; a model loaded here runs WARMUP_TEXT first unless warmup
+        is False.
+        """
+        if name is not None and not isinstance(name, str):
+            raise ValueError("NER model name must be a string")
+        name = name or self.default
+        with self._lock:
+            entry = self.loaded.get(name)
+            if entry is not None:
+                self.loaded.move_to_end(name)
+                entry.last_used = time.monotonic()
+                entry.uses += 1
+                return entry.ner
+            # One thread loads a given model; others asking for it wait
+            loading = self._loading.get(name)
+            if loading is None:
+                loading = self._loading[name] = threading.Lock()
+
+        with loading:
+            with self._lock:
+                entry = self.loaded.get(name)
+            if entry is None:
+                entry = self._load(name, warmup)
+                with self._lock:
+                    self.loaded[name] = entry
+                    self._evict(keep=name)
+                    self._loading.pop(name, None)
+
+        with self._lock:
+            entry.last_used = time.monotonic()
+            entry.uses += 1
+        return entry.ner
+
+    def _load(self, name, warmup=True):
+        loader = self._loader(name)
+        rss = _rss_mb()
+        started = time.perf_counter()
+        ner = loader()
+        if warmup:
+            ner(WARMUP_TEXT)
+        load_seconds = time.perf_counter() - started
+
+        footprint = model_footprint_mb(ner)
+        if footprint is None:
+            footprint = max(_rss_mb() - rss, 0.0)
+        return LoadedModel(name, ner, footprint, load_seconds)
+
+    def _evict(self, keep):
+        """Drop least recently used models until within budget (lock held)"""
+        while self.memory_mb() > self.budget_mb and len(self.loaded) > 1:
+            victim = next(name for name in self.loaded if name != keep)
+            del self.loaded[victim]
+            self.evictions += 1
+
+    def evict(self, name):
+        with self._lock:
+            return self.loaded.pop(name, None) is not None
+
+    def memory_mb(self):
+        return sum(entry.footprint_mb for entry in self.loaded.values())
+
+    def stats(self):
+        with self._lock:
+            return {
+                "budget_mb": self.budget_mb,
+                "memory_mb": round(self.memory_mb(), 1),
+                "evictions": self.evictions,
+                "models": {
+                    name: {
+                        "footprint_mb": round(entry.footprint_mb, 1),
+                        "load_seconds": round(entry.load_seconds, 3),
+                        "uses": entry.uses
+                    }
+                    for name, entry in self.loaded.items()
+                }
+            }
+
+
+_registry = None
+
+def get_registry():
+    """Shared default registry"""
+    global _registry
+    if _registry is None:
+        _registry = NERRegistry()
+    return _registry
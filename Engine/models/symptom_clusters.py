@@ -0,0 +1,123 @@
+"""
+Incremental symptom clusters for SymptomGraph.
+
+A cluster is a connected group of symptoms joined by edges whose
+co-occurrence weight has reached `threshold`. Edge weights only grow, so
+clusters only ever merge and a union-find maintains them as edges cross
+the threshold; cluster_of() is a near-constant-time find.
+
+Finer community structure inside a cluster is computed on demand with
+networkx on that cluster's subgraph only, cached, and recomputed only
+when the cluster has changed (new members or heavier internal edges)
+since it was last computed.
+"""
+
+DEFAULT_THRESHOLD = 3
+
+
+class UnionFind:
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def __contains__(self, item):
+        return item in self.parent
+
+    def add(self, item):
+        if item not in self.parent:
+            self.parent[item] = item
+            self.size[item] = 1
+
+    def find(self, item):
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a, b):
+        """Merge the sets of a and b; returns (root, absorbed root or None)"""
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return ra, None
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        return ra, rb
+
+
+class SymptomClusters:
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.sets = UnionFind()
+        self.members = {}
+        self.dirty = set()
+        self._communities = {}
+
+    def add_node(self, symptom):
+        if symptom not in self.sets:
+            self.sets.add(symptom)
+            self.members[symptom] = {symptom}
+
+    def edge_updated(self, a, b, weight):
+        """Record that edge (a, b) now has `weight` co-occurrences"""
+        if weight < self.threshold or a == b:
+            return
+        self.add_node(a)
+        self.add_node(b)
+        root, absorbed = self.sets.union(a, b)
+        if absorbed is not None:
+            self.members[root] |= self.members.pop(absorbed)
+            self._communities.pop(absorbed, None)
+            self.dirty.discard(absorbed)
+        self.dirty.add(root)
+
+    def cluster_of(self, symptom):
+        """Cluster id (its root symptom), or None for an unknown symptom"""
+        if symptom not in self.sets:
+            return None
+        return self.sets.find(symptom)
+
+    def cluster_members(self, symptom):
+        root = self.cluster_of(symptom)
+        return set(self.members[root]) if root is not None else set()
+
+    def clusters(self, min_size=2):
+        return [set(m) for m in self.members.values() if len(m) >= min_size]
+
+    def communities(self, symptom, graph):
+        """
+        Communities (list of sets) within symptom's cluster, over edges at
+        or above the threshold. Cached until the cluster changes.
+        """
+        import networkx as nx
+
+        root = self.cluster_of(symptom)
+        if root is None:
+            return []
+        if root in self.dirty or root not in self._communities:
+            subgraph = nx.Graph()
+            subgraph.add_nodes_from(self.members[root])
+            subgraph.add_edges_from(
+                (a, b, d)
+                for a, b, d in graph.subgraph(self.members[root]).edges(data=True)
+                if d["weight"] >= self.threshold and a != b
+            )
+            self._communities[root] = [
+                set(c) for c in nx.community.louvain_communities(
+                    subgraph, weight="weight", seed=0
+                )
+            ]
+            self.dirty.discard(root)
+        return self._communities[root]
+
+    @classmethod
+    def from_graph(cls, graph, threshold=DEFAULT_THRESHOLD):
+        """Build clusters for an existing networkx co-occurrence graph"""
+        clusters = cls(threshold)
+        for node in graph.nodes:
+            clusters.add_node(node)
+        for a, b, d in graph.edges(data=True):
+            clusters.edge_updated(a, b, d["weight"])
+        return clusters
@@ -1,32 +1,70 @@
-import networkx as nx
 from itertools import combinations
 
+from models.edge_buckets import EdgeTimeIndex
+from models.symptom_clusters import SymptomClusters, DEFAULT_THRESHOLD
+
+def graph_nodes(symptoms):
+    """Normalized multi-word symptoms that become graph nodes."""
+    return [
+        s["normalized"]
+        for s in symptoms
+        if len(s["normalized"].split()) >= 2
+    ]
+
 class SymptomGraph:
-    def __init__(self):
+    def __init__(self, cluster_threshold=DEFAULT_THRESHOLD):
+        import networkx as nx
+
         self.graph = nx.Graph()
+        self.edge_index = EdgeTimeIndex()
+        self.clusters = SymptomClusters(cluster_threshold)
 
     def update_graph(self, symptoms, day):
-        nodes = [
-            s["normalized"]
-            for s in symptoms
-            if len(s["normalized"].split()) >= 2
-        ]
+        nodes = graph_nodes(symptoms)
 
         for node in nodes:
             if not self.graph.has_node(node):
                 self.graph.add_node(node, last_seen=day)
+                self.clusters.add_node(node)
             else:
                 self.graph.nodes[node]["last_seen"] = day
 
+        threshold = self.clusters.threshold
         for a, b in combinations(nodes, 2):
             if self.graph.has_edge(a, b):
-                self.graph[a][b]["weight"] += 1
-                self.graph[a][b]["last_seen"] = day
+                edge = self.graph[a][b]
+                edge["weight"] += 1
+                edge["last_seen"] = day
+                weight = edge["weight"]
             else:
                 self.graph.add_edge(a, b, weight=1, last_seen=day)
+                weight = 1
+            if weight >= threshold:
+                self.clusters.edge_updated(a, b, weight)
+
+        self.edge_index.add(combinations(nodes, 2), day)
 
 
     def get_relationships(self, symptom):
         if symptom in self.graph:
             return self.graph[symptom]
         return {}
+
+    def windowed_weight(self, a, b, days, today=None):
+        """Co-occurrences of a and b in the last `days` days (up to today)"""
+        return self.edge_index.weight(a, b, days, today)
+
+    def windowed_relationships(self, symptom, days, today=None):
+        """{neighbor: co-occurrences} of symptom in the last `days` days"""
+        return self.edge_index.neighbors(symptom, days, today)
+
+    def cluster_of(self, symptom):
+        """Id of symptom's cluster (symptoms linked by edges at the threshold)"""
+        return self.clusters.cluster_of(symptom)
+
+    def symptom_clusters(self, min_size=2):
+        return self.clusters.clusters(min_size)
+
+    def communities(self, symptom):
+        """Communities within symptom's cluster, recomputed only if it changed"""
+        return self.clusters.communities(symptom, self.graph)
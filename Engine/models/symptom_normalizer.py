@@ -2,6 +2,17 @@ import re
 
 TEMPORAL_WORDS = ["today", "now", "yesterday", "tonight", "morning", "evening"]
 
+SYNONYMS = {
+    "chest tightness": "chest discomfort",
+    "tight chest": "chest discomfort",
+    "pressure in chest": "chest discomfort",
+    "chest pressure": "chest discomfort",
+    "shortness of breath": "breathing difficulty",
+    "breathing difficulty": "breathing difficulty",
+    "fatigue": "fatigue",
+    "tired": "fatigue"
+}
+
 def normalize_symptom(text):
     text = text.lower()
 
@@ -13,15 +24,4 @@ def normalize_symptom(text):
     text = re.sub(r"[^a-z\s]", "", text)
     text = re.sub(r"\s+", " ", text).strip()
 
-    synonyms = {
-        "chest tightness": "chest discomfort",
-        "tight chest": "chest discomfort",
-        "pressure in chest": "chest discomfort",
-        "chest pressure": "chest discomfort",
-        "shortness of breath": "breathing difficulty",
-        "breathing difficulty": "breathing difficulty",
-        "fatigue": "fatigue",
-        "tired": "fatigue"
-    }
-
-    return synonyms.get(text, text)
+    return SYNONYMS.get(text, text)
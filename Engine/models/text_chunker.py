@@ -0,0 +1,86 @@
+import re
+
+# Conservative character budget per chunk; biomedical vocabulary splits into
+# many word pieces, so this stays well under the model's 512-token limit.
+MAX_CHUNK_CHARS = 800
+DEFAULT_BATCH_SIZE = 16
+
+SENTENCE_END = re.compile(r"[.!?;\n]+\s*")
+
+def _sentence_spans(text, max_chars):
+    """(start, end) of each sentence; over-long sentences are cut at spaces."""
+    start = 0
+    ends = [m.end() for m in SENTENCE_END.finditer(text)]
+    if not ends or ends[-1] < len(text):
+        ends.append(len(text))
+
+    for end in ends:
+        while end - start > max_chars:
+            cut = text.rfind(" ", start + 1, start + max_chars)
+            if cut <= start:
+                cut = start + max_chars
+            yield start, cut
+            start = cut
+        if end > start:
+            yield start, end
+        start = end
+
+def chunk_text(text, max_chars=MAX_CHUNK_CHARS):
+    """
+    Split text into sentence-aligned chunks of at most max_chars.
+    Returns [(chunk, offset)] where offset is the chunk's start in text.
+    """
+    if len(text) <= max_chars:
+        return [(text, 0)]
+
+    chunks = []
+    chunk_start = chunk_end = None
+    for start, end in _sentence_spans(text, max_chars):
+        if chunk_start is None:
+            chunk_start, chunk_end = start, end
+        elif end - chunk_start <= max_chars:
+            chunk_end = end
+        else:
+            chunks.append((text[chunk_start:chunk_end], chunk_start))
+            chunk_start, chunk_end = start, end
+    if chunk_start is not None:
+        chunks.append((text[chunk_start:chunk_end], chunk_start))
+
+    return [(chunk, offset) for chunk, offset in chunks if chunk.strip()]
+
+def length_buckets(lengths, batch_size=DEFAULT_BATCH_SIZE):
+    """Group indices into batches of similar length to minimise padding."""
+    order = sorted(range(len(lengths)), key=lengths.__getitem__)
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+def run_ner_batched(ner, texts, batch_size=DEFAULT_BATCH_SIZE,
+                    max_chars=MAX_CHUNK_CHARS):
+    """
+    Run an NER pipeline over many texts: long texts are chunked, chunks are
+    batched by length, and entities come back per original text in order
+    with start/end offsets relative to that text.
+    """
+    chunks = []
+    owners = []
+    for index, text in enumerate(texts):
+        for chunk, offset in chunk_text(text, max_chars):
+            chunks.append((chunk, offset))
+            owners.append(index)
+
+    chunk_entities = [None] * len(chunks)
+    for bucket in length_buckets([len(c) for c, _ in chunks], batch_size):
+        batch = [chunks[i][0] for i in bucket]
+        outputs = ner(batch, batch_size=len(batch))
+        for i, entities in zip(bucket, outputs):
+            offset = chunks[i][1]
+            if offset:
+                entities = [
+                    dict(e, start=e["start"] + offset, end=e["end"] + offset)
+                    for e in entities
+                ]
+            chunk_entities[i] = entities
+
+    results = [[] for _ in texts]
+    for owner, entities in zip(owners, chunk_entities):
+        results[owner].extend(entities)
+    return results
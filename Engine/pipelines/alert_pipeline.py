@@ -0,0 +1,75 @@
+"""
+Symptom extraction, drift detection, graph update and alert confidence
+wired as one Pipeline (pipelines/dag.py).
+
+  text ──> symptoms ──> symptom_confidence ──┐
+             │                               ├──> alert_confidence, state
+  lifestyle ─┼──> drift_severity ────────────┘
+             └──> (graph update, with `graph` and a `day` source)
+
+NER and drift detection for the same user have no dependency on each
+other and run concurrently.
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipelines.dag import Pipeline
+
+def _drift_severity(lifestyle):
+    from pipelines.drift_pipeline import detect_drift, drift_severity
+
+    return drift_severity(detect_drift(lifestyle))
+
+def _alert(symptom_conf, drift_sev):
+    from models.confidence import alert_confidence, uncertainty_state
+
+    confidence = alert_confidence(symptom_conf, drift_sev)
+    return confidence, uncertainty_state(confidence)
+
+def build_alert_pipeline(graph=None, model=None, ner_batch_size=32, drift_workers=1,
+                         queue_size=64, max_in_flight=None):
+    """
+    Pipeline with sources `text` and `lifestyle` (a generate_user style
+    DataFrame; detect_drift adds its drift columns to it), plus `day` when
+    a SymptomGraph is given to update. Symptoms come from NER model
+    `model` (default model if None).
+
+    The graph stage has one worker and the symptoms stage is FIFO, so in
+    bulk mode the graph sees days in input order.
+    """
+    from functools import partial
+    from pipelines.symptom_pipeline import extract_symptoms, extract_symptoms_batch
+    from models.confidence import symptom_confidence
+
+    pipeline = Pipeline(queue_size=queue_size, max_in_flight=max_in_flight)
+    pipeline.add("symptoms", partial(extract_symptoms, model=model), "text", "symptoms",
+                 batch_fn=partial(extract_symptoms_batch, model=model),
+                 batch_size=ner_batch_size)
+    pipeline.add("symptom_confidence", symptom_confidence, "symptoms", "symptom_confidence")
+    pipeline.add("drift", _drift_severity, "lifestyle", "drift_severity",
+                 workers=drift_workers)
+    pipeline.add("alert", _alert, ("symptom_confidence", "drift_severity"),
+                 ("alert_confidence", "state"))
+    if graph is not None:
+        pipeline.add("graph", graph.update_graph, ("symptoms", "day"))
+    return pipeline
+
+if __name__ == "__main__":
+    import json
+    from data.synthetic.generate_lifestyle import generate_user
+    from models.symptom_graph import SymptomGraph
+
+    graph = SymptomGraph()
+    pipeline = build_alert_pipeline(graph)
+    texts = [
+        "I have chest tightness and shortness of breath",
+        "Breathing difficulty and fatigue today",
+        "Chest pressure with fatigue"
+    ]
+    items = ({"text": t, "lifestyle": generate_user(), "day": day}
+             for day, t in enumerate(texts))
+    for result in pipeline.run_bulk(items):
+        print(result["text"], "->", result["alert_confidence"], result["state"])
+    print(json.dumps(pipeline.stats(), indent=2))
@@ -1,5 +1,21 @@
-def anonymize_user_signal(user_id, region, drift_flag):
-    return {
+from models.distinct_count import register_and_rank
+
+def anonymize_user_signal(user_id, region, drift_flag, salt=None, symptoms=None, day=None):
+    """
+    Region-level signal without the user id. Only the user's HyperLogLog
+    register and rank (from a salted hash) are kept, so aggregate_signals
+    can count distinct users. With symptoms (extract_symptoms output) and
+    the day they were reported, the signal also carries their normalized
+    names for aggregate_symptom_trends.
+    """
+    register, rank = register_and_rank(user_id, salt=salt)
+    signal = {
         "region": region,
-        "drift_flag": int(drift_flag)
+        "drift_flag": int(drift_flag),
+        "hll_register": register,
+        "hll_rank": rank
     }
+    if symptoms is not None:
+        signal["day"] = int(day)
+        signal["symptoms"] = [s["normalized"] for s in symptoms]
+    return signal
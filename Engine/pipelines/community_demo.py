@@ -1,39 +1,51 @@
 import sys
+import random
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from data.synthetic.generate_population import generate_population
 from pipelines.drift_pipeline import detect_drift
+from data.feature_store import FeatureStore
 from pipelines.anonymize import anonymize_user_signal
+from models.heavy_hitters import BUCKET_DAYS
 from pipelines.community_pipeline import (
     aggregate_signals,
-    detect_weak_signal
+    detect_weak_signal,
+    aggregate_symptom_trends,
+    detect_symptom_trends
 )
 
 population = generate_population(num_users=30, region="Zone-A")
 
-signals = []
+# A user's drift model scores each day against their baseline alone, so
+# the scores are computed up front and fed in with the day they belong to
+rows_by_user = {}
 for user in population:
-    df = detect_drift(user["data"])
+    rows_by_user[user["user_id"]] = detect_drift(user["data"]).to_dict("records")
 
-    recent = df.tail(10)
+# Daily ingestion: each new day updates every user's features in O(1)
+features = FeatureStore()
+for day in range(max(len(rows) for rows in rows_by_user.values())):
+    for user_id, rows in rows_by_user.items():
+        if day < len(rows):
+            row = rows[day]
+            features.update(user_id, row, row["drift_score"], row["drift_flag"])
 
-    sleep_drop = (
-        df.sleep_hours.iloc[:30].mean()
-        - recent.sleep_hours.mean()
-    )
-    
-    steps_drop = (
-        df.steps.iloc[:30].mean()
-        - recent.steps.mean()
-    )
+signals = []
+drifting = set()
+for user in population:
+    user_features = features.get(user["user_id"])
+
+    sleep_drop = user_features.drop("sleep_hours", 10)
+    steps_drop = user_features.drop("steps", 10)
     
     drift_detected = (
-        recent.drift_flag.sum() >= 3 and
+        user_features.drift_flag_count(10) >= 3 and
         sleep_drop > 1.0 and
         steps_drop > 1500
     )
-
+    if drift_detected:
+        drifting.add(user["user_id"])
 
     signals.append(
         anonymize_user_signal(
@@ -46,7 +58,34 @@ for user in population:
 summary = aggregate_signals(signals)
 alerts = detect_weak_signal(summary)
 
+# Symptom reports (stand-ins for extract_symptoms output): background
+# complaints every week, plus fatigue and breathing difficulty from
+# drifting users in the current week
+rng = random.Random(0)
+num_days = max(len(rows) for rows in rows_by_user.values())
+this_week = (num_days - 1) // BUCKET_DAYS * BUCKET_DAYS
+symptom_signals = []
+for user in population:
+    for day in range(this_week - BUCKET_DAYS, num_days):
+        reported = [s for s in ("headache", "back pain", "fatigue") if rng.random() < 0.1]
+        if user["user_id"] in drifting and day >= this_week:
+            reported += [s for s in ("fatigue", "breathing difficulty") if rng.random() < 0.6]
+        symptom_signals.append(
+            anonymize_user_signal(
+                user["user_id"],
+                user["region"],
+                user["user_id"] in drifting,
+                symptoms=[{"normalized": s} for s in reported],
+                day=day
+            )
+        )
+
+trending = aggregate_symptom_trends(symptom_signals)
+trend_alerts = detect_symptom_trends(trending, trending.bucket(this_week))
+
 print("Community summary:")
 print(summary)
 print("\nAlerts:")
 print(alerts)
+print("\nSymptom trends:")
+print(trend_alerts)
@@ -1,19 +1,43 @@
-import pandas as pd
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from tracing import traced, count
+
+@traced()
 def aggregate_signals(anonymized_signals):
+    """
+    Per-region totals. signals is the number of signals received;
+    total_users / drift_users are approximate distinct user counts
+    (HyperLogLog over the signals' register/rank pairs), so repeated
+    submissions from one user are counted once; signals without them fall
+    back to counting rows.
+    """
+    import pandas as pd
+
     df = pd.DataFrame(anonymized_signals)
+    count("signals", len(df))
 
     summary = df.groupby("region").agg(
+        signals=("drift_flag", "count"),
         total_users=("drift_flag", "count"),
         drift_users=("drift_flag", "sum")
     ).reset_index()
 
+    if "hll_register" in df.columns:
+        from models.distinct_count import RegionUserCounts
+
+        distinct = RegionUserCounts.from_frame(df).counts()
+        summary["total_users"] = [distinct[r][0] for r in summary["region"]]
+        summary["drift_users"] = [distinct[r][1] for r in summary["region"]]
+
     summary["drift_ratio"] = (
         summary["drift_users"] / summary["total_users"]
     )
 
     return summary
 
+@traced()
 def detect_weak_signal(summary_df):
     alerts = []
 
@@ -26,3 +50,67 @@ def detect_weak_signal(summary_df):
             })
 
     return alerts
+
+@traced()
+def aggregate_symptom_trends(anonymized_signals, trending=None):
+    """
+    Count the normalized symptoms carried by signals (anonymize_user_signal
+    with symptoms and day) into a per-region, per-bucket TrendingSymptoms
+    sketch, creating one if `trending` is None. Signals without symptoms
+    are skipped. Returns the sketch, ready for detect_symptom_trends.
+    """
+    from models.heavy_hitters import TrendingSymptoms
+
+    if trending is None:
+        trending = TrendingSymptoms()
+
+    reported = 0
+    for signal in anonymized_signals:
+        symptoms = signal.get("symptoms")
+        if not symptoms:
+            continue
+        summary = trending.summary(signal["region"], trending.bucket(signal["day"]))
+        for symptom in symptoms:
+            summary.add(symptom)
+        reported += len(symptoms)
+    count("symptoms", reported)
+
+    return trending
+
+@traced()
+def detect_symptom_trends(trending, bucket, k=5, min_count=10, min_growth=2.0):
+    """
+    Flag symptoms spiking in a region: among the top-k symptoms of the
+    given bucket, those whose guaranteed count (count - error) is at least
+    min_count and min_growth times the previous bucket's upper-bound count.
+
+    trending: models.heavy_hitters.TrendingSymptoms
+    """
+    alerts = []
+
+    for region in trending.regions():
+        previous = trending.summaries.get((region, bucket - 1))
+
+        for symptom, upper, error in trending.top(region, bucket, k):
+            current = upper - error
+            if current < min_count:
+                continue
+
+            if previous is None:
+                before = 0
+            else:
+                prev_count, prev_floor = previous.estimate(symptom)
+                before = prev_count or prev_floor
+
+            growth = current / max(before, 1)
+            if growth >= min_growth:
+                alerts.append({
+                    "region": region,
+                    "signal": "SYMPTOM_TREND",
+                    "symptom": symptom,
+                    "count": current,
+                    "previous": before,
+                    "growth": round(growth, 2)
+                })
+
+    return alerts
@@ -2,31 +2,16 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from pipelines.symptom_pipeline import extract_symptoms
+from pipelines.alert_pipeline import build_alert_pipeline
 from data.synthetic.generate_lifestyle import generate_user
-from pipelines.drift_pipeline import detect_drift, drift_severity
-from models.confidence import (
-    symptom_confidence,
-    alert_confidence,
-    uncertainty_state
-)
 
-# symptoms
-symptoms = extract_symptoms(
-    "I feel chest tightness and shortness of breath"
+# symptoms and drift run concurrently, confidence once both are ready
+result = build_alert_pipeline().run(
+    text="I feel chest tightness and shortness of breath",
+    lifestyle=generate_user()
 )
 
-# lifestyle
-df = generate_user()
-df = detect_drift(df)
-
-# confidence
-symp_conf = symptom_confidence(symptoms)
-drift_conf = drift_severity(df)
-final_conf = alert_confidence(symp_conf, drift_conf)
-state = uncertainty_state(final_conf)
-
-print("Symptom confidence:", symp_conf)
-print("Drift severity:", drift_conf)
-print("Alert confidence:", final_conf)
-print("State:", state)
+print("Symptom confidence:", result["symptom_confidence"])
+print("Drift severity:", result["drift_severity"])
+print("Alert confidence:", result["alert_confidence"])
+print("State:", result["state"])
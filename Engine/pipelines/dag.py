@@ -0,0 +1,404 @@
+"""
+In-process dataflow executor for Engine pipelines.
+
+A Pipeline is a DAG of stages. Each stage declares the named values it
+reads (inputs) and the values it produces (outputs); inputs no stage
+produces are the pipeline's sources. Stages run on threads, so NER
+(torch) and drift detection (numpy / scikit-learn) for the same user
+overlap where they release the GIL.
+
+  run(**sources)      per-request: runs every stage once, starting each as
+                      soon as its inputs are ready; returns all values
+  run_bulk(items)     bulk: streams dicts of sources through per-stage
+                      worker threads joined by bounded queues; yields each
+                      item's values in input order
+
+In bulk mode a worker blocks while the next stage's queue is full and at
+most max_in_flight items are admitted at once, so a slow stage throttles
+everything upstream instead of letting work pile up. A stage may give a
+batch_fn that takes lists of inputs and returns a list of results (e.g.
+extract_symptoms_batch); bulk workers then drain up to batch_size queued
+items per call; if it returns a different number of results than it
+was given items, every item of that batch gets an error. An item whose
+stage raised is yielded with an "error" entry and skips the stages after
+it; run() raises instead. If a worker thread dies (an exception escaping
+the stage handling, or a BaseException from a stage), run_bulk raises
+RuntimeError instead of waiting forever.
+
+stats() reports per-stage items, calls, busy time and throughput.
+"""
+
+import sys
+import time
+import queue
+import threading
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tracing import stage as trace_stage, count
+
+POLL_SECONDS = 0.05
+RESERVED = ("error",)
+
+
+class Stage:
+    def __init__(self, name, fn, inputs, outputs, workers=1, batch_fn=None, batch_size=32):
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.workers = workers
+        self.batch_fn = batch_fn
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.items = 0
+        self.calls = 0
+        self.busy = 0.0
+        self.first = None
+        self.last = None
+        self.max_queue = 0
+
+    def _split(self, result):
+        """Map a return value onto the declared outputs"""
+        if not self.outputs:
+            return {}
+        if len(self.outputs) == 1:
+            return {self.outputs[0]: result}
+        result = tuple(result)
+        if len(result) != len(self.outputs):
+            raise ValueError(f"stage {self.name!r} returned {len(result)} values "
+                             f"for outputs {self.outputs}")
+        return dict(zip(self.outputs, result))
+
+    def call(self, args):
+        """Run on one item's input values; returns {output: value}"""
+        started = time.perf_counter()
+        with trace_stage(f"dag.{self.name}"):
+            result = self.fn(*args)
+        self._record(started, time.perf_counter(), 1)
+        return self._split(result)
+
+    def call_batch(self, batch_args):
+        """Run batch_fn on several items' input values; returns one dict per item"""
+        started = time.perf_counter()
+        with trace_stage(f"dag.{self.name}", items=len(batch_args)):
+            results = self.batch_fn(*(list(column) for column in zip(*batch_args)))
+        self._record(started, time.perf_counter(), len(batch_args))
+        return [self._split(result) for result in results]
+
+    def _record(self, started, ended, items):
+        count(f"dag.{self.name}.items", items)
+        with self._lock:
+            self.items += items
+            self.calls += 1
+            self.busy += ended - started
+            if self.first is None or started < self.first:
+                self.first = started
+            if self.last is None or ended > self.last:
+                self.last = ended
+
+    def stats(self):
+        span = (self.last - self.first) if self.calls else 0.0
+        return {
+            "items": self.items,
+            "calls": self.calls,
+            "workers": self.workers,
+            "busy_s": round(self.busy, 4),
+            "items_per_s": round(self.items / span, 1) if span > 0 else None,
+            "utilization": round(self.busy / (span * self.workers), 3) if span > 0 else None,
+            "max_queue": self.max_queue
+        }
+
+
+def _attempt(s, args):
+    """s.call(args), or the exception it raised"""
+    try:
+        return s.call(args)
+    except Exception as e:
+        return e
+
+
+class _Item:
+    def __init__(self, index, values, waiting, remaining):
+        self.index = index
+        self.values = values
+        self.waiting = waiting
+        self.remaining = remaining
+        self.error = None
+        self.lock = threading.Lock()
+
+    def result(self):
+        if self.error is not None:
+            return dict(self.values, error=self.error)
+        return self.values
+
+
+class Pipeline:
+    def __init__(self, queue_size=64, max_in_flight=None):
+        self.queue_size = queue_size
+        self.max_in_flight = max_in_flight or queue_size
+        self.stages = {}
+        self.producers = {}
+        self._graph = None
+
+    def add(self, name, fn, inputs=(), outputs=(), workers=1, batch_fn=None, batch_size=32):
+        """Add stage `name` computing `outputs` from `inputs` with fn(*inputs)"""
+        if name in self.stages:
+            raise ValueError(f"duplicate stage {name!r}")
+        if isinstance(inputs, str):
+            inputs = (inputs,)
+        if isinstance(outputs, str):
+            outputs = (outputs,)
+        for output in outputs:
+            if output in RESERVED:
+                raise ValueError(f"{output!r} is reserved and cannot be a stage output")
+            if output in self.producers:
+                raise ValueError(f"{output!r} is already produced by stage "
+                                 f"{self.producers[output]!r}")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+
+        self.stages[name] = Stage(name, fn, inputs, outputs, workers, batch_fn, batch_size)
+        for output in outputs:
+            self.producers[output] = name
+        self._graph = None
+        return self
+
+    def stage(self, inputs=(), outputs=(), name=None, **options):
+        """Decorator form of add()"""
+        def decorate(fn):
+            self.add(name or fn.__name__, fn, inputs, outputs, **options)
+            return fn
+        return decorate
+
+    @property
+    def sources(self):
+        """Values the caller must supply"""
+        return {k for s in self.stages.values() for k in s.inputs if k not in self.producers}
+
+    def _build(self):
+        """Upstream stage counts and downstream stage lists; rejects cycles"""
+        if self._graph is not None:
+            return self._graph
+
+        upstream = {}
+        downstream = {name: [] for name in self.stages}
+        for name, s in self.stages.items():
+            parents = {self.producers[k] for k in s.inputs if k in self.producers}
+            upstream[name] = len(parents)
+            for parent in parents:
+                downstream[parent].append(name)
+
+        # Kahn's algorithm: every stage must become ready
+        waiting = dict(upstream)
+        ready = [name for name, n in waiting.items() if n == 0]
+        seen = 0
+        while ready:
+            name = ready.pop()
+            seen += 1
+            for child in downstream[name]:
+                waiting[child] -= 1
+                if waiting[child] == 0:
+                    ready.append(child)
+        if seen != len(self.stages):
+            cyclic = sorted(name for name, n in waiting.items() if n > 0)
+            raise ValueError(f"stages form a cycle: {cyclic}")
+
+        self._graph = (upstream, downstream)
+        return self._graph
+
+    def _missing(self, values):
+        missing = self.sources - values.keys()
+        if missing:
+            return f"missing inputs: {sorted(missing)}"
+        return None
+
+    def stats(self):
+        return {name: s.stats() for name, s in self.stages.items()}
+
+    def reset_stats(self):
+        for s in self.stages.values():
+            s.reset_stats()
+
+    def run(self, **sources):
+        """Run every stage once on `sources`; returns sources plus all outputs"""
+        from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+        upstream, downstream = self._build()
+        missing = self._missing(sources)
+        if missing:
+            raise ValueError(missing)
+
+        values = dict(sources)
+        waiting = dict(upstream)
+        ready = [self.stages[name] for name, n in waiting.items() if n == 0]
+
+        with ThreadPoolExecutor(max_workers=max(len(self.stages), 1)) as pool:
+            pending = {}
+            while ready or pending:
+                for s in ready:
+                    future = pool.submit(s.call, [values[k] for k in s.inputs])
+                    pending[future] = s
+                ready = []
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    s = pending.pop(future)
+                    values.update(future.result())
+                    for child in downstream[s.name]:
+                        waiting[child] -= 1
+                        if waiting[child] == 0:
+                            ready.append(self.stages[child])
+        return values
+
+    def run_bulk(self, items):
+        """
+        Stream dicts of sources through the stages; yields one values dict
+        per item, in input order.
+        """
+        upstream, downstream = self._build()
+        stop = threading.Event()
+        queues = {name: queue.Queue(self.queue_size) for name in self.stages}
+        finished = queue.Queue()
+        admit = threading.Semaphore(self.max_in_flight)
+        roots = [name for name, n in upstream.items() if n == 0]
+
+        def put(q, item):
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=POLL_SECONDS)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def get(q):
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=POLL_SECONDS)
+                except queue.Empty:
+                    pass
+            return None
+
+        def done_with(item, name):
+            """Hand item on to the stages waiting on `name`"""
+            for child in downstream[name]:
+                with item.lock:
+                    item.waiting[child] -= 1
+                    ready = item.waiting[child] == 0
+                if ready:
+                    put(queues[child], item)
+                    s = self.stages[child]
+                    s.max_queue = max(s.max_queue, queues[child].qsize())
+            with item.lock:
+                item.remaining -= 1
+                last = item.remaining == 0
+            if last:
+                finished.put(item)
+
+        def work(s):
+            try:
+                work_loop(s)
+            except BaseException as e:
+                finished.put(("crashed", s.name, e))
+
+        def work_loop(s):
+            q = queues[s.name]
+            while True:
+                item = get(q)
+                if item is None:
+                    return
+                batch = [item]
+                while s.batch_fn is not None and len(batch) < s.batch_size:
+                    try:
+                        batch.append(q.get_nowait())
+                    except queue.Empty:
+                        break
+
+                live = [i for i in batch if i.error is None]
+                args = [[i.values[k] for k in s.inputs] for i in live]
+                if s.batch_fn is not None and live:
+                    try:
+                        results = s.call_batch(args)
+                    except Exception:
+                        # Retry one by one so one bad item does not fail the batch
+                        results = [_attempt(s, a) for a in args]
+                else:
+                    results = [_attempt(s, a) for a in args]
+                if len(results) != len(live):
+                    mismatch = ValueError(f"stage {s.name!r} batch_fn returned {len(results)} "
+                                          f"results for {len(live)} items")
+                    results = [mismatch] * len(live)
+
+                for i, result in zip(live, results):
+                    if isinstance(result, Exception):
+                        i.error = {"stage": s.name, "message": str(result)}
+                    else:
+                        i.values.update(result)
+                for i in batch:
+                    done_with(i, s.name)
+
+        def feed():
+            fed = 0
+            try:
+                for index, sources in enumerate(items):
+                    while not admit.acquire(timeout=POLL_SECONDS):
+                        if stop.is_set():
+                            return
+                    item = _Item(index, dict(sources), dict(upstream), len(self.stages))
+                    fed += 1
+                    missing = self._missing(item.values)
+                    if missing:
+                        item.error = {"stage": None, "message": missing}
+                    if not self.stages:
+                        finished.put(item)
+                    for name in roots:
+                        if not put(queues[name], item):
+                            return
+                finished.put(("fed", fed, None))
+            except Exception as e:
+                finished.put(("fed", fed, e))
+
+        feeder = threading.Thread(target=feed, name="dag-feed", daemon=True)
+        workers = [
+            threading.Thread(target=work, args=(s,), name=f"dag-{s.name}-{n}", daemon=True)
+            for s in self.stages.values() for n in range(s.workers)
+        ]
+        for t in [feeder] + workers:
+            t.start()
+
+        try:
+            total = None
+            yielded = 0
+            buffer = {}
+            while total is None or yielded < total:
+                try:
+                    message = finished.get(timeout=POLL_SECONDS)
+                except queue.Empty:
+                    # Workers only exit once stop is set, and the feeder
+                    # reports before it exits
+                    dead = [t.name for t in workers if not t.is_alive()]
+                    if total is None and not feeder.is_alive() and finished.empty():
+                        dead.append(feeder.name)
+                    if dead:
+                        raise RuntimeError(f"pipeline threads exited unexpectedly: {dead}")
+                    continue
+                if isinstance(message, tuple):
+                    kind, value, error = message
+                    if kind == "crashed":
+                        raise RuntimeError(f"stage {value!r} worker crashed: {error!r}") from error
+                    total = value
+                    if error is not None:
+                        raise error
+                    continue
+                buffer[message.index] = message
+                while yielded in buffer:
+                    item = buffer.pop(yielded)
+                    yielded += 1
+                    admit.release()
+                    yield item.result()
+        finally:
+            stop.set()
@@ -2,27 +2,143 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from pyod.models.iforest import IForest
-import pandas as pd
-from data.synthetic.generate_lifestyle import generate_user
-def detect_drift(df):
-    baseline = df.iloc[:30][["sleep_hours", "steps"]]
-    model = IForest(contamination=0.15)
-    model.fit(baseline.values)
+from tracing import traced, count
 
-    scores = model.decision_function(df[["sleep_hours", "steps"]].values)
+FEATURES = ["sleep_hours", "steps"]
+BASELINE_DAYS = 30
+ACTIVITY_BANDS = [(5000, "low"), (8000, "mid")]
 
-    df["drift_score"] = scores
-    df["drift_flag"] = model.predict(df[["sleep_hours", "steps"]].values)
+def drift_scores(values):
+    """
+    IForest fitted on the first BASELINE_DAYS rows of a (days, 2) array of
+    sleep_hours / steps; returns (drift_score, drift_flag) per row.
+    """
+    from pyod.models.iforest import IForest
 
+    model = IForest(contamination=0.15)
+    model.fit(values[:BASELINE_DAYS])
+    count("drift_rows", len(values))
+    return model.decision_function(values), model.predict(values)
+
+@traced()
+def detect_drift(df):
+    scores, flags = drift_scores(df[FEATURES].values)
+    df["drift_score"] = scores
+    df["drift_flag"] = flags
     return df
 
+@traced()
+def detect_drift_history(history):
+    """
+    detect_drift over a HistoryStore history (data/history_store.py): reads
+    its sleep_hours / steps slices directly, without building a DataFrame.
+    Returns (drift_score, drift_flag) arrays in day order.
+    """
+    import numpy as np
+
+    return drift_scores(np.column_stack([history[f] for f in FEATURES]))
+
+def baseline_stats(df):
+    """Per-user baseline mean and std (ddof=1) of each drift feature"""
+    import numpy as np
+
+    baseline = df.iloc[:BASELINE_DAYS][FEATURES].to_numpy(dtype=float)
+    mean = baseline.mean(axis=0)
+    std = baseline.std(axis=0, ddof=1) if len(baseline) > 1 else np.zeros(len(FEATURES))
+    std[~(std > 0)] = 1.0
+    return mean, std
+
+def standardize(df):
+    """Z-normalize a user's features against their own baseline"""
+    mean, std = baseline_stats(df)
+    return (df[FEATURES].to_numpy(dtype=float) - mean) / std
+
+def region_cohort(user):
+    return user["region"]
+
+def activity_band_cohort(user):
+    """Cohort by baseline daily steps: low / mid / high"""
+    steps = user["data"]["steps"].iloc[:BASELINE_DAYS].mean()
+    for limit, band in ACTIVITY_BANDS:
+        if steps < limit:
+            return band
+    return "high"
+
+@traced()
+def fit_cohort_models(users, cohort_of=region_cohort, max_fit_rows=200000, seed=0):
+    """
+    Fit one IForest per cohort on the pooled z-normalized baselines of its
+    users. Baselines are subsampled to max_fit_rows per cohort.
+    """
+    import numpy as np
+    from pyod.models.iforest import IForest
+
+    pooled = {}
+    for user in users:
+        z = standardize(user["data"])[:BASELINE_DAYS]
+        pooled.setdefault(cohort_of(user), []).append(z)
+
+    rng = np.random.default_rng(seed)
+    models = {}
+    for cohort, blocks in pooled.items():
+        baseline = np.vstack(blocks)
+        if len(baseline) > max_fit_rows:
+            baseline = baseline[rng.choice(len(baseline), max_fit_rows, replace=False)]
+        model = IForest(contamination=0.15, random_state=seed)
+        model.fit(baseline)
+        models[cohort] = model
+    return models
+
+@traced()
+def detect_drift_cohort(users, cohort_of=region_cohort, models=None):
+    """
+    Cohort alternative to calling detect_drift per user: each user's days
+    are z-normalized with their own baseline and scored against their
+    cohort's shared model. Adds drift_score / drift_flag to each user's
+    DataFrame like detect_drift does. Returns the cohort models so they
+    can be reused for later scoring; cohorts missing from `models` are
+    fitted on their users here.
+    """
+    import numpy as np
+
+    if models is None:
+        models = fit_cohort_models(users, cohort_of)
+
+    by_cohort = {}
+    for user in users:
+        by_cohort.setdefault(cohort_of(user), []).append(user)
+
+    # Cohorts not seen when `models` was fitted get a model fitted on their
+    # members now, and are added to the returned models
+    unseen = [u for cohort, members in by_cohort.items() if cohort not in models for u in members]
+    if unseen:
+        models = {**models, **fit_cohort_models(unseen, cohort_of)}
+
+    for cohort, members in by_cohort.items():
+        model = models[cohort]
+        blocks = [standardize(user["data"]) for user in members]
+        stacked = np.vstack(blocks)
+        scores = model.decision_function(stacked)
+        flags = model.predict(stacked)
+
+        start = 0
+        for user, block in zip(members, blocks):
+            end = start + len(block)
+            user["data"]["drift_score"] = scores[start:end]
+            user["data"]["drift_flag"] = flags[start:end]
+            start = end
+        count("drift_rows", len(stacked))
+
+    return models
+
 def drift_severity(df):
     recent = df.tail(7)
     score = abs(recent["drift_score"].mean())
     return min(round(score, 2), 1.0)
 
 if __name__ == "__main__":
+    from data.synthetic.generate_lifestyle import generate_user
+
     df = generate_user()
     result = detect_drift(df)
     print(result.tail())
@@ -2,19 +2,24 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from pipelines.symptom_pipeline import extract_symptoms
+from pipelines.dag import Pipeline
+from pipelines.symptom_pipeline import extract_symptoms, extract_symptoms_batch
 from models.symptom_graph import SymptomGraph
 
 graph = SymptomGraph()
 
+pipeline = Pipeline()
+pipeline.add("symptoms", extract_symptoms, "text", "symptoms",
+             batch_fn=extract_symptoms_batch)
+pipeline.add("graph", graph.update_graph, ("symptoms", "day"))
+
 texts = [
     "I have chest tightness and shortness of breath",
     "Breathing difficulty and fatigue today",
     "Chest pressure with fatigue"
 ]
 
-for day, t in enumerate(texts):
-    symptoms = extract_symptoms(t)
-    graph.update_graph(symptoms, day)
+for _ in pipeline.run_bulk({"text": t, "day": day} for day, t in enumerate(texts)):
+    pass
 
 print(graph.graph.edges(data=True))
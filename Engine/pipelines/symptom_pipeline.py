@@ -2,34 +2,50 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from transformers import pipeline
-from models.symptom_normalizer import normalize_symptom
-from models.phrase_merger import merge_adjacent_entities
-
-ner = pipeline(
-    "ner",
-    model="d4data/biomedical-ner-all",
-    aggregation_strategy="simple"
-)
-
-def extract_symptoms(text):
-    entities = ner(text)
-    entities = merge_adjacent_entities(entities)
-
-    symptoms = []
-    for e in entities:
-        if e["score"] < 0.6:
-            continue
-
-        if e["word"].lower() in ["today", "now", "yesterday"]:
-            continue
-
-        normalized = normalize_symptom(e["word"])
-
-        symptoms.append({
-            "raw": e["word"],
-            "normalized": normalized,
-            "confidence": round(e["score"], 2)
-        })
-
-    return symptoms
\ No newline at end of file
+from models.entity_postprocess import symptoms_from_entities
+from models.text_chunker import run_ner_batched, DEFAULT_BATCH_SIZE
+from models.gazetteer import get_gazetteer
+from models.ner_registry import get_registry
+from tracing import traced, stage, count
+
+def get_ner(model=None, warmup=True):
+    """The ready NER model `model` (default model if None), loaded on first use."""
+    return get_registry().get(model, warmup)
+
+def extract_symptoms(text, model=None):
+    return extract_symptoms_batch([text], model=model)[0]
+
+@traced()
+def extract_symptoms_batch(texts, batch_size=DEFAULT_BATCH_SIZE, prefilter=True, model=None):
+    """
+    Extract symptoms from many texts with chunked, length-bucketed inference
+    on NER model `model` (see models/ner_registry.py). Texts the gazetteer
+    can answer (fully known phrases, or no medical signal) skip the model
+    unless prefilter is False. The gazetteer stands in for the default
+    model only, so it is not used when a model is named.
+
+    Each text's symptoms are Symptom records (models/entity_postprocess.py),
+    which read like the old dicts; serialize them with dumps() or
+    to_dict().
+    """
+    results = [None] * len(texts)
+    pending = []
+    gazetteer = get_gazetteer() if prefilter and model is None else None
+    for i, text in enumerate(texts):
+        shortcut = gazetteer.shortcut(text) if gazetteer else None
+        if shortcut is None:
+            pending.append(i)
+        else:
+            results[i] = shortcut
+
+    count("texts", len(texts))
+    count("gazetteer_answered", len(texts) - len(pending))
+
+    if pending:
+        with stage("ner_inference", texts=len(pending), model=model):
+            batch = run_ner_batched(get_ner(model), [texts[i] for i in pending], batch_size)
+        for i, entities in zip(pending, batch):
+            count("entities", len(entities))
+            results[i] = symptoms_from_entities(entities)
+
+    return results
\ No newline at end of file
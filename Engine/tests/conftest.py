@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Engine modules import each other from the Engine directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+import pyarrow.parquet as pq
+
+import bulk_symptom_extract
+
+def fake_extract(texts, batch_size, model=None):
+    return [
+        [{"raw": word, "normalized": word.lower(), "confidence": 0.9} for word in text.split()]
+        for text in texts
+    ]
+
+def write_input(path, rows):
+    path.write_text("".join(
+        json.dumps({"user_id": f"u{i % 3}", "date": f"2024-01-{i % 28 + 1:02d}",
+                    "text": f"Symptom{i} fatigue"}) + "\n"
+        for i in range(rows)
+    ))
+
+def read_output(output_dir):
+    return [pq.read_table(p).to_pylist() for p in sorted(output_dir.glob("part-*.parquet"))]
+
+@pytest.fixture
+def journals(tmp_path, monkeypatch):
+    monkeypatch.setattr(bulk_symptom_extract, "extract_symptoms_batch", fake_extract)
+    path = tmp_path / "journals.jsonl"
+    write_input(path, 25)
+    return path
+
+def test_resume_after_kill_matches_clean_run(tmp_path, journals, monkeypatch):
+    clean = bulk_symptom_extract.run(journals, tmp_path / "clean", 4, 10)
+
+    write_part = bulk_symptom_extract.write_part
+    def killed_after_first_part(output_dir, part, columns):
+        if part == 1:
+            raise KeyboardInterrupt
+        write_part(output_dir, part, columns)
+
+    monkeypatch.setattr(bulk_symptom_extract, "write_part", killed_after_first_part)
+    with pytest.raises(KeyboardInterrupt):
+        bulk_symptom_extract.run(journals, tmp_path / "resumed", 4, 10)
+    assert len(read_output(tmp_path / "resumed")) == 1
+
+    monkeypatch.setattr(bulk_symptom_extract, "write_part", write_part)
+    resumed = bulk_symptom_extract.run(journals, tmp_path / "resumed", 4, 10)
+
+    assert resumed == clean
+    assert read_output(tmp_path / "resumed") == read_output(tmp_path / "clean")
+
+def test_resume_with_other_arguments_is_refused(tmp_path, journals):
+    output = tmp_path / "out"
+    bulk_symptom_extract.run(journals, output, 4, 10)
+
+    with pytest.raises(SystemExit, match="rows_per_part"):
+        bulk_symptom_extract.run(journals, output, 4, 5)
+    with pytest.raises(SystemExit, match="format"):
+        bulk_symptom_extract.run(journals, output, 4, 10, fmt="csv")
+    other = tmp_path / "other.jsonl"
+    write_input(other, 25)
+    with pytest.raises(SystemExit, match="input"):
+        bulk_symptom_extract.run(other, output, 4, 10)
+
+    # Batch size does not change the output, so it may differ
+    assert bulk_symptom_extract.run(journals, output, 8, 10)["rows_done"] == 25
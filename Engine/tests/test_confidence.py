@@ -0,0 +1,44 @@
+import numpy as np
+
+from models.confidence import (
+    _round2,
+    alert_confidence,
+    score_alerts,
+    symptom_confidence,
+    uncertainty_state
+)
+
+def test_round2_matches_python_round():
+    rng = np.random.default_rng(0)
+    # Many values sit exactly on or next to a .xx5 boundary
+    values = np.concatenate([
+        rng.random(100000),
+        np.round(rng.random(100000), 3),
+        np.arange(0, 1, 0.005),
+        np.nextafter(np.arange(0, 1, 0.005), 2),
+        np.nextafter(np.arange(0, 1, 0.005), -1),
+    ])
+    assert _round2(values).tolist() == [round(v, 2) for v in values.tolist()]
+
+def test_score_alerts_matches_scalar_functions():
+    rng = np.random.default_rng(1)
+    num_users = 2000
+    user_ids = [f"user-{i}" for i in range(num_users)]
+    drift = np.round(rng.random(num_users), 3)
+
+    # Symptoms in random user order, some for users not being scored
+    symptom_users = rng.choice(user_ids + ["unknown"], size=6000)
+    symptom_conf = np.round(rng.uniform(0.3, 1.0, size=6000), 3)
+
+    scored = score_alerts(user_ids, drift, symptom_users, symptom_conf)
+
+    by_user = {u: [] for u in user_ids}
+    for user, conf in zip(symptom_users.tolist(), symptom_conf.tolist()):
+        if user in by_user:
+            by_user[user].append({"confidence": conf})
+    for row, user, sev in zip(scored.itertuples(), user_ids, drift.tolist()):
+        s_conf = symptom_confidence(by_user[user])
+        a_conf = alert_confidence(s_conf, sev)
+        assert row.user_id == user
+        assert (row.symptom_confidence, row.alert_confidence) == (s_conf, a_conf)
+        assert row.state == uncertainty_state(a_conf)
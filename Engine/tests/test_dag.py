@@ -0,0 +1,71 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pipelines.dag import Pipeline
+
+def double_batch(xs):
+    return [2 * x for x in xs]
+
+def build(batch_fn=double_batch, **stage_options):
+    pipeline = Pipeline(queue_size=4)
+    pipeline.add("double", lambda x: 2 * x, "x", "doubled", batch_fn=batch_fn, batch_size=5)
+    pipeline.add("inc", lambda x: x + 1, "x", "inc", workers=3, **stage_options)
+    pipeline.add("both", lambda d, i: (d + i, d * i), ("doubled", "inc"), ("sum", "product"))
+    return pipeline
+
+def reference(x):
+    return {"x": x, "doubled": 2 * x, "inc": x + 1, "sum": 3 * x + 1, "product": 2 * x * (x + 1)}
+
+def collect(generator, timeout=10):
+    """Drain a run_bulk generator, failing instead of hanging"""
+    with ThreadPoolExecutor(1) as pool:
+        return pool.submit(list, generator).result(timeout=timeout)
+
+def test_bulk_and_per_request_match_sequential():
+    rng = random.Random(0)
+    xs = [rng.randrange(-1000, 1000) for _ in range(300)]
+
+    def jittered_inc(x):
+        time.sleep(rng.random() / 2000)
+        return x + 1
+
+    pipeline = build()
+    pipeline.stages["inc"].fn = jittered_inc
+    assert collect(pipeline.run_bulk({"x": x} for x in xs)) == [reference(x) for x in xs]
+    assert [pipeline.run(x=x) for x in xs[:20]] == [reference(x) for x in xs[:20]]
+    assert pipeline.stats()["double"]["items"] == len(xs) + 20
+
+def test_failed_items_are_reported_in_order():
+    pipeline = build()
+    pipeline.stages["inc"].fn = lambda x: 1 // (x % 7)
+    results = collect(pipeline.run_bulk({"x": x} for x in range(30)))
+
+    assert [r["x"] for r in results] == list(range(30))
+    for r in results:
+        if r["x"] % 7 == 0:
+            assert r["error"]["stage"] == "inc" and "sum" not in r
+        else:
+            assert "error" not in r and r["sum"] == 2 * r["x"] + 1 // (r["x"] % 7)
+
+def test_short_batch_results_mark_items_with_error():
+    pipeline = build(batch_fn=lambda xs: double_batch(xs)[:-1])
+    results = collect(pipeline.run_bulk({"x": x} for x in range(12)))
+
+    assert len(results) == 12
+    assert all(r["error"]["stage"] == "double" for r in results)
+    assert all("returned" in r["error"]["message"] for r in results)
+
+def test_crashed_worker_raises_instead_of_hanging():
+    class Crash(BaseException):
+        pass
+
+    def crash(x):
+        raise Crash()
+
+    pipeline = build()
+    pipeline.stages["inc"].fn = crash
+    with pytest.raises(RuntimeError, match="inc"):
+        collect(pipeline.run_bulk({"x": x} for x in range(10)))
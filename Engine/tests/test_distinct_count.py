@@ -0,0 +1,62 @@
+import random
+
+import pandas as pd
+import pytest
+
+from models.distinct_count import HyperLogLog, RegionUserCounts
+from pipelines.anonymize import anonymize_user_signal
+from pipelines.community_pipeline import aggregate_signals
+
+SALT = "test-salt"
+
+def random_signals(rng, n):
+    return [
+        anonymize_user_signal(rng.randrange(n // 2), rng.choice(["A", "B", "C"]),
+                              rng.random() < 0.3, salt=SALT)
+        for _ in range(n)
+    ]
+
+def test_bulk_sketches_match_per_signal_and_merged_shards():
+    signals = random_signals(random.Random(0), 20000)
+
+    one_by_one = RegionUserCounts()
+    for signal in signals:
+        one_by_one.add_signal(signal)
+    shards = [RegionUserCounts.from_frame(pd.DataFrame(signals[i::4])) for i in range(4)]
+    merged = shards[0]
+    for shard in shards[1:]:
+        merged.merge(shard)
+
+    expected = one_by_one.counts()
+    assert RegionUserCounts.from_frame(pd.DataFrame(signals)).counts() == expected
+    assert merged.counts() == expected
+
+def test_counts_are_close_to_exact():
+    sketch = HyperLogLog(salt=SALT)
+    for user_id in range(50000):
+        sketch.add(user_id)
+    assert sketch.count() == pytest.approx(50000, rel=0.05)
+
+    small = HyperLogLog(salt=SALT)
+    for user_id in range(100):
+        small.add(user_id)
+    assert small.count() == pytest.approx(100, rel=0.02)
+
+def test_aggregate_signals_counts_distinct_users():
+    rng = random.Random(1)
+    signals = [anonymize_user_signal(u, "A", u % 4 == 0, salt=SALT) for u in range(2000)]
+    signals += [anonymize_user_signal(rng.randrange(2000), "A", False, salt=SALT) for _ in range(2000)]
+
+    row = aggregate_signals(signals).iloc[0]
+    assert row["signals"] == 4000
+    assert row["total_users"] == pytest.approx(2000, rel=0.05)
+
+def test_missing_salt_warns_once(monkeypatch, recwarn):
+    monkeypatch.delenv("SIGNAL_HASH_SALT", raising=False)
+    monkeypatch.setattr("models.distinct_count._warned_unsalted", False)
+    for user_id in range(100):
+        anonymize_user_signal(user_id, "A", False)
+    HyperLogLog().add("user")
+
+    warned = [w for w in recwarn if issubclass(w.category, RuntimeWarning)]
+    assert len(warned) == 1 and "SIGNAL_HASH_SALT" in str(warned[0].message)
@@ -0,0 +1,33 @@
+import numpy as np
+
+from data.synthetic.generate_block import generate_block, to_users
+from pipelines.drift_pipeline import detect_drift_cohort, fit_cohort_models
+
+REGIONS = {"Zone-A": 0.5, "Zone-B": 0.5}
+
+def tail_flag_rate(user, days=7):
+    return user["data"]["drift_flag"].tail(days).mean()
+
+def test_cohort_scores_flag_injected_drift():
+    users = to_users(generate_block(300, regions=REGIONS, seed=0))
+    models = detect_drift_cohort(users)
+
+    assert set(models) == set(REGIONS)
+    drifted = [tail_flag_rate(u) for u in users if u["has_drift"]]
+    stable = [tail_flag_rate(u) for u in users if not u["has_drift"]]
+    assert drifted and stable
+    assert np.mean(drifted) > 0.9
+    assert np.mean(stable) < 0.3
+
+def test_cohort_unseen_at_fit_time_is_scored():
+    users = to_users(generate_block(200, regions=REGIONS, seed=1))
+    models = fit_cohort_models([u for u in users if u["region"] == "Zone-A"])
+    assert set(models) == {"Zone-A"}
+
+    returned = detect_drift_cohort(users, models=models)
+    assert set(returned) == set(REGIONS)
+    assert returned["Zone-A"] is models["Zone-A"]
+    assert set(models) == {"Zone-A"}
+    for user in users:
+        assert len(user["data"]["drift_score"]) == len(user["data"])
+        assert not user["data"]["drift_score"].isna().any()
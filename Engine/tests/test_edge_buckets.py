@@ -0,0 +1,47 @@
+import random
+
+from models.edge_buckets import EdgeTimeIndex, RING_DAYS, WEEK_DAYS
+
+def reference_weight(events, current_day, window, today):
+    """What the index should report: exact days in the ring, whole weeks before it"""
+    start = today - window + 1
+    ring_start = current_day - RING_DAYS + 1
+    last_compacted = min(today, ring_start - 1)
+    total = 0
+    for day in events:
+        if max(start, ring_start) <= day <= today:
+            total += 1
+        elif (day < ring_start and start <= last_compacted
+              and start // WEEK_DAYS <= day // WEEK_DAYS <= last_compacted // WEEK_DAYS):
+            total += 1
+    return total
+
+def test_gap_longer_than_ring_keeps_counts():
+    for gap_day in (29, 60, 100):
+        index = EdgeTimeIndex()
+        for day in range(20):
+            index.add([("a", "b")], day)
+        index.add([("a", "b")], gap_day)
+        assert index.weight("a", "b", 200) == 21
+
+def test_windows_match_reference():
+    rng = random.Random(0)
+    for _ in range(200):
+        index = EdgeTimeIndex()
+        events = []
+        day = 0
+        # Stay within the week ring so no week is dropped
+        while day < 300:
+            day += rng.choice([0, 1, 1, 2, 5, 30, 45])
+            added = max(0, day - rng.choice([0, 0, 0, 3, 20, 40]))
+            index.add([("a", "b")], added)
+            events.append(added)
+        current_day = index.current_day
+
+        assert index.weight("a", "b", current_day + 1) == len(events)
+        for _ in range(20):
+            today = current_day - rng.randrange(60)
+            window = rng.randrange(1, 120)
+            expected = reference_weight(events, current_day, window, today)
+            assert index.weight("a", "b", window, today) == expected
+            assert index.neighbors("a", window, today).get("b", 0) == expected
@@ -0,0 +1,55 @@
+import copy
+import json
+import random
+
+from models.entity_postprocess import Symptom, dumps, symptoms_from_entities
+from models.phrase_merger import merge_adjacent_entities
+from models.symptom_normalizer import normalize_symptom
+
+WORDS = ["chest", "tightness", "shortness", "of", "breath", "fatigue", "Tired",
+         "today", "Now", "yesterday", "head", "##ache", "pressure", "in"]
+
+def reference_symptoms(entities):
+    """The merge / filter / normalize loop iter_symptoms replaced"""
+    symptoms = []
+    for e in merge_adjacent_entities(copy.deepcopy(entities)):
+        if e["score"] < 0.6:
+            continue
+        if e["word"].lower() in ["today", "now", "yesterday"]:
+            continue
+        symptoms.append({
+            "raw": e["word"],
+            "normalized": normalize_symptom(e["word"]),
+            "confidence": round(e["score"], 2)
+        })
+    return symptoms
+
+def random_entities(rng):
+    entities = []
+    position = 0
+    for _ in range(rng.randint(0, 12)):
+        word = rng.choice(WORDS)
+        position += rng.choice([1, 1, 2, 5])
+        entities.append({"word": word, "start": position, "end": position + len(word),
+                         "score": rng.random(), "entity_group": "Sign_symptom"})
+        position += len(word)
+    return entities
+
+def test_iter_symptoms_matches_merge_filter_normalize():
+    rng = random.Random(0)
+    for _ in range(5000):
+        entities = random_entities(rng)
+        before = copy.deepcopy(entities)
+        assert symptoms_from_entities(entities) == reference_symptoms(entities)
+        assert entities == before
+
+def test_symptom_reads_like_the_old_dict():
+    symptom = Symptom("Chest tightness", "chest discomfort", 0.93)
+    expected = {"raw": "Chest tightness", "normalized": "chest discomfort", "confidence": 0.93}
+
+    assert symptom == expected and dict(symptom) == expected
+    assert symptom.get("normalized") == "chest discomfort"
+    assert symptom.get("missing", "x") == "x"
+    assert "raw" in symptom and "missing" not in symptom
+    assert list(symptom.keys()) == list(expected)
+    assert json.loads(dumps({"data": [symptom]})) == {"data": [expected]}
@@ -0,0 +1,53 @@
+import math
+import random
+
+import numpy as np
+import pandas as pd
+
+import api_drift_analysis
+from explainability.explain_alerts import explain_drift, explain_drift_arrays, nanmean
+
+def random_history(rng, days):
+    sleep_base, steps_base = rng.uniform(5, 9), rng.uniform(3000, 12000)
+    sleep_drop, steps_drop = rng.choice([0, 0.5, 1.5]), rng.choice([0, 1000, 3000])
+    rows = []
+    for day in range(days):
+        late = day >= days - 7
+        rows.append({
+            "sleep_hours": None if rng.random() < 0.05 else sleep_base - late * sleep_drop + rng.gauss(0, 0.5),
+            "steps": None if rng.random() < 0.05 else steps_base - late * steps_drop + rng.gauss(0, 500)
+        })
+    return rows
+
+def test_explain_drift_arrays_matches_dataframe():
+    rng = random.Random(0)
+    for _ in range(500):
+        rows = random_history(rng, rng.randint(1, 90))
+        df = pd.DataFrame(rows).astype(float)
+        assert explain_drift_arrays(df["sleep_hours"].to_numpy(), df["steps"].to_numpy()) == explain_drift(df)
+
+def test_nanmean_matches_pandas():
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        values = rng.normal(7, 2, size=rng.integers(0, 50))
+        values[rng.random(len(values)) < 0.2] = np.nan
+        expected = pd.Series(values, dtype=float).mean()
+        got = nanmean(values)
+        assert (math.isnan(got) and math.isnan(expected)) or got == expected
+
+def test_array_path_matches_dataframe_path(monkeypatch):
+    rng = random.Random(2)
+    for _ in range(200):
+        rows = random_history(rng, rng.randint(7, 90))
+        if rng.random() < 0.2:
+            rows = [{"sleep_hours": r["sleep_hours"]} for r in rows]
+        fast = api_drift_analysis.analyze_drift(rows)
+        monkeypatch.setattr(api_drift_analysis, "ARRAY_PATH_MAX_ROWS", -1)
+        slow = api_drift_analysis.analyze_drift(rows)
+        monkeypatch.undo()
+
+        assert fast["explanations"] == slow["explanations"]
+        assert fast["data_points"] == slow["data_points"]
+        for key in ("avg_steps", "avg_sleep"):
+            assert fast["metrics"][key] == slow["metrics"][key] or (
+                math.isnan(fast["metrics"][key]) and math.isnan(slow["metrics"][key]))
@@ -0,0 +1,65 @@
+import math
+import random
+
+import pandas as pd
+
+import api_drift_analysis
+from data.feature_store import FeatureStore, METRICS, UserFeatures
+from data.history_store import HistoryStore
+from explainability.explain_alerts import explain_drift, explain_drift_from_features
+
+def random_rows(rng, days):
+    rows = []
+    for day in range(days):
+        row = {m: (None if rng.random() < 0.1 else rng.uniform(0, 10)) for m in METRICS}
+        row["steps"] = None if row["steps"] is None else row["steps"] * 1000
+        row["drift_score"] = rng.uniform(-0.2, 0.2)
+        row["drift_flag"] = rng.choice([0, 1])
+        rows.append(row)
+    return rows
+
+def test_incremental_features_match_recompute():
+    rng = random.Random(0)
+    for user_id in range(300):
+        rows = random_rows(rng, rng.randint(0, 80))
+        store = FeatureStore()
+        for row in rows:
+            store.update(user_id, row, row["drift_score"], row["drift_flag"])
+        assert store.verify(user_id, rows, rel_tol=1e-9, abs_tol=1e-9) == []
+
+def test_explain_drift_from_features_matches_dataframe():
+    rng = random.Random(1)
+    for _ in range(200):
+        rows = random_rows(rng, rng.randint(7, 80))
+        df = pd.DataFrame(rows).astype(float)
+        assert explain_drift_from_features(UserFeatures.from_rows(rows)) == explain_drift(df)
+
+def test_stored_requests_follow_appended_days(tmp_path, monkeypatch):
+    monkeypatch.setattr(api_drift_analysis, "_store", HistoryStore(tmp_path))
+    monkeypatch.setattr(api_drift_analysis, "_features", {})
+    rng = random.Random(2)
+    rows = [dict(r, date=f"2024-{1 + d // 28:02d}-{1 + d % 28:02d}") for d, r in enumerate(random_rows(rng, 60))]
+
+    for start in range(0, len(rows), 10):
+        request = {"userId": "u1", "append": rows[start:start + 10]}
+        result = api_drift_analysis.handle_request(request)
+        health_data = [{"sleep_hours": r["sleep_hours"], "steps": r["steps"]} for r in rows[:start + 10]]
+        if start + 10 < api_drift_analysis.MIN_DAYS:
+            assert not result["success"]
+            continue
+        expected = api_drift_analysis.analyze_drift(health_data)
+
+        assert result["success"]
+        data = result["data"]
+        assert data["explanations"] == expected["explanations"]
+        assert data["data_points"] == expected["data_points"]
+        for key, value in expected["metrics"].items():
+            assert math.isclose(data["metrics"][key], value, rel_tol=1e-9)
+
+    # Rewriting a stored day drops the cached features; they are rebuilt from the store
+    rows[5] = dict(rows[5], sleep_hours=0.0)
+    api_drift_analysis.handle_request({"userId": "u1", "append": [rows[5]]})
+    rebuilt = api_drift_analysis.handle_request({"userId": "u1"})["data"]
+    expected = api_drift_analysis.analyze_drift([{"sleep_hours": r["sleep_hours"], "steps": r["steps"]} for r in rows])
+    assert rebuilt["data_points"] == len(rows)
+    assert math.isclose(rebuilt["metrics"]["avg_sleep"], expected["metrics"]["avg_sleep"], rel_tol=1e-9)
@@ -0,0 +1,104 @@
+import re
+import random
+
+import pipelines.symptom_pipeline as symptom_pipeline
+from models.gazetteer import AhoCorasick, Gazetteer, FILLER_WORDS
+from models.ner_registry import NERRegistry
+from models.symptom_normalizer import SYNONYMS
+
+PHRASES = sorted(set(SYNONYMS) | set(SYNONYMS.values()))
+
+def naive_finditer(patterns, text):
+    return sorted(
+        (start, start + len(p), p)
+        for p in set(patterns)
+        for start in range(len(text) - len(p) + 1)
+        if text.startswith(p, start)
+    )
+
+def test_finditer_matches_naive_scan():
+    rng = random.Random(0)
+    for _ in range(300):
+        patterns = ["".join(rng.choices("abc", k=rng.randint(1, 4))) for _ in range(rng.randint(1, 8))]
+        text = "".join(rng.choices("abcd", k=rng.randint(0, 60)))
+        assert sorted(AhoCorasick(patterns).finditer(text)) == naive_finditer(patterns, text)
+
+class PhraseNER:
+    """Stub NER tagging each word of the gazetteer phrases in a text as a token entity"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, texts, batch_size=None):
+        self.calls += len(texts)
+        return [self.entities(text) for text in texts]
+
+    @staticmethod
+    def entities(text):
+        lowered = text.lower()
+        spans = []
+        for phrase in sorted(PHRASES, key=len, reverse=True):
+            for m in re.finditer(rf"\b{re.escape(phrase)}\b", lowered):
+                if all(m.end() <= s or m.start() >= e for s, e in spans):
+                    spans.append((m.start(), m.end()))
+        return [
+            {"word": w.group(), "start": start + w.start(), "end": start + w.end(),
+             "score": 0.9, "entity_group": "Sign_symptom"}
+            for start, end in sorted(spans)
+            for w in re.finditer(r"\S+", text[start:end])
+        ]
+
+def seeded_texts(seed, n):
+    rng = random.Random(seed)
+    fillers = sorted(FILLER_WORDS)
+    texts = []
+    for _ in range(n):
+        words = []
+        for _ in range(rng.randint(1, 4)):
+            words += rng.sample(fillers, rng.randint(0, 2))
+            words.append(rng.choice(PHRASES) + ",")
+        if rng.random() < 0.3:
+            words.append("unknownword")
+        texts.append(" ".join(words).rstrip(","))
+    return texts
+
+def test_shortcut_matches_stub_ner_path(monkeypatch):
+    registry = NERRegistry()
+    ner = PhraseNER()
+    registry.put(registry.default, ner)
+    monkeypatch.setattr(symptom_pipeline, "get_registry", lambda: registry)
+    monkeypatch.setattr(symptom_pipeline, "get_gazetteer", lambda: Gazetteer())
+
+    texts = seeded_texts(1, 400)
+    gazetteer = Gazetteer()
+    shortcut = [t for t in texts if gazetteer.shortcut(t) is not None]
+    assert 0 < len(shortcut) < len(texts)
+
+    fast = symptom_pipeline.extract_symptoms_batch(texts)
+    assert ner.calls == len(texts) - len(shortcut)
+    reference = symptom_pipeline.extract_symptoms_batch(texts, prefilter=False)
+    assert fast == reference
+
+def test_no_signal_rejection_is_opt_in():
+    default, rejecting = Gazetteer(), Gazetteer(reject_no_signal=True)
+
+    for text in ["Went to the park with friends", "Nothing much to report"]:
+        assert default.shortcut(text) is None
+        assert rejecting.shortcut(text) == []
+
+    # Medical signal without a known phrase still goes to the model
+    for text in ["My head is pounding", "Bad stomach cramps"]:
+        assert default.shortcut(text) is None
+        assert rejecting.shortcut(text) is None
+
+    # Known phrases are answered either way
+    expected = [{"raw": "fatigue", "normalized": "fatigue", "confidence": 0.9}]
+    assert default.shortcut("I have fatigue") == rejecting.shortcut("I have fatigue") == expected
+
+def test_gazetteer_settings_from_environment(monkeypatch):
+    from models.gazetteer import gazetteer_settings
+
+    assert gazetteer_settings()["reject_no_signal"] is False
+    monkeypatch.setenv("ENGINE_GAZETTEER_REJECT", "1")
+    monkeypatch.setenv("ENGINE_GAZETTEER_CONFIDENCE", "0.75")
+    assert gazetteer_settings() == {"confidence": 0.75, "reject_no_signal": True}
@@ -0,0 +1,12 @@
+import numpy as np
+
+from data.synthetic.generate_block import generate_block, write_npy
+
+def test_write_npy_replaces_existing_chunk(tmp_path):
+    path = tmp_path / "chunk-00000"
+    write_npy(generate_block(20, seed=0), path)
+    block = generate_block(20, seed=1)
+    write_npy(block, path)
+
+    assert np.array_equal(np.load(path / "sleep_hours.npy"), block["sleep_hours"])
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["chunk-00000"]
@@ -0,0 +1,65 @@
+import random
+
+from models.symptom_graph import SymptomGraph
+from models.graph_shards import (
+    build_partial, merge_partials, partial_from_graph, to_symptom_graph, build_graph_sharded
+)
+
+NAMES = [f"symptom {i}" for i in range(40)] + ["fatigue", "nausea"]
+
+def seeded_records(seed, n, start_day=0):
+    rng = random.Random(seed)
+    day = start_day
+    records = []
+    for _ in range(n):
+        day += rng.random() < 0.2
+        names = rng.choices(NAMES, k=rng.randint(0, 5))
+        records.append(([{"normalized": name} for name in names], day))
+    return records
+
+def sequential_graph(records):
+    symptom_graph = SymptomGraph()
+    for symptoms, day in records:
+        symptom_graph.update_graph(symptoms, day)
+    return symptom_graph
+
+def graph_state(symptom_graph):
+    graph = symptom_graph.graph
+    nodes = {n: d["last_seen"] for n, d in graph.nodes(data=True)}
+    edges = {frozenset((a, b)): (d["weight"], d["last_seen"]) for a, b, d in graph.edges(data=True)}
+    clusters = sorted(sorted(c) for c in symptom_graph.symptom_clusters())
+    return nodes, edges, clusters
+
+def test_merged_shards_match_sequential_updates():
+    records = seeded_records(0, 2000)
+    expected = graph_state(sequential_graph(records))
+
+    for shards in (1, 3, 7):
+        size = -(-len(records) // shards)
+        partials = [build_partial(records[i:i + size]) for i in range(0, len(records), size)]
+        assert graph_state(to_symptom_graph(merge_partials(partials))) == expected
+
+def test_merging_into_existing_graph_matches_sequential_updates():
+    old = seeded_records(1, 1000)
+    new = seeded_records(2, 1000, start_day=old[-1][1])
+
+    existing = sequential_graph(old)
+    merged = to_symptom_graph(merge_partials([partial_from_graph(existing),
+                                              build_partial(new[:500]),
+                                              build_partial(new[500:])]))
+    assert graph_state(merged) == graph_state(sequential_graph(old + new))
+
+def test_build_graph_sharded_windowed_index_matches_sequential():
+    records = seeded_records(3, 1500)
+    expected = sequential_graph(records)
+    sharded = build_graph_sharded(records, workers=1, shards=4, recent_days=14)
+
+    assert graph_state(sharded) == graph_state(expected)
+    today = records[-1][1]
+    for name in NAMES:
+        for days in (1, 7, 14):
+            assert (sharded.windowed_relationships(name, days, today)
+                    == expected.windowed_relationships(name, days, today))
+
+def test_empty_shards_merge_to_empty_graph():
+    assert len(merge_partials([build_partial([]), build_partial([])])) == 0
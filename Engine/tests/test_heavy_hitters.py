@@ -0,0 +1,97 @@
+import random
+from collections import Counter
+
+from models.heavy_hitters import SpaceSaving, TrendingSymptoms
+
+def zipf_stream(rng, n, distinct):
+    weights = [1 / (rank + 1) for rank in range(distinct)]
+    return rng.choices([f"symptom-{i}" for i in range(distinct)], weights, k=n)
+
+def check_guarantees(summary, exact):
+    total = sum(exact.values())
+    assert summary.total == total
+    for item, true in exact.items():
+        count, error = summary.estimate(item)
+        if item in summary:
+            assert count - error <= true <= count
+        else:
+            assert true <= error
+        if true > total / summary.capacity:
+            assert item in summary
+
+def test_exact_when_distinct_items_fit():
+    rng = random.Random(0)
+    stream = zipf_stream(rng, 5000, 50)
+    summary = SpaceSaving(capacity=50)
+    for item in stream:
+        summary.add(item)
+
+    exact = Counter(stream)
+    expected = sorted(exact.items(), key=lambda kv: (kv[1], kv[0]), reverse=True)[:10]
+    assert summary.top(10) == [(item, count, 0) for item, count in expected]
+
+def test_bounds_hold_for_single_and_merged_summaries():
+    rng = random.Random(1)
+    for _ in range(20):
+        stream = zipf_stream(rng, rng.randint(1000, 20000), rng.randint(20, 2000))
+        capacity = rng.choice([10, 50, 200])
+
+        single = SpaceSaving(capacity)
+        shards = [SpaceSaving(capacity) for _ in range(4)]
+        for i, item in enumerate(stream):
+            single.add(item)
+            shards[i % 4].add(item)
+        merged = shards[0]
+        for shard in shards[1:]:
+            merged.merge(SpaceSaving.from_dict(shard.to_dict()))
+
+        exact = Counter(stream)
+        check_guarantees(single, exact)
+        check_guarantees(merged, exact)
+
+def test_trending_symptoms_merge_matches_one_pass():
+    rng = random.Random(2)
+    events = [(rng.choice(["A", "B"]), rng.randrange(28), zipf_stream(rng, rng.randint(0, 4), 30))
+              for _ in range(3000)]
+
+    one_pass = TrendingSymptoms(capacity=50)
+    shards = [TrendingSymptoms(capacity=50) for _ in range(3)]
+    for i, (region, day, names) in enumerate(events):
+        symptoms = [{"normalized": name} for name in names]
+        one_pass.add(region, day, symptoms)
+        shards[i % 3].add(region, day, symptoms)
+    merged = TrendingSymptoms.from_dict(shards[0].to_dict())
+    for shard in shards[1:]:
+        merged.merge(shard)
+
+    # 30 distinct symptoms fit in every summary, so all counts are exact
+    for region in one_pass.regions():
+        for bucket in range(4):
+            assert merged.top(region, bucket, 30) == one_pass.top(region, bucket, 30)
+
+def test_symptom_trends_apply_count_and_growth_thresholds():
+    from pipelines.anonymize import anonymize_user_signal
+    from pipelines.community_pipeline import aggregate_symptom_trends, detect_symptom_trends
+
+    # (symptom, reports in week 0, reports in week 1)
+    reports = [("rising", 3, 12), ("doubling", 6, 12), ("steady", 10, 12),
+               ("new", 0, 10), ("rare", 0, 9)]
+    signals = []
+    for symptom, before, now in reports:
+        for week, n in ((0, before), (1, now)):
+            for i in range(n):
+                signals.append(anonymize_user_signal(i, "Zone-A", False, salt="test",
+                                                     symptoms=[{"normalized": symptom}],
+                                                     day=week * 7 + i % 7))
+    signals.append(anonymize_user_signal(0, "Zone-A", True, salt="test"))
+
+    trending = aggregate_symptom_trends(signals)
+    alerts = detect_symptom_trends(trending, 1, k=10)
+    assert {a["symptom"]: (a["count"], a["previous"], a["growth"]) for a in alerts} == {
+        "rising": (12, 3, 4.0), "doubling": (12, 6, 2.0), "new": (10, 0, 10.0)
+    }
+
+    strict = detect_symptom_trends(trending, 1, k=10, min_count=11, min_growth=3.0)
+    assert [a["symptom"] for a in strict] == ["rising"]
+    # Without an earlier bucket every symptom over min_count counts as new
+    assert [a["symptom"] for a in detect_symptom_trends(trending, 0, k=10)] == ["steady"]
@@ -0,0 +1,73 @@
+import random
+
+import numpy as np
+
+from data.history_store import HistoryStore, LOG_DTYPE, METRICS, from_day, to_day
+
+def random_row(rng, user_id, day):
+    row = {"user_id": user_id, "date": from_day(day).isoformat()}
+    for m in METRICS:
+        if rng.random() > 0.1:
+            row[m] = rng.uniform(0, 10)
+    return row
+
+def expected_history(written, user_id):
+    days = sorted(day for (u, day) in written if u == user_id)
+    result = {"day": days}
+    for m in METRICS:
+        result[m] = [written[user_id, day].get(m, np.nan) for day in days]
+    return result
+
+def assert_history(store, written, user_ids):
+    for user_id in user_ids:
+        got = store.history(user_id)
+        expected = expected_history(written, user_id)
+        assert got["day"].tolist() == expected["day"]
+        for m in METRICS:
+            np.testing.assert_array_equal(got[m], expected[m])
+
+def test_last_write_wins_before_and_after_compact(tmp_path):
+    store = HistoryStore(tmp_path)
+    store.append([{"user_id": "a", "date": "2024-01-02", "sleep_hours": 6.0},
+                  {"user_id": "a", "date": "2024-01-01", "sleep_hours": 7.0}])
+    store.append([{"user_id": "a", "date": "2024-01-02", "sleep_hours": 8.0}])
+    assert store.history("a")["sleep_hours"].tolist() == [7.0, 8.0]
+
+    store.compact()
+    assert store.history("a")["sleep_hours"].tolist() == [7.0, 8.0]
+
+    # A rewrite of a compacted day wins over the base, before and after compaction
+    store.append([{"user_id": "a", "date": "2024-01-01", "sleep_hours": 5.0}])
+    assert store.history("a")["sleep_hours"].tolist() == [5.0, 8.0]
+    store.compact()
+    assert HistoryStore(tmp_path).history("a")["sleep_hours"].tolist() == [5.0, 8.0]
+
+def test_log_merges_with_compacted_base(tmp_path):
+    rng = random.Random(0)
+    users = [f"user-{i}" for i in range(20)]
+    store = HistoryStore(tmp_path)
+    written = {}
+    for step in range(30):
+        rows = [random_row(rng, rng.choice(users), rng.randrange(60)) for _ in range(rng.randint(0, 40))]
+        store.append(rows)
+        for row in rows:
+            written[row["user_id"], to_day(row["date"])] = row
+        if step % 7 == 6:
+            store.compact()
+        assert_history(store, written, users + ["unknown"])
+
+    assert_history(HistoryStore(tmp_path), written, users)
+
+def test_torn_log_tail_is_dropped(tmp_path):
+    store = HistoryStore(tmp_path)
+    store.append([{"user_id": "a", "date": "2024-01-01", "sleep_hours": 7.0}])
+    with open(store.log_path, "ab") as f:
+        f.write(b"\x01" * (LOG_DTYPE.itemsize // 2))
+
+    reopened = HistoryStore(tmp_path)
+    assert reopened.history("a")["sleep_hours"].tolist() == [7.0]
+
+    reopened.append([{"user_id": "a", "date": "2024-01-02", "sleep_hours": 8.0}])
+    assert reopened.log_path.stat().st_size == 2 * LOG_DTYPE.itemsize
+    assert HistoryStore(tmp_path).history("a")["sleep_hours"].tolist() == [7.0, 8.0]
+    assert reopened.compact() == 2
@@ -0,0 +1,57 @@
+import pytest
+
+import pipelines.symptom_pipeline as symptom_pipeline
+from models.ner_registry import NERRegistry
+
+class FakeNER:
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+
+    def __call__(self, text):
+        self.calls += 1
+        return []
+
+def test_requests_cannot_name_arbitrary_hub_ids():
+    registry = NERRegistry(default="biomedical", allow_arbitrary=False)
+    with pytest.raises(KeyError, match="unknown NER model"):
+        registry.get("someone/any-model")
+    with pytest.raises(ValueError):
+        registry.get(["biomedical"])
+    assert registry.loaded == {}
+
+def test_registered_default_and_opted_in_ids_load(monkeypatch):
+    loaded = []
+    monkeypatch.setattr("models.ner_registry.pipeline_loader",
+                        lambda **kwargs: lambda: loaded.append(kwargs["model"]) or FakeNER(kwargs["model"]))
+
+    registry = NERRegistry(default="org/default-model", allow_arbitrary=False)
+    registry.register("local", loader=lambda: FakeNER("local"))
+    assert registry.get("local").name == "local"
+    assert registry.get().name == "org/default-model"
+
+    registry.allow_arbitrary = True
+    assert registry.get("org/other").name == "org/other"
+    assert loaded == ["org/default-model", "org/other"]
+
+def test_warmup_can_be_skipped_before_fork():
+    registry = NERRegistry()
+    registry.register("cold", loader=lambda: FakeNER("cold"))
+    registry.register("warm", loader=lambda: FakeNER("warm"))
+    assert registry.get("cold", warmup=False).calls == 0
+    assert registry.get("warm").calls == 1
+
+def test_named_model_skips_gazetteer(monkeypatch):
+    registry = NERRegistry(allow_arbitrary=False)
+    registry.put("default", FakeNER("default"))
+    registry.put("other", FakeNER("other"))
+    registry.default = "default"
+    monkeypatch.setattr(symptom_pipeline, "get_registry", lambda: registry)
+    monkeypatch.setattr(symptom_pipeline, "run_ner_batched",
+                        lambda ner, texts, batch_size: [ner(t) for t in texts])
+
+    text = "I have chest tightness"
+    symptom_pipeline.extract_symptoms_batch([text])
+    symptom_pipeline.extract_symptoms_batch([text], model="other")
+    assert registry.get("default").calls == 0
+    assert registry.get("other").calls == 1
@@ -0,0 +1,59 @@
+import random
+
+import networkx as nx
+
+from models.symptom_graph import SymptomGraph
+from models.symptom_clusters import SymptomClusters
+
+NAMES = [f"symptom {i}" for i in range(60)]
+
+def components(graph, threshold):
+    """Connected components over edges at or above the threshold"""
+    thresholded = nx.Graph()
+    thresholded.add_nodes_from(graph.nodes)
+    thresholded.add_edges_from(
+        (a, b) for a, b, d in graph.edges(data=True) if d["weight"] >= threshold and a != b
+    )
+    return sorted(sorted(c) for c in nx.connected_components(thresholded))
+
+def cluster_sets(clusters, graph):
+    return sorted(sorted(clusters.cluster_members(node)) for node in
+                  {clusters.cluster_of(node) for node in graph.nodes})
+
+def test_incremental_clusters_match_connected_components():
+    rng = random.Random(0)
+    for threshold in (1, 2, 3, 5):
+        symptom_graph = SymptomGraph(cluster_threshold=threshold)
+        for day in range(300):
+            names = rng.sample(NAMES, rng.randint(0, 3))
+            symptom_graph.update_graph([{"normalized": name} for name in names], day)
+            if day % 50 == 49:
+                expected = components(symptom_graph.graph, threshold)
+                assert cluster_sets(symptom_graph.clusters, symptom_graph.graph) == expected
+                for node in symptom_graph.graph.nodes:
+                    members = symptom_graph.clusters.cluster_members(node)
+                    assert node in members
+                    assert all(symptom_graph.cluster_of(m) == symptom_graph.cluster_of(node)
+                               for m in members)
+
+def test_from_graph_matches_incremental_clusters():
+    rng = random.Random(1)
+    symptom_graph = SymptomGraph()
+    for day in range(500):
+        names = rng.sample(NAMES, rng.randint(0, 4))
+        symptom_graph.update_graph([{"normalized": name} for name in names], day)
+
+    rebuilt = SymptomClusters.from_graph(symptom_graph.graph, symptom_graph.clusters.threshold)
+    assert (cluster_sets(rebuilt, symptom_graph.graph)
+            == cluster_sets(symptom_graph.clusters, symptom_graph.graph)
+            == components(symptom_graph.graph, symptom_graph.clusters.threshold))
+
+def test_communities_refresh_when_cluster_grows():
+    symptom_graph = SymptomGraph(cluster_threshold=1)
+    symptom_graph.update_graph([{"normalized": "chest pain"}, {"normalized": "short breath"}], 0)
+    before = symptom_graph.communities("chest pain")
+    symptom_graph.update_graph([{"normalized": "short breath"}, {"normalized": "dry cough"}], 1)
+    after = symptom_graph.communities("chest pain")
+
+    assert set().union(*before) == {"chest pain", "short breath"}
+    assert set().union(*after) == {"chest pain", "short breath", "dry cough"}
@@ -0,0 +1,55 @@
+import random
+import re
+
+from models.text_chunker import chunk_text, run_ner_batched
+
+TERMS = ["fatigue", "headache", "nausea", "dizziness", "insomnia"]
+FILLER = ["today", "I", "felt", "some", "after", "work", "and", "a", "bit", "of", "the", "morning"]
+TERM = re.compile(r"\b(" + "|".join(TERMS) + r")\b")
+
+class KeywordNER:
+    """Stand-in for a transformers NER pipeline: one entity per known term"""
+
+    def __init__(self):
+        self.batches = []
+
+    def entities(self, text):
+        return [{"entity_group": "Sign_symptom", "word": m.group(), "score": 0.9,
+                 "start": m.start(), "end": m.end()} for m in TERM.finditer(text)]
+
+    def __call__(self, texts, batch_size=None):
+        if isinstance(texts, str):
+            return self.entities(texts)
+        self.batches.append(len(texts))
+        return [self.entities(t) for t in texts]
+
+def random_text(rng, sentences):
+    parts = []
+    for _ in range(sentences):
+        words = [rng.choice(TERMS + FILLER * 3) for _ in range(rng.randint(1, 40))]
+        parts.append(" ".join(words) + rng.choice([". ", "! ", "? ", "\n", "; "]))
+    return "".join(parts)
+
+def test_chunks_are_bounded_and_cover_the_text():
+    rng = random.Random(0)
+    for _ in range(300):
+        text = random_text(rng, rng.randint(1, 60))
+        max_chars = rng.choice([50, 200, 800])
+        chunks = chunk_text(text, max_chars)
+        previous_end = 0
+        for chunk, offset in chunks:
+            assert len(chunk) <= max_chars
+            assert text[offset:offset + len(chunk)] == chunk
+            assert not text[previous_end:offset].strip()
+            previous_end = offset + len(chunk)
+        assert not text[previous_end:].strip()
+
+def test_batched_entities_match_whole_text_inference():
+    rng = random.Random(1)
+    texts = [random_text(rng, rng.randint(0, 80)) for _ in range(200)]
+    ner = KeywordNER()
+
+    batched = run_ner_batched(ner, texts, batch_size=8, max_chars=200)
+
+    assert batched == [ner(text) for text in texts]
+    assert max(ner.batches) <= 8
@@ -0,0 +1,21 @@
+import tracing
+
+def test_events_are_bounded_and_summary_stays_complete(monkeypatch):
+    for name in ("_enabled", "_format", "_profile", "_path", "_events"):
+        monkeypatch.setattr(tracing, name, getattr(tracing, name))
+    monkeypatch.setattr(tracing, "_enabled", False)
+    tracing.enable(max_events=10)
+    tracing.reset()
+    try:
+        for _ in range(25):
+            with tracing.stage("work"):
+                pass
+        tracing.count("rows", 3)
+
+        summary = tracing.summary()
+        assert len(tracing._events) == 10
+        assert summary["stages"]["work"]["calls"] == 25
+        assert summary["dropped_events"] == 15
+        assert summary["counters"] == {"rows": 3}
+    finally:
+        tracing.reset()
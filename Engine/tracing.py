@@ -0,0 +1,206 @@
+"""
+Opt-in stage timing, counters and profiling for Engine pipelines.
+
+Disabled unless ENGINE_TRACE is set, and then close to free: traced()
+returns the function unchanged, stage() returns a shared no-op context
+and count() returns after one flag check.
+
+  ENGINE_TRACE=json      write a JSON summary (per-stage calls / total /
+                         max ms, counters) plus the raw events
+  ENGINE_TRACE=chrome    write Chrome trace format (chrome://tracing,
+                         Perfetto)
+  ENGINE_TRACE_FILE      output path (default engine-trace-<pid>.json);
+                         written at exit, or call write_trace()
+  ENGINE_TRACE_PROFILE=1 also run cProfile inside profile_run() blocks
+                         and dump <trace file>-<name>.prof per run
+  ENGINE_TRACE_MAX_EVENTS
+                         raw events kept (default 100000); older ones
+                         are dropped, so a long-lived worker's memory
+                         stays bounded. The per-stage summary is
+                         aggregated as events arrive and stays complete.
+
+ENGINE_TRACE must be set (or enable() called) before the instrumented
+modules are imported, since traced() decides when the function is
+decorated.
+"""
+
+import os
+import time
+import atexit
+import threading
+import functools
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+FORMATS = ("json", "chrome")
+DEFAULT_MAX_EVENTS = 100000
+
+_enabled = False
+_format = "json"
+_profile = False
+_path = None
+_events = deque(maxlen=DEFAULT_MAX_EVENTS)
+_dropped = 0
+_stages = {}
+_counters = {}
+_lock = threading.Lock()
+_start = time.perf_counter()
+_null = nullcontext()
+
+def enabled():
+    return _enabled
+
+def enable(fmt="json", path=None, profile=False, max_events=None):
+    """Turn tracing on programmatically (same as the environment variables)"""
+    global _enabled, _format, _profile, _path, _events
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown trace format {fmt!r} (expected one of {FORMATS})")
+    if max_events is None:
+        max_events = int(os.environ.get("ENGINE_TRACE_MAX_EVENTS", DEFAULT_MAX_EVENTS))
+    if not _enabled:
+        atexit.register(write_trace)
+    _enabled = True
+    _format = fmt
+    _profile = profile
+    _path = path or os.environ.get("ENGINE_TRACE_FILE") or f"engine-trace-{os.getpid()}.json"
+    with _lock:
+        _events = deque(_events, maxlen=max_events)
+
+def reset():
+    """Drop recorded events, stage totals and counters"""
+    global _dropped
+    with _lock:
+        _events.clear()
+        _stages.clear()
+        _counters.clear()
+        _dropped = 0
+
+def _record(name, started, ended, args):
+    global _dropped
+    dur = round((ended - started) * 1e6, 1)
+    event = {
+        "name": name,
+        "ph": "X",
+        "ts": round((started - _start) * 1e6, 1),
+        "dur": dur,
+        "pid": os.getpid(),
+        "tid": threading.get_ident(),
+        "args": args
+    }
+    with _lock:
+        if len(_events) == _events.maxlen:
+            _dropped += 1
+        _events.append(event)
+        s = _stages.get(name)
+        if s is None:
+            s = _stages[name] = {"calls": 0, "total_ms": 0.0, "max_ms": 0.0}
+        s["calls"] += 1
+        s["total_ms"] += dur / 1000
+        s["max_ms"] = max(s["max_ms"], dur / 1000)
+
+@contextmanager
+def _stage(name, args):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, started, time.perf_counter(), args)
+
+def stage(name, **args):
+    """Context manager timing a block as stage `name`"""
+    if not _enabled:
+        return _null
+    return _stage(name, args)
+
+def traced(name=None):
+    """Decorator timing every call as a stage (default name: module.function)"""
+    def decorate(fn):
+        if not _enabled:
+            return fn
+        stage_name = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _record(stage_name, started, time.perf_counter(), {})
+        return wrapper
+    return decorate
+
+def count(name, n=1):
+    """Add n to counter `name` (rows, entities, ...)"""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+@contextmanager
+def profile_run(name):
+    """
+    Time a whole run as a stage and, with ENGINE_TRACE_PROFILE set, capture
+    a cProfile dump for it.
+    """
+    if not _enabled:
+        yield
+        return
+
+    profiler = None
+    if _profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        with _stage(name, {}):
+            yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            stem = os.path.splitext(_path)[0]
+            profiler.dump_stats(f"{stem}-{name}.prof")
+
+def summary():
+    """Per-stage calls / total_ms / max_ms over every event, plus counters"""
+    with _lock:
+        stages = {
+            name: {"calls": s["calls"], "total_ms": round(s["total_ms"], 3),
+                   "max_ms": round(s["max_ms"], 3)}
+            for name, s in _stages.items()
+        }
+        return {"stages": stages, "counters": dict(_counters), "dropped_events": _dropped}
+
+def chrome_trace():
+    """Kept events plus final counter values in Chrome trace format"""
+    with _lock:
+        events = list(_events)
+    ts = round((time.perf_counter() - _start) * 1e6, 1)
+    for name, value in _counters.items():
+        events.append({"name": name, "ph": "C", "ts": ts, "pid": os.getpid(),
+                       "tid": 0, "args": {name: value}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+def write_trace(path=None):
+    """Write the trace in the configured format; returns the path or None"""
+    import json
+
+    if not _enabled or not (_events or _counters):
+        return None
+    path = path or _path
+    if _format == "chrome":
+        data = chrome_trace()
+    else:
+        with _lock:
+            events = list(_events)
+        data = dict(summary(), events=events)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+    return path
+
+_env = os.environ.get("ENGINE_TRACE", "").strip().lower()
+if _env and _env not in ("0", "false", "off"):
+    enable(
+        _env if _env in FORMATS else "json",
+        profile=os.environ.get("ENGINE_TRACE_PROFILE", "").strip() not in ("", "0")
+    )
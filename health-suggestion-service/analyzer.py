@@ -15,6 +15,9 @@ GLOBAL_SLEEP_HIGH = 9.0
 GLOBAL_SCREEN_MAX = 8.0
 GLOBAL_ACTIVITY_MIN = 30.0
 
+# Day numbers in columnar histories count from this date
+EPOCH = date(1970, 1, 1)
+
 
 @dataclass
 class PersonalStats:
@@ -129,6 +132,35 @@ class HealthAnalyzer:
         screen_values = np.array([m['screen_time'] for m in metrics], dtype=float)
         activity_values = np.array([m['activity_minutes'] for m in metrics], dtype=float)
         
+        return self.compute_stats_from_arrays(sleep_values, screen_values, activity_values)
+    
+    def compute_stats_from_arrays(
+        self,
+        sleep_values: np.ndarray,
+        screen_values: np.ndarray,
+        activity_values: np.ndarray
+    ) -> PersonalStats:
+        """
+        Compute personal statistics from per-day metric arrays.
+        
+        Accepts any array-like, including read-only memory-mapped slices
+        from a columnar history store, without copying them.
+        
+        Args:
+            sleep_values: Sleep duration per day (hours)
+            screen_values: Screen time per day (hours)
+            activity_values: Activity per day (minutes)
+            
+        Returns:
+            PersonalStats dataclass with computed statistics
+        """
+        sleep_values = np.asarray(sleep_values, dtype=float)
+        screen_values = np.asarray(screen_values, dtype=float)
+        activity_values = np.asarray(activity_values, dtype=float)
+        
+        if len(sleep_values) == 0:
+            return self.compute_stats([])
+        
         # Compute statistics
         avg_sleep = float(np.mean(sleep_values))
         std_sleep = float(np.std(sleep_values, ddof=1)) if len(sleep_values) > 1 else 0.0
@@ -247,7 +279,29 @@ class HealthAnalyzer:
         
         # Get the latest metric entry
         latest = max(metrics, key=lambda m: m['date'])
+        day_suggestion = self._get_day_of_week_suggestion(metrics, latest)
         
+        return self._suggestions_for(latest, day_suggestion, thresholds, phase)
+    
+    def _suggestions_for(
+        self,
+        latest: Dict,
+        day_suggestion: Optional[str],
+        thresholds: Dict[str, float],
+        phase: int
+    ) -> List[str]:
+        """
+        Build the suggestion list for a user's latest metrics.
+        
+        Args:
+            latest: Latest metric entry
+            day_suggestion: Day-of-week suggestion, if any
+            thresholds: Effective thresholds after blending
+            phase: Current user phase
+            
+        Returns:
+            List of suggestion strings
+        """
         suggestions = []
         
         # Sleep suggestions
@@ -280,9 +334,8 @@ class HealthAnalyzer:
             )
         
         # Day of week pattern suggestions
-        day_suggestions = self._get_day_of_week_suggestion(metrics, latest)
-        if day_suggestions:
-            suggestions.append(day_suggestions)
+        if day_suggestion:
+            suggestions.append(day_suggestion)
         
         # Phase-specific context
         if phase == 0:
@@ -342,6 +395,37 @@ class HealthAnalyzer:
         
         return None
     
+    def _day_of_week_suggestion_columns(
+        self,
+        weekdays: np.ndarray,
+        sleep_values: np.ndarray,
+        latest_weekday: int
+    ) -> Optional[str]:
+        """
+        Columnar counterpart of _get_day_of_week_suggestion.
+        
+        Args:
+            weekdays: Weekday per row (0=Monday, 6=Sunday)
+            sleep_values: Sleep duration per row
+            latest_weekday: Weekday of the latest row
+            
+        Returns:
+            Day-of-week suggestion or None
+        """
+        if latest_weekday >= 5:
+            weekend = weekdays >= 5
+            if weekend.any() and (~weekend).any():
+                weekend_avg_sleep = np.mean(sleep_values[weekend])
+                weekday_avg_sleep = np.mean(sleep_values[~weekend])
+                if weekend_avg_sleep - weekday_avg_sleep > 1.5:
+                    return "Your sleep schedule shows significant weekend variation. " \
+                           "Try to maintain a more consistent sleep pattern."
+        
+        if latest_weekday == 0:
+            return "It's Monday! A great day to start with some physical activity."
+        
+        return None
+    
     def analyze(self, request_data: Dict) -> Dict:
         """
         Main analysis method that orchestrates the complete analysis pipeline.
@@ -362,6 +446,60 @@ class HealthAnalyzer:
         thresholds = self.blend_thresholds(stats, confidence)
         suggestions = self.generate_suggestions(metrics, stats, thresholds, phase)
         
+        return self._result(phase, confidence, suggestions, stats)
+    
+    def analyze_history(self, history: Dict[str, np.ndarray]) -> Dict:
+        """
+        Analyze a user's columnar history instead of a list of metric dicts.
+        
+        Gives the same result as analyze() on the equivalent metrics, but
+        reads the columns directly, so read-only memory-mapped slices from
+        a columnar history store are used without copying them.
+        
+        Args:
+            history: Arrays with one row per day: 'day' (days since
+                     1970-01-01), 'sleep_hours', 'screen_time' and
+                     'activity_minutes'
+            
+        Returns:
+            Complete analysis result dictionary
+        """
+        days = np.asarray(history['day'])
+        days_of_data = len(np.unique(days))
+        phase = self.detect_phase(days_of_data)
+        confidence = self.compute_confidence(days_of_data)
+        stats = self.compute_stats_from_arrays(
+            history['sleep_hours'], history['screen_time'], history['activity_minutes']
+        )
+        thresholds = self.blend_thresholds(stats, confidence)
+        
+        if days_of_data == 0:
+            suggestions = ["No metrics available for analysis."]
+        else:
+            i = int(np.argmax(days))
+            latest = {
+                'date': EPOCH + timedelta(days=int(days[i])),
+                'sleep_duration': float(history['sleep_hours'][i]),
+                'screen_time': float(history['screen_time'][i]),
+                'activity_minutes': float(history['activity_minutes'][i])
+            }
+            # 1970-01-01 was a Thursday (weekday 3)
+            weekdays = (days + 3) % 7
+            day_suggestion = self._day_of_week_suggestion_columns(
+                weekdays, np.asarray(history['sleep_hours'], dtype=float), int(weekdays[i])
+            )
+            suggestions = self._suggestions_for(latest, day_suggestion, thresholds, phase)
+        
+        return self._result(phase, confidence, suggestions, stats)
+    
+    def _result(
+        self,
+        phase: int,
+        confidence: float,
+        suggestions: List[str],
+        stats: PersonalStats
+    ) -> Dict:
+        """Assemble the analysis result dictionary."""
         return {
             'phase': phase,
             'confidence': confidence,
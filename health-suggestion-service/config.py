@@ -4,11 +4,38 @@ Loads settings from config.yaml with environment variable override support.
 """
 
 import os
+import signal
+import threading
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 import yaml
 
 
+@dataclass(frozen=True)
+class Settings:
+    """
+    Immutable, typed snapshot of the resolved configuration.
+    
+    Built once from environment variables and config.yaml so that request
+    paths read plain attributes instead of re-resolving keys.
+    """
+    app_host: str
+    app_port: int
+    debug: bool
+    log_level: str
+    workers: int
+    graceful_timeout: int
+    worker_timeout: int
+
+
+def _to_bool(value) -> bool:
+    """Coerce a config or environment value ("false", "1", True...) to bool."""
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+
 class Config:
     """Configuration management for the health suggestion service."""
     
@@ -23,7 +50,19 @@ class Config:
             config_path = Path(__file__).parent / "config.yaml"
         
         self.config_path = Path(config_path)
+        # Reentrant: the SIGHUP handler runs reload() on the main thread,
+        # possibly while that thread is already inside reload()
+        self._lock = threading.RLock()
+        self._mtime = self._file_mtime()
         self._config = self._load_config()
+        self.settings = self._resolve()
+    
+    def _file_mtime(self) -> Optional[float]:
+        """Modification time of the config file, or None if it is missing."""
+        try:
+            return self.config_path.stat().st_mtime
+        except OSError:
+            return None
     
     def _load_config(self) -> dict:
         """Load configuration from YAML file."""
@@ -33,12 +72,31 @@ class Config:
         with open(self.config_path, 'r') as f:
             return yaml.safe_load(f) or {}
     
+    def _resolve(self) -> Settings:
+        """Resolve every known setting into a typed snapshot."""
+        workers = int(self.get('server.workers', 1))
+        if workers <= 0:
+            workers = os.cpu_count() or 1
+        
+        return Settings(
+            app_host=str(self.get('app.host', '0.0.0.0')),
+            app_port=int(self.get('app.port', 8000)),
+            debug=_to_bool(self.get('app.debug', False)),
+            log_level=str(self.get('app.log_level', 'INFO')).upper(),
+            workers=workers,
+            graceful_timeout=int(self.get('server.graceful_timeout', 30)),
+            worker_timeout=int(self.get('server.worker_timeout', 60)),
+        )
+    
     def get(self, key: str, default=None):
         """
         Get configuration value.
         
         Priority: environment variable > config file > default
         
+        This performs a live lookup on every call; prefer the attributes of
+        ``settings`` for anything read per request.
+        
         Args:
             key: Configuration key (supports dot notation for nested keys)
             default: Default value if key not found
@@ -63,25 +121,101 @@ class Config:
         
         return value if value is not None else default
     
+    def reload(self) -> Settings:
+        """
+        Re-read config.yaml and the environment and swap in a new snapshot.
+        
+        The swap is a single attribute assignment, so concurrent readers see
+        either the old or the new snapshot, never a mix.
+        
+        Returns:
+            The newly resolved settings
+        """
+        with self._lock:
+            self._mtime = self._file_mtime()
+            self._config = self._load_config()
+            self.settings = self._resolve()
+        return self.settings
+    
+    def reload_if_changed(self) -> bool:
+        """
+        Reload only if config.yaml was modified since the last load.
+        
+        Returns:
+            True if a reload happened
+        """
+        if self._file_mtime() == self._mtime:
+            return False
+        self.reload()
+        return True
+    
+    def install_reload_handler(
+        self,
+        on_reload: Optional[Callable[[Settings], None]] = None
+    ) -> bool:
+        """
+        Reload configuration when the process receives SIGHUP.
+        
+        Does nothing outside the main thread or on platforms without SIGHUP.
+        Under Gunicorn the handler is installed in each worker (by the app's
+        lifespan), so send SIGHUP to the worker processes, e.g.
+        ``pkill -HUP -P <master pid>``. A SIGHUP to the master is handled by
+        Gunicorn itself: it restarts the workers, which are forked from the
+        preloaded app and keep the settings the master loaded at startup.
+        
+        Args:
+            on_reload: Optional callback invoked with the new settings
+            
+        Returns:
+            True if the handler was installed
+        """
+        if not hasattr(signal, 'SIGHUP'):
+            return False
+        if threading.current_thread() is not threading.main_thread():
+            return False
+        
+        def _handle(signum, frame):
+            settings = self.reload()
+            if on_reload is not None:
+                on_reload(settings)
+        
+        signal.signal(signal.SIGHUP, _handle)
+        return True
+    
     @property
     def app_host(self) -> str:
         """Application host address."""
-        return self.get('app.host', '0.0.0.0')
+        return self.settings.app_host
     
     @property
     def app_port(self) -> int:
         """Application port number."""
-        return int(self.get('app.port', 8000))
+        return self.settings.app_port
     
     @property
     def debug(self) -> bool:
         """Enable debug mode."""
-        return self.get('app.debug', False)
+        return self.settings.debug
     
     @property
     def log_level(self) -> str:
         """Logging level."""
-        return self.get('app.log_level', 'INFO')
+        return self.settings.log_level
+    
+    @property
+    def workers(self) -> int:
+        """Number of worker processes in production mode (0 = one per CPU core)."""
+        return self.settings.workers
+    
+    @property
+    def graceful_timeout(self) -> int:
+        """Seconds a worker may spend finishing in-flight requests on shutdown."""
+        return self.settings.graceful_timeout
+    
+    @property
+    def worker_timeout(self) -> int:
+        """Seconds of silence before a worker is considered hung and restarted."""
+        return self.settings.worker_timeout
 
 
 # Global configuration instance
@@ -22,14 +22,14 @@ from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from config import config
+from config import Settings, config
 from models import AnalyzeRequest, AnalyzeResponse, HealthResponse
 from analyzer import HealthAnalyzer
 
 
 # Configure logging
 logging.basicConfig(
-    level=getattr(logging, config.log_level.upper()),
+    level=getattr(logging, config.settings.log_level),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
@@ -38,6 +38,17 @@ logger = logging.getLogger(__name__)
 analyzer = HealthAnalyzer()
 
 
+def apply_settings(settings: Settings) -> None:
+    """
+    Apply settings that can change at runtime after a config reload.
+    
+    Args:
+        settings: Newly resolved configuration snapshot
+    """
+    logging.getLogger().setLevel(getattr(logging, settings.log_level))
+    logger.info(f"Configuration reloaded (log level: {settings.log_level})")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -46,9 +57,13 @@ async def lifespan(app: FastAPI):
     Initializes resources on startup and cleans up on shutdown.
     """
     # Startup
+    settings = config.settings
     logger.info("Health Suggestion Microservice starting up...")
-    logger.info(f"Debug mode: {config.debug}")
-    logger.info(f"Log level: {config.log_level}")
+    logger.info(f"Debug mode: {settings.debug}")
+    logger.info(f"Log level: {settings.log_level}")
+    
+    # Re-read config.yaml and the environment on SIGHUP
+    config.install_reload_handler(apply_settings)
     
     yield
     
@@ -228,11 +243,20 @@ def create_app() -> FastAPI:
 
 
 if __name__ == "__main__":
-    import uvicorn
+    settings = config.settings
     
-    uvicorn.run(
-        "main:app",
-        host=config.app_host,
-        port=config.app_port,
-        reload=config.debug
-    )
+    if settings.workers > 1 and not settings.debug:
+        # Pre-forking production mode: the app is imported once in the
+        # master and shared copy-on-write by the workers.
+        from server import run
+        
+        run()
+    else:
+        import uvicorn
+        
+        uvicorn.run(
+            "main:app",
+            host=settings.app_host,
+            port=settings.app_port,
+            reload=settings.debug
+        )
@@ -0,0 +1,700 @@
+"""
+Nightly insight scheduler for Health Suggestion Microservice.
+
+Regenerates AI insights only for users whose daily metrics changed since
+their last insight, so nightly compute scales with daily activity rather
+than with the total number of users.
+
+Dirty users are found from a high-water mark on daily_metrics.updatedAt
+and queued by priority: users whose phase changes with the new data come
+first, then users whose latest insight is the most out of date. The queue
+is drained in batches through HealthAnalyzer (and optionally the Engine
+drift pipeline) with bounded concurrency.
+
+The watermark advances after every run. Users whose insight failed are
+kept in a retry table and picked up again once their exponential
+backoff has passed, so one persistently failing user cannot hold back
+the watermark for everyone else.
+
+A local SQLite database mirrors the daily_metrics and ai_insights tables
+of the backend's Prisma schema and stands in for the production database.
+"""
+
+import argparse
+import heapq
+import json
+import logging
+import sqlite3
+import subprocess
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from analyzer import EPOCH, HealthAnalyzer
+
+
+logger = logging.getLogger(__name__)
+
+# Rows written shortly before a run may commit after its scan; rescanning
+# this much history every run is cheap because users whose insight is
+# already newer than their metrics are dropped.
+WATERMARK_LAG = timedelta(minutes=5)
+
+# Keep IN (...) lists below SQLite's bound-parameter limit
+QUERY_CHUNK = 500
+
+# A failed user is retried after RETRY_BACKOFF, doubling with every
+# further failure up to RETRY_BACKOFF_MAX
+RETRY_BACKOFF = timedelta(hours=1)
+RETRY_BACKOFF_MAX = timedelta(days=7)
+
+ENGINE_DIR = Path(__file__).resolve().parent.parent / 'Engine'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_metrics (
+    id TEXT PRIMARY KEY,
+    userId TEXT NOT NULL,
+    date TEXT NOT NULL,
+    sleepStart TEXT,
+    sleepEnd TEXT,
+    sleepDuration REAL NOT NULL,
+    screenTime REAL NOT NULL,
+    activityMinutes INTEGER NOT NULL,
+    createdAt TEXT NOT NULL,
+    updatedAt TEXT NOT NULL,
+    UNIQUE (userId, date)
+);
+CREATE INDEX IF NOT EXISTS daily_metrics_updatedAt_idx ON daily_metrics (updatedAt);
+
+CREATE TABLE IF NOT EXISTS ai_insights (
+    id TEXT PRIMARY KEY,
+    userId TEXT NOT NULL,
+    date TEXT NOT NULL,
+    phase INTEGER NOT NULL,
+    confidence REAL NOT NULL,
+    suggestions TEXT NOT NULL,
+    stats TEXT NOT NULL,
+    createdAt TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ai_insights_userId_createdAt_idx ON ai_insights (userId, createdAt);
+
+CREATE TABLE IF NOT EXISTS scheduler_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS scheduler_retry (
+    userId TEXT PRIMARY KEY,
+    attempts INTEGER NOT NULL,
+    nextAttemptAt TEXT NOT NULL
+);
+"""
+
+
+def timestamp(moment: Optional[datetime] = None) -> str:
+    """
+    Format a UTC moment the way timestamps are stored (sortable ISO text).
+    
+    Args:
+        moment: Time to format; defaults to now
+    
+    Returns:
+        Timestamp string with microsecond resolution
+    """
+    moment = moment or datetime.now(timezone.utc)
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.%f')
+
+
+def _chunks(items: List, size: int) -> Iterable[List]:
+    """Yield consecutive slices of at most size items."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class MetricsStore:
+    """
+    SQLite stand-in for the backend's daily_metrics and ai_insights tables.
+    
+    Every call to connect() opens a new connection, so each scheduler
+    thread works on its own connection to the same database file.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Open (and if needed create) the database.
+        
+        Args:
+            path: SQLite database file
+        """
+        self.path = str(path)
+        with self.connect() as conn:
+            conn.executescript(SCHEMA)
+    
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection for one transaction: committed on success, always closed."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    def upsert_metrics(self, rows: Iterable[Dict]) -> int:
+        """
+        Insert or update daily metric rows, stamping updatedAt.
+        
+        Args:
+            rows: Dictionaries with 'user_id', 'date', 'sleep_duration',
+                  'screen_time' and 'activity_minutes'
+        
+        Returns:
+            Number of rows written
+        """
+        now = timestamp()
+        params = [
+            (
+                str(uuid.uuid4()), row['user_id'], str(row['date']),
+                float(row['sleep_duration']), float(row['screen_time']),
+                int(row['activity_minutes']), now, now
+            )
+            for row in rows
+        ]
+        with self.connect() as conn:
+            conn.executemany(
+                """
+                INSERT INTO daily_metrics
+                    (id, userId, date, sleepDuration, screenTime, activityMinutes,
+                     createdAt, updatedAt)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (userId, date) DO UPDATE SET
+                    sleepDuration = excluded.sleepDuration,
+                    screenTime = excluded.screenTime,
+                    activityMinutes = excluded.activityMinutes,
+                    updatedAt = excluded.updatedAt
+                """,
+                params
+            )
+        return len(params)
+    
+    def get_watermark(self, conn: sqlite3.Connection) -> str:
+        """Return the updatedAt high-water mark of the last complete run."""
+        row = conn.execute(
+            "SELECT value FROM scheduler_state WHERE key = 'watermark'"
+        ).fetchone()
+        return row[0] if row else ''
+    
+    def set_watermark(self, conn: sqlite3.Connection, value: str) -> None:
+        """Persist the updatedAt high-water mark."""
+        conn.execute(
+            "INSERT INTO scheduler_state (key, value) VALUES ('watermark', ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (value,)
+        )
+    
+    def changed_users(self, conn: sqlite3.Connection, since: str) -> Dict[str, str]:
+        """
+        Users with metric rows updated after a watermark.
+        
+        Args:
+            conn: Open connection
+            since: Watermark timestamp ('' scans everything)
+        
+        Returns:
+            Mapping of user id to the latest updatedAt of their rows
+        """
+        rows = conn.execute(
+            "SELECT userId, MAX(updatedAt) FROM daily_metrics "
+            "WHERE updatedAt > ? GROUP BY userId",
+            (since,)
+        )
+        return dict(rows)
+    
+    def due_retries(self, conn: sqlite3.Connection, now: str) -> List[str]:
+        """Users in the retry table whose backoff has passed."""
+        rows = conn.execute(
+            "SELECT userId FROM scheduler_retry WHERE nextAttemptAt <= ?", (now,)
+        )
+        return [user_id for user_id, in rows]
+    
+    def record_failures(self, conn: sqlite3.Connection, user_ids: List[str], now: datetime) -> None:
+        """
+        Add failed users to the retry table, doubling their backoff.
+        
+        Args:
+            conn: Open connection
+            user_ids: Users whose insight failed
+            now: Time of the failure
+        """
+        attempts = {}
+        for chunk in _chunks(user_ids, QUERY_CHUNK):
+            marks = ','.join('?' * len(chunk))
+            attempts.update(conn.execute(
+                f"SELECT userId, attempts FROM scheduler_retry WHERE userId IN ({marks})",
+                chunk
+            ))
+        params = []
+        for user_id in user_ids:
+            count = attempts.get(user_id, 0) + 1
+            delay = min(RETRY_BACKOFF * 2 ** (count - 1), RETRY_BACKOFF_MAX)
+            params.append((user_id, count, timestamp(now + delay)))
+        conn.executemany(
+            "INSERT INTO scheduler_retry (userId, attempts, nextAttemptAt) VALUES (?, ?, ?) "
+            "ON CONFLICT (userId) DO UPDATE SET "
+            "attempts = excluded.attempts, nextAttemptAt = excluded.nextAttemptAt",
+            params
+        )
+    
+    def clear_retries(self, conn: sqlite3.Connection, user_ids: List[str]) -> None:
+        """Remove users from the retry table after a successful insight."""
+        for chunk in _chunks(user_ids, QUERY_CHUNK):
+            marks = ','.join('?' * len(chunk))
+            conn.execute(f"DELETE FROM scheduler_retry WHERE userId IN ({marks})", chunk)
+    
+    def day_counts(self, conn: sqlite3.Connection, user_ids: List[str]) -> Dict[str, int]:
+        """Number of metric days per user (rows are unique per user and date)."""
+        counts = {}
+        for chunk in _chunks(user_ids, QUERY_CHUNK):
+            marks = ','.join('?' * len(chunk))
+            counts.update(conn.execute(
+                f"SELECT userId, COUNT(*) FROM daily_metrics "
+                f"WHERE userId IN ({marks}) GROUP BY userId",
+                chunk
+            ))
+        return counts
+    
+    def last_insights(
+        self,
+        conn: sqlite3.Connection,
+        user_ids: List[str]
+    ) -> Dict[str, Tuple[str, int, str]]:
+        """
+        Latest insight per user.
+        
+        Args:
+            conn: Open connection
+            user_ids: Users to look up
+        
+        Returns:
+            Mapping of user id to (date, phase, createdAt) of their most
+            recent insight; users without insights are absent
+        """
+        latest = {}
+        for chunk in _chunks(user_ids, QUERY_CHUNK):
+            marks = ','.join('?' * len(chunk))
+            rows = conn.execute(
+                f"SELECT userId, date, phase, createdAt FROM ai_insights "
+                f"WHERE userId IN ({marks}) ORDER BY userId, createdAt",
+                chunk
+            )
+            for user_id, day, phase, created_at in rows:
+                latest[user_id] = (day, phase, created_at)
+        return latest
+    
+    def fetch_history(
+        self,
+        conn: sqlite3.Connection,
+        user_ids: List[str]
+    ) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Metric history per user as columns, in HealthAnalyzer.analyze_history format.
+        
+        Args:
+            conn: Open connection
+            user_ids: Users to load
+        
+        Returns:
+            Mapping of user id to date-ordered arrays 'day' (days since
+            1970-01-01), 'sleep_hours', 'screen_time' and 'activity_minutes'
+        """
+        rows_by_user = {user_id: [] for user_id in user_ids}
+        for chunk in _chunks(user_ids, QUERY_CHUNK):
+            marks = ','.join('?' * len(chunk))
+            rows = conn.execute(
+                f"SELECT userId, date, sleepDuration, screenTime, activityMinutes "
+                f"FROM daily_metrics WHERE userId IN ({marks}) ORDER BY userId, date",
+                chunk
+            )
+            for user_id, day, sleep, screen, activity in rows:
+                rows_by_user[user_id].append(
+                    ((date.fromisoformat(day[:10]) - EPOCH).days, sleep, screen, activity)
+                )
+        
+        history = {}
+        for user_id, rows in rows_by_user.items():
+            columns = np.array(rows, dtype=float).reshape(len(rows), 4)
+            history[user_id] = {
+                'day': columns[:, 0].astype(np.int64),
+                'sleep_hours': columns[:, 1],
+                'screen_time': columns[:, 2],
+                'activity_minutes': columns[:, 3]
+            }
+        return history
+    
+    def save_insights(self, conn: sqlite3.Connection, rows: List[Tuple]) -> None:
+        """Insert ai_insights rows (id, userId, date, phase, confidence, suggestions, stats, createdAt)."""
+        conn.executemany(
+            "INSERT INTO ai_insights "
+            "(id, userId, date, phase, confidence, suggestions, stats, createdAt) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+
+@dataclass
+class DirtyUser:
+    """
+    A user whose insight needs regenerating.
+    
+    Attributes:
+        user_id: User id
+        days_of_data: Metric days after the change
+        new_phase: Phase implied by days_of_data
+        previous_phase: Phase of the latest insight (None if no insight)
+        stale_days: Age of the latest insight in days (None if no insight)
+        retry: Whether the user is due for a retry after a failure
+    """
+    user_id: str
+    days_of_data: int
+    new_phase: int
+    previous_phase: Optional[int] = None
+    stale_days: Optional[int] = None
+    retry: bool = False
+    
+    @property
+    def phase_transition(self) -> bool:
+        """Whether the new data moves the user to a different phase."""
+        return self.previous_phase is not None and self.previous_phase != self.new_phase
+    
+    def priority(self) -> Tuple:
+        """
+        Heap key: phase transitions first, then the stalest insights
+        (users with no insight at all before any dated one).
+        """
+        staleness = float('inf') if self.stale_days is None else self.stale_days
+        return (0 if self.phase_transition else 1, -staleness, self.user_id)
+
+
+@dataclass
+class RunSummary:
+    """Counters for one scheduler run."""
+    candidates: int = 0
+    dirty: int = 0
+    processed: int = 0
+    failed: int = 0
+    phase_transitions: int = 0
+    retried: int = 0
+    batches: int = 0
+    drift_analyzed: int = 0
+    elapsed_seconds: float = 0.0
+    watermark: str = ''
+    failed_users: List[str] = field(default_factory=list)
+    
+    def as_dict(self) -> Dict:
+        """Summary as a JSON-serializable dictionary."""
+        return asdict(self)
+
+
+class SubprocessDriftRunner:
+    """
+    Runs the Engine drift pipeline over a batch of users in one process.
+    
+    Calls Engine/api_drift_analysis.py --batch, the same entry point the
+    Node.js backend uses. daily_metrics has no step counts, so only
+    sleep_hours is sent and step drift is never reported.
+    """
+    
+    MIN_DAYS = 7
+    
+    def __init__(
+        self,
+        script: Optional[Path] = None,
+        python: str = sys.executable,
+        timeout: float = 600
+    ):
+        """
+        Initialize the runner.
+        
+        Args:
+            script: Path to api_drift_analysis.py
+            python: Interpreter used to run it
+            timeout: Seconds to wait for one batch
+        """
+        self.script = Path(script) if script else ENGINE_DIR / 'api_drift_analysis.py'
+        self.python = python
+        self.timeout = timeout
+    
+    def __call__(self, history: Dict[str, Dict[str, np.ndarray]]) -> Dict[str, Dict]:
+        """
+        Analyze drift for a batch of users.
+        
+        Args:
+            history: Mapping of user id to columnar metric history
+                     (MetricsStore.fetch_history format)
+        
+        Returns:
+            Mapping of user id to drift analysis for users the pipeline
+            accepted (users with fewer than MIN_DAYS days are skipped)
+        """
+        users = [
+            {
+                'userId': user_id,
+                'healthData': [{'sleep_hours': value} for value in columns['sleep_hours'].tolist()]
+            }
+            for user_id, columns in history.items()
+            if len(columns['day']) >= self.MIN_DAYS
+        ]
+        if not users:
+            return {}
+        
+        completed = subprocess.run(
+            [self.python, str(self.script), '--batch'],
+            input=json.dumps({'users': users}),
+            capture_output=True,
+            text=True,
+            timeout=self.timeout
+        )
+        try:
+            output = json.loads(completed.stdout)
+        except ValueError:
+            raise RuntimeError(
+                f"drift analysis failed (exit {completed.returncode}): {completed.stderr.strip()}"
+            )
+        if not output.get('success'):
+            raise RuntimeError(f"drift analysis failed: {output.get('error')}")
+        
+        return {
+            result['userId']: result['data']
+            for result in output['data']
+            if result.get('success')
+        }
+
+
+class InsightScheduler:
+    """
+    Regenerates insights for users with new metrics since their last insight.
+    
+    A run collects dirty users, orders them in a priority queue and drains
+    it in batches on a bounded thread pool. Each batch reads its users'
+    metrics, analyzes them and writes the new insights in one transaction.
+    The watermark always advances; users from a failed batch (or whose
+    own analysis failed) go to the retry table and are collected again
+    once their backoff has passed.
+    """
+    
+    def __init__(
+        self,
+        store: MetricsStore,
+        analyzer: Optional[HealthAnalyzer] = None,
+        drift_runner: Optional[Callable[[Dict[str, Dict]], Dict[str, Dict]]] = None,
+        batch_size: int = 100,
+        concurrency: int = 4
+    ):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            store: Metrics database
+            analyzer: HealthAnalyzer instance (shared, it holds no per-user state)
+            drift_runner: Optional callable taking {user_id: columnar history}
+                          and returning {user_id: drift result}
+            batch_size: Users per batch
+            concurrency: Maximum batches processed at once
+        """
+        if batch_size < 1 or concurrency < 1:
+            raise ValueError("batch_size and concurrency must be at least 1")
+        self.store = store
+        self.analyzer = analyzer or HealthAnalyzer()
+        self.drift_runner = drift_runner
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+    
+    def collect(self, today: Optional[date] = None) -> Tuple[List, int, str]:
+        """
+        Find users whose metrics changed after their latest insight.
+        
+        Args:
+            today: Run date used for insight staleness; defaults to today (UTC)
+        
+        Returns:
+            Tuple of (priority heap of (key, DirtyUser) entries, number of
+            candidate users scanned, watermark to store after the run)
+        """
+        today = today or datetime.now(timezone.utc).date()
+        scan_started = datetime.now(timezone.utc)
+        
+        with self.store.connect() as conn:
+            watermark = self.store.get_watermark(conn)
+            changed = self.store.changed_users(conn, watermark)
+            retries = [
+                user_id for user_id in self.store.due_retries(conn, timestamp(scan_started))
+                if user_id not in changed
+            ]
+            user_ids = list(changed) + retries
+            insights = self.store.last_insights(conn, user_ids)
+            
+            # Skip users whose latest insight already covers their newest
+            # row; due retries failed last time and are always redone
+            dirty = [
+                user_id for user_id in changed
+                if user_id not in insights or insights[user_id][2] < changed[user_id]
+            ] + retries
+            days = self.store.day_counts(conn, dirty)
+        
+        heap = []
+        retrying = set(retries)
+        for user_id in dirty:
+            days_of_data = days.get(user_id, 0)
+            user = DirtyUser(
+                user_id=user_id,
+                days_of_data=days_of_data,
+                new_phase=self.analyzer.detect_phase(days_of_data),
+                retry=user_id in retrying
+            )
+            if user_id in insights:
+                insight_date, phase, _ = insights[user_id]
+                user.previous_phase = phase
+                user.stale_days = (today - date.fromisoformat(insight_date[:10])).days
+            heap.append((user.priority(), user))
+        heapq.heapify(heap)
+        
+        next_watermark = max(watermark, timestamp(scan_started - WATERMARK_LAG))
+        return heap, len(user_ids), next_watermark
+    
+    def process_batch(self, users: List[DirtyUser], today: date) -> Dict:
+        """
+        Analyze one batch and store its insights.
+        
+        Args:
+            users: Dirty users of this batch
+            today: Insight date
+        
+        Returns:
+            Dictionary with 'processed', 'failed' (user ids) and
+            'drift_analyzed' counts for the batch
+        """
+        user_ids = [user.user_id for user in users]
+        failed = []
+        
+        with self.store.connect() as conn:
+            # The insight covers every row read below, so it is stamped
+            # with the time the read started.
+            snapshot = timestamp()
+            history = self.store.fetch_history(conn, user_ids)
+            drift = self.drift_runner(history) if self.drift_runner else {}
+            
+            rows = []
+            for user_id in user_ids:
+                try:
+                    result = self.analyzer.analyze_history(history[user_id])
+                except Exception:
+                    logger.exception("Insight generation failed for user %s", user_id)
+                    failed.append(user_id)
+                    continue
+                
+                stats = dict(result['stats'])
+                if user_id in drift:
+                    stats['drift'] = drift[user_id]
+                rows.append((
+                    str(uuid.uuid4()), user_id, today.isoformat(),
+                    result['phase'], result['confidence'],
+                    json.dumps(result['suggestions']), json.dumps(stats), snapshot
+                ))
+            self.store.save_insights(conn, rows)
+        
+        return {'processed': len(rows), 'failed': failed, 'drift_analyzed': len(drift)}
+    
+    def run(self, today: Optional[date] = None, dry_run: bool = False) -> RunSummary:
+        """
+        Regenerate insights for every dirty user.
+        
+        Args:
+            today: Run date; defaults to today (UTC)
+            dry_run: Only collect and count dirty users
+        
+        Returns:
+            RunSummary for the run
+        """
+        started = time.perf_counter()
+        today = today or datetime.now(timezone.utc).date()
+        heap, candidates, next_watermark = self.collect(today)
+        user_ids = [user.user_id for _, user in heap]
+        
+        summary = RunSummary(candidates=candidates, dirty=len(heap))
+        summary.phase_transitions = sum(1 for _, user in heap if user.phase_transition)
+        summary.retried = sum(1 for _, user in heap if user.retry)
+        if dry_run:
+            summary.elapsed_seconds = round(time.perf_counter() - started, 3)
+            return summary
+        
+        # Batches are cut in priority order and submitted as slots free up,
+        # so at most `concurrency` batches of metrics are held in memory.
+        pending = {}
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            while heap or pending:
+                while heap and len(pending) < self.concurrency:
+                    batch = [heapq.heappop(heap)[1] for _ in range(min(self.batch_size, len(heap)))]
+                    future = pool.submit(self.process_batch, batch, today)
+                    pending[future] = [user.user_id for user in batch]
+                    summary.batches += 1
+                
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch_ids = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception:
+                        logger.exception("Insight batch failed")
+                        summary.failed_users.extend(batch_ids)
+                        continue
+                    summary.processed += result['processed']
+                    summary.drift_analyzed += result['drift_analyzed']
+                    summary.failed_users.extend(result['failed'])
+        
+        summary.failed = len(summary.failed_users)
+        failed = set(summary.failed_users)
+        with self.store.connect() as conn:
+            self.store.clear_retries(conn, [u for u in user_ids if u not in failed])
+            self.store.record_failures(conn, summary.failed_users, datetime.now(timezone.utc))
+            self.store.set_watermark(conn, next_watermark)
+            summary.watermark = next_watermark
+        
+        summary.elapsed_seconds = round(time.perf_counter() - started, 3)
+        return summary
+
+
+def main() -> None:
+    """Command-line entry point for the nightly job."""
+    parser = argparse.ArgumentParser(description="Regenerate insights for users with new metrics")
+    parser.add_argument('--db', required=True, help="SQLite metrics database")
+    parser.add_argument('--batch-size', type=int, default=100, help="users per batch")
+    parser.add_argument('--concurrency', type=int, default=4, help="batches processed at once")
+    parser.add_argument('--drift', action='store_true',
+                        help="also run the Engine drift pipeline for each batch")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="only report how many users are dirty")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    scheduler = InsightScheduler(
+        MetricsStore(args.db),
+        drift_runner=SubprocessDriftRunner() if args.drift else None,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency
+    )
+    summary = scheduler.run(dry_run=args.dry_run)
+    print(json.dumps(summary.as_dict(), indent=2))
+    if summary.failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Production launcher for Health Suggestion Microservice.
+
+Runs the FastAPI application under a pre-forking Gunicorn master with
+Uvicorn workers. The application module (configuration, HealthAnalyzer)
+is imported once in the master before forking so that workers share those
+pages copy-on-write instead of each building their own copy.
+"""
+
+import gc
+import logging
+import resource
+import time
+from typing import Dict, Optional
+
+from gunicorn.app.base import BaseApplication
+
+from config import config
+
+
+logger = logging.getLogger(__name__)
+
+
+def rss_mb() -> float:
+    """
+    Current resident set size of this process in megabytes.
+
+    Reads /proc/self/statm where available and falls back to the peak RSS
+    reported by getrusage on platforms without procfs.
+
+    Returns:
+        Resident memory in MB
+    """
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * resource.getpagesize() / (1024 * 1024)
+    except (OSError, IndexError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class StandaloneApplication(BaseApplication):
+    """
+    Embedded Gunicorn application serving the FastAPI app.
+
+    The app is imported in load(), which Gunicorn calls in the master when
+    preload_app is enabled, so every forked worker inherits it.
+    """
+
+    def __init__(self, options: Optional[Dict] = None):
+        """
+        Initialize the launcher.
+
+        Args:
+            options: Gunicorn settings overriding the defaults from config
+        """
+        self.options = options or {}
+        self.started_at = time.perf_counter()
+        super().__init__()
+
+    def load_config(self):
+        """Apply the known Gunicorn settings from the options dictionary."""
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key.lower(), value)
+
+    def load(self):
+        """Import the application once in the master process."""
+        from main import app
+
+        # Move everything allocated so far into the permanent generation so
+        # the cyclic GC in workers doesn't touch (and un-share) those pages.
+        gc.collect()
+        gc.freeze()
+
+        logger.info(
+            f"Application preloaded in {time.perf_counter() - self.started_at:.2f}s "
+            f"(master RSS {rss_mb():.1f} MB)"
+        )
+        return app
+
+
+def when_ready(server):
+    """Gunicorn hook: report total boot time once the master is listening."""
+    started_at = getattr(server.app, 'started_at', None)
+    if started_at is not None:
+        logger.info(
+            f"Master ready in {time.perf_counter() - started_at:.2f}s "
+            f"with {server.cfg.workers} workers"
+        )
+
+
+def post_worker_init(worker):
+    """Gunicorn hook: report the resident memory of each booted worker."""
+    logger.info(f"Worker {worker.pid} booted (RSS {rss_mb():.1f} MB)")
+
+
+def worker_exit(server, worker):
+    """Gunicorn hook: log worker shutdown."""
+    logger.info(f"Worker {worker.pid} exited")
+
+
+def build_options() -> Dict:
+    """
+    Build Gunicorn settings from the service configuration.
+
+    Returns:
+        Dictionary of Gunicorn settings
+    """
+    settings = config.settings
+    return {
+        'bind': f"{settings.app_host}:{settings.app_port}",
+        'workers': settings.workers,
+        'worker_class': 'uvicorn.workers.UvicornWorker',
+        'preload_app': True,
+        'graceful_timeout': settings.graceful_timeout,
+        'timeout': settings.worker_timeout,
+        'loglevel': settings.log_level.lower(),
+        'when_ready': when_ready,
+        'post_worker_init': post_worker_init,
+        'worker_exit': worker_exit,
+    }
+
+
+def run():
+    """Start the pre-forking production server."""
+    StandaloneApplication(build_options()).run()
+
+
+if __name__ == "__main__":
+    run()
@@ -3,12 +3,17 @@ Unit tests for Health Suggestion Microservice.
 Tests cover analyzer logic, model validation, and API endpoints.
 """
 
+import os
+import signal
+import numpy as np
 import pytest
 from datetime import date, timedelta
 from fastapi.testclient import TestClient
 
 from main import app
 from analyzer import HealthAnalyzer, PersonalStats
+from config import Config
+from scheduler import InsightScheduler, MetricsStore
 from models import AnalyzeRequest, MetricData
 
 
@@ -83,6 +88,22 @@ class TestHealthAnalyzer:
         assert stats.avg_screen == pytest.approx(5.0, rel=0.01)
         assert stats.avg_activity == pytest.approx(36.67, rel=0.01)
     
+    def test_compute_stats_from_arrays_matches_dicts(self, analyzer):
+        """Test array-based stats equal the dict-based computation."""
+        metrics = [
+            {'date': '2024-01-01', 'sleep_duration': 7.0, 'screen_time': 5.0, 'activity_minutes': 30},
+            {'date': '2024-01-02', 'sleep_duration': 8.0, 'screen_time': 6.0, 'activity_minutes': 45},
+            {'date': '2024-01-03', 'sleep_duration': 6.5, 'screen_time': 4.0, 'activity_minutes': 35},
+        ]
+        
+        stats = analyzer.compute_stats_from_arrays(
+            np.array([7.0, 8.0, 6.5]),
+            np.array([5.0, 6.0, 4.0]),
+            np.array([30, 45, 35])
+        )
+        
+        assert stats == analyzer.compute_stats(metrics)
+    
     def test_compute_stats_empty(self, analyzer):
         """Test statistics computation with empty metrics."""
         stats = analyzer.compute_stats([])
@@ -203,6 +224,33 @@ class TestHealthAnalyzer:
         assert 0.0 <= result['confidence'] <= 1.0
         assert isinstance(result['suggestions'], list)
         assert isinstance(result['stats'], dict)
+    
+    @pytest.mark.filterwarnings("ignore::RuntimeWarning")
+    def test_analyze_history_matches_analyze(self, analyzer):
+        """Test columnar analysis gives the same result as the metric dicts."""
+        from analyzer import EPOCH
+        
+        rng = np.random.default_rng(0)
+        for _ in range(200):
+            offsets = np.sort(rng.choice(60, size=rng.integers(1, 40), replace=False))
+            start = date(2024, 1, 1) + timedelta(days=int(rng.integers(7)))
+            metrics = [
+                {
+                    'date': (start + timedelta(days=int(offset))).isoformat(),
+                    'sleep_duration': round(float(rng.uniform(3, 11)), 1),
+                    'screen_time': round(float(rng.uniform(0, 12)), 1),
+                    'activity_minutes': int(rng.integers(0, 90))
+                }
+                for offset in offsets
+            ]
+            history = {
+                'day': np.array([(date.fromisoformat(m['date']) - EPOCH).days for m in metrics]),
+                'sleep_hours': np.array([m['sleep_duration'] for m in metrics]),
+                'screen_time': np.array([m['screen_time'] for m in metrics]),
+                'activity_minutes': np.array([m['activity_minutes'] for m in metrics], dtype=float)
+            }
+            
+            assert analyzer.analyze_history(history) == analyzer.analyze({'metrics': metrics})
 
 
 class TestAPIEndpoints:
@@ -361,5 +409,210 @@ class TestModels:
             )
 
 
+class TestConfig:
+    """Test cases for configuration loading."""
+    
+    def test_server_defaults(self, tmp_path):
+        """Test production server settings fall back to defaults."""
+        config = Config(tmp_path / "missing.yaml")
+        
+        assert config.workers == 1
+        assert config.graceful_timeout == 30
+        assert config.worker_timeout == 60
+    
+    def test_workers_from_file_and_env(self, tmp_path, monkeypatch):
+        """Test worker count is read from the file and overridden by env."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("server:\n  workers: 3\n")
+        config = Config(config_file)
+        
+        assert config.workers == 3
+        
+        monkeypatch.setenv("SERVER_WORKERS", "0")
+        config.reload()
+        assert config.workers >= 1  # 0 means one per CPU core
+    
+    def test_settings_snapshot_is_typed_and_immutable(self, tmp_path, monkeypatch):
+        """Test env strings are coerced once into a frozen snapshot."""
+        monkeypatch.setenv("APP_DEBUG", "false")
+        monkeypatch.setenv("APP_PORT", "9001")
+        config = Config(tmp_path / "missing.yaml")
+        
+        assert config.settings.debug is False
+        assert config.settings.app_port == 9001
+        with pytest.raises(AttributeError):
+            config.settings.app_port = 9002
+        
+        # Environment changes are only picked up on reload
+        monkeypatch.setenv("APP_PORT", "9003")
+        assert config.app_port == 9001
+        assert config.reload().app_port == 9003
+    
+    def test_reload_if_changed(self, tmp_path):
+        """Test reload only happens when the file mtime changes."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("app:\n  log_level: info\n")
+        config = Config(config_file)
+        
+        assert config.log_level == "INFO"
+        assert config.reload_if_changed() is False
+        
+        config_file.write_text("app:\n  log_level: debug\n")
+        mtime = config_file.stat().st_mtime + 10
+        os.utime(config_file, (mtime, mtime))
+        
+        assert config.reload_if_changed() is True
+        assert config.log_level == "DEBUG"
+    
+    @pytest.mark.skipif(not hasattr(signal, "SIGHUP"), reason="no SIGHUP on this platform")
+    def test_sighup_during_reload_does_not_deadlock(self, tmp_path):
+        """Test a SIGHUP arriving while reload() holds the lock reloads again."""
+        config = Config(tmp_path / "missing.yaml")
+        load_config = config._load_config
+        reloads = []
+        
+        def load_with_signal():
+            if not reloads:
+                reloads.append("outer")
+                signal.raise_signal(signal.SIGHUP)
+            return load_config()
+        
+        config._load_config = load_with_signal
+        previous = signal.getsignal(signal.SIGHUP)
+        try:
+            assert config.install_reload_handler(lambda settings: reloads.append("handler"))
+            assert config.reload().app_port == config.app_port
+        finally:
+            signal.signal(signal.SIGHUP, previous)
+        assert reloads == ["outer", "handler"]
+
+
+class TestInsightScheduler:
+    """Test cases for the nightly insight scheduler."""
+    
+    @staticmethod
+    def _rows(user_id, days, start=date(2024, 1, 1)):
+        return [
+            {
+                'user_id': user_id,
+                'date': start + timedelta(days=i),
+                'sleep_duration': 7.0,
+                'screen_time': 5.0,
+                'activity_minutes': 30
+            }
+            for i in range(days)
+        ]
+    
+    @pytest.fixture
+    def store(self, tmp_path, monkeypatch):
+        """Create a metrics database; no lag so each run sees only new rows."""
+        monkeypatch.setattr("scheduler.WATERMARK_LAG", timedelta(0))
+        return MetricsStore(tmp_path / "metrics.db")
+    
+    def test_only_changed_users_are_regenerated(self, store):
+        """Test a second run only processes users with new metrics."""
+        store.upsert_metrics(self._rows("a", 10) + self._rows("b", 10) + self._rows("c", 3))
+        scheduler = InsightScheduler(store, batch_size=2, concurrency=2)
+        
+        first = scheduler.run(today=date(2024, 2, 1))
+        assert first.processed == 3
+        assert first.batches == 2
+        assert scheduler.run(today=date(2024, 2, 1)).dirty == 0
+        
+        store.upsert_metrics(self._rows("b", 1, start=date(2024, 1, 20)))
+        second = scheduler.run(today=date(2024, 2, 2))
+        assert (second.candidates, second.dirty, second.processed) == (1, 1, 1)
+        
+        with store.connect() as conn:
+            counts = dict(conn.execute(
+                "SELECT userId, COUNT(*) FROM ai_insights GROUP BY userId"
+            ))
+        assert counts == {"a": 1, "b": 2, "c": 1}
+    
+    def test_phase_transitions_and_stale_insights_first(self, store):
+        """Test the queue orders phase changes, then the oldest insights."""
+        store.upsert_metrics(self._rows("fresh", 10) + self._rows("old", 10) + self._rows("cold", 6))
+        scheduler = InsightScheduler(store)
+        scheduler.run(today=date(2024, 2, 1))
+        
+        with store.connect() as conn:
+            conn.execute("UPDATE ai_insights SET date = '2024-01-01' WHERE userId = 'old'")
+        # 'cold' reaches 7 days and moves from cold start to warm-up
+        store.upsert_metrics(
+            self._rows("fresh", 1, start=date(2024, 1, 20))
+            + self._rows("old", 1, start=date(2024, 1, 20))
+            + self._rows("cold", 1, start=date(2024, 1, 20))
+            + self._rows("new", 2)
+        )
+        heap, _, _ = scheduler.collect(today=date(2024, 2, 2))
+        order = [user.user_id for _, user in sorted(heap, key=lambda entry: entry[0])]
+        
+        assert order == ["cold", "new", "old", "fresh"]
+        assert sorted(heap, key=lambda entry: entry[0])[0][1].phase_transition
+    
+    def test_failed_users_are_retried_with_backoff(self, store):
+        """Test the watermark advances past failures and failed users are retried."""
+        store.upsert_metrics(self._rows("a", 8) + self._rows("b", 8))
+        
+        def drift_failing_for_a(history):
+            if "a" in history:
+                raise RuntimeError("drift pipeline unavailable")
+            return {}
+        
+        def make_due():
+            with store.connect() as conn:
+                conn.execute("UPDATE scheduler_retry SET nextAttemptAt = ''")
+        
+        def retry_rows():
+            with store.connect() as conn:
+                return conn.execute(
+                    "SELECT userId, attempts, nextAttemptAt FROM scheduler_retry"
+                ).fetchall()
+        
+        failing = InsightScheduler(store, drift_runner=drift_failing_for_a, batch_size=1)
+        first = failing.run(today=date(2024, 2, 1))
+        assert (first.processed, first.failed_users) == (1, ["a"])
+        assert first.watermark != ''
+        [(user_id, attempts, next_attempt)] = retry_rows()
+        assert (user_id, attempts) == ("a", 1)
+        
+        # Backoff not yet passed: nothing to do
+        assert failing.run(today=date(2024, 2, 1)).dirty == 0
+        
+        make_due()
+        second = failing.run(today=date(2024, 2, 1))
+        assert (second.retried, second.failed_users) == (1, ["a"])
+        [(_, attempts, retry_at)] = retry_rows()
+        assert attempts == 2 and retry_at > next_attempt
+        
+        make_due()
+        fixed = InsightScheduler(store, drift_runner=lambda history: {"a": {"data_points": 8}})
+        summary = fixed.run(today=date(2024, 2, 1))
+        assert (summary.retried, summary.processed, summary.drift_analyzed) == (1, 1, 1)
+        assert retry_rows() == []
+    
+    def test_retries_cleared_for_every_successful_batch(self, store):
+        """Test users retried across several batches all leave the retry table."""
+        store.upsert_metrics(self._rows("a", 8) + self._rows("b", 8) + self._rows("c", 8))
+        
+        def drift_failing(history):
+            raise RuntimeError("drift pipeline unavailable")
+        
+        def retry_rows():
+            with store.connect() as conn:
+                return conn.execute("SELECT userId FROM scheduler_retry ORDER BY userId").fetchall()
+        
+        first = InsightScheduler(store, drift_runner=drift_failing, batch_size=1).run(today=date(2024, 2, 1))
+        assert sorted(first.failed_users) == ["a", "b", "c"]
+        assert retry_rows() == [("a",), ("b",), ("c",)]
+        
+        with store.connect() as conn:
+            conn.execute("UPDATE scheduler_retry SET nextAttemptAt = ''")
+        fixed = InsightScheduler(store, drift_runner=lambda history: {}, batch_size=1)
+        summary = fixed.run(today=date(2024, 2, 1))
+        assert (summary.retried, summary.processed, summary.batches) == (3, 3, 3)
+        assert retry_rows() == []
+        assert fixed.run(today=date(2024, 2, 1)).dirty == 0
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])